@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 import logging.config
 import dotenv
+from corsheaders.defaults import default_headers
 
 # Load environment variables from .env file
 dotenv.load_dotenv(Path(__file__).resolve().parent / '.env')
@@ -17,10 +18,86 @@ ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', 'localhost').split(',')
 
 # CORS
 CORS_ALLOW_ALL_ORIGINS = os.environ.get('CORS_ALLOW_ALL_ORIGINS', 'True') == 'True'
+CORS_ALLOW_HEADERS = (*default_headers, 'x-auth-token')
 
 # OpenStack configuration
 OPENSTACK = {
     'auth_url': os.environ.get('OPENSTACK_AUTH_URL', 'localhost/identity/'),
+    # Validated tokens are cached per worker for at most this many seconds
+    # (or until the token expires in Keystone, whichever comes first)
+    'token_cache_ttl': int(os.environ.get('OPENSTACK_TOKEN_CACHE_TTL', '300')),
+    'token_cache_size': int(os.environ.get('OPENSTACK_TOKEN_CACHE_SIZE', '10000')),
+    # Connection pool of the Keystone client (eduvmstore/utils/keystone_client.py)
+    'pool_size': int(os.environ.get('OPENSTACK_POOL_SIZE', '10')),
+    'connect_timeout': float(os.environ.get('OPENSTACK_CONNECT_TIMEOUT', '3')),
+    'read_timeout': float(os.environ.get('OPENSTACK_READ_TIMEOUT', '10')),
+    'max_retries': int(os.environ.get('OPENSTACK_MAX_RETRIES', '2')),
+    # Circuit breaker around the Keystone token validation
+    'breaker_failure_threshold': float(os.environ.get('OPENSTACK_BREAKER_FAILURE_THRESHOLD', '0.5')),
+    'breaker_window_size': int(os.environ.get('OPENSTACK_BREAKER_WINDOW_SIZE', '20')),
+    'breaker_min_calls': int(os.environ.get('OPENSTACK_BREAKER_MIN_CALLS', '5')),
+    'breaker_open_seconds': float(os.environ.get('OPENSTACK_BREAKER_OPEN_SECONDS', '30')),
+    # Seconds a cached token may still be used after its TTL while Keystone is unavailable (0 = off)
+    'stale_token_grace': float(os.environ.get('OPENSTACK_STALE_TOKEN_GRACE', '0')),
+}
+
+# Per worker cache of users and their roles (eduvmstore/db/operations/users.py).
+# Changes made by other workers become visible after at most the TTL in seconds.
+USER_CACHE = {
+    'ttl': int(os.environ.get('USER_CACHE_TTL', '60')),
+    'size': int(os.environ.get('USER_CACHE_SIZE', '10000')),
+}
+
+# Per worker cache of free AppTemplate names for the name collision check
+# (eduvmstore/db/operations/app_templates.py).
+# Names taken in other workers may be reported free for at most the TTL in seconds.
+NAME_COLLISION_CACHE = {
+    'ttl': int(os.environ.get('NAME_COLLISION_CACHE_TTL', '5')),
+    'size': int(os.environ.get('NAME_COLLISION_CACHE_SIZE', '10000')),
+}
+
+# Opt-in keyset pagination of AppTemplate lists (eduvmstore/api/pagination.py)
+PAGINATION = {
+    'page_size': int(os.environ.get('PAGINATION_PAGE_SIZE', '50')),
+    'max_page_size': int(os.environ.get('PAGINATION_MAX_PAGE_SIZE', '500')),
+}
+
+# Streaming of AppTemplate and User lists as NDJSON (eduvmstore/api/streaming.py)
+STREAMING = {
+    # Rows fetched from the database, including their prefetched relations, per query
+    'chunk_size': int(os.environ.get('STREAMING_CHUNK_SIZE', '500')),
+}
+
+# Fuzzy AppTemplate search with ?fuzzy=true (eduvmstore/db/search.py)
+FUZZY_SEARCH = {
+    # Share of the trigrams of the search a name and short description have to contain
+    'min_similarity': float(os.environ.get('FUZZY_SEARCH_MIN_SIMILARITY', '0.5')),
+    'max_results': int(os.environ.get('FUZZY_SEARCH_MAX_RESULTS', '200')),
+}
+
+# Cache of AppTemplate list and detail responses (eduvmstore/utils/response_cache.py).
+# locmem caches per worker, file and database (SQLite, create the table with
+# `manage.py createcachetable`) share the cache and its invalidations across workers.
+# The file cache directory is private to the backend, other users must not be able to write to it.
+APP_TEMPLATE_CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'eduvmstore-app-templates'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'app_template_cache')),
+    'database': ('django.core.cache.backends.db.DatabaseCache', 'eduvmstore_cache'),
+}
+APP_TEMPLATE_CACHE_BACKEND = APP_TEMPLATE_CACHE_BACKENDS[
+    os.environ.get('APP_TEMPLATE_CACHE_BACKEND', 'locmem')]
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'app_templates': {
+        'BACKEND': APP_TEMPLATE_CACHE_BACKEND[0],
+        'LOCATION': os.environ.get('APP_TEMPLATE_CACHE_LOCATION', APP_TEMPLATE_CACHE_BACKEND[1]),
+        'TIMEOUT': int(os.environ.get('APP_TEMPLATE_CACHE_TTL', '300')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('APP_TEMPLATE_CACHE_SIZE', '1000')),
+        },
+    },
 }
 
 # Application definition
@@ -38,6 +115,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Before the authentication, so CORS preflights are answered without a token
+    'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware',
@@ -45,8 +124,6 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'corsheaders.middleware.CorsMiddleware',
-    'django.middleware.common.CommonMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -74,6 +151,16 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / os.environ.get('SQLITE_DB_NAME', 'db.sqlite3'),
+        'OPTIONS': {
+            # Seconds a write waits for the database lock instead of failing immediately
+            'timeout': float(os.environ.get('SQLITE_TIMEOUT', '20')),
+        },
+        # Tests use a database file like production, as concurrent connections to the default
+        # in-memory test database fail with locking errors instead of waiting for the lock.
+        # The file is removed after the tests and ignored by git (*.sqlite3 in .gitignore)
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
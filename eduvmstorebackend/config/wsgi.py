@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Build the in-process fuzzy search index in the background at worker startup
+from eduvmstore.db.search import warm_up_fuzzy_index  # noqa: E402
+
+warm_up_fuzzy_index()
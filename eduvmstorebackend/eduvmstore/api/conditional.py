@@ -0,0 +1,206 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, QuerySet
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+class PreconditionFailed(APIException):
+    """
+    Raised if the If-Match header of a request doesn't match the current ETag of the object,
+    i.e. the object was changed by another request since the client read it.
+    """
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The object was changed by another request, fetch it again before updating it.'
+    default_code = 'precondition_failed'
+
+
+class ConditionalGetMixin:
+    """
+    Strong ETags and 304 Not Modified responses for the list and detail of a ModelViewSet.
+
+    The ETag is computed from cheap aggregates of the queryset, by default the number of
+    rows and their latest modification time, together with the requested path and query
+    parameters, the response format and the visibility scope of the user. A request with a matching
+    If-None-Match header is therefore answered with a single aggregate query, without
+    loading or serializing any rows.
+
+    Every write of a row has to update the timestamp field, and every row added to the
+    queryset has to get a newer timestamp than the rows in it. Deleted rows change the count.
+    """
+    etag_timestamp_field = 'updated_at'
+    # Query parameters changing the representation of a detail, see get_etag_query
+    etag_representation_params = ('view', 'fields')
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        """
+        List the objects, or answer with 304 if the ETag of the list matches.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the objects or without content
+        :rtype: Response
+        """
+        etag = self.get_etag(self.filter_queryset(self.get_queryset()))
+        return self.get_conditional_response(
+            etag, lambda: self.get_list_response(request, *args, **kwargs))
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Retrieve an object, or answer with 304 if the ETag of the object matches.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the object or without content
+        :rtype: Response
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            etag = self.get_etag(queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}))
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookup value, get_object answers with 404
+            etag = None
+        return self.get_conditional_response(
+            etag, lambda: self.get_detail_response(request, *args, **kwargs))
+
+    def get_list_response(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Build the full response of the list.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the objects
+        :rtype: Response
+        """
+        return super().list(request, *args, **kwargs)
+
+    def get_detail_response(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Build the full response of the detail.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the object
+        :rtype: Response
+        """
+        return super().retrieve(request, *args, **kwargs)
+
+    def get_etag_aggregates(self) -> Dict[str, Any]:
+        """
+        Get the aggregates of the queryset that change with every change of the response.
+
+        :return: Dictionary of aggregate expressions
+        :rtype: Dict[str, Any]
+        """
+        return {'count': Count('pk'), 'modified': Max(self.etag_timestamp_field)}
+
+    def get_etag_scope(self) -> Dict[str, Any]:
+        """
+        Get the parts of the request the response depends on besides the queryset.
+
+        :return: Dictionary with the user, the access level, the path, the query and the response format
+        :rtype: Dict[str, Any]
+        """
+        return {
+            'user': str(self.request.myuser.id),
+            'access_level': self.request.permissions.access_level,
+            'path': self.request.path,
+            'query': self.get_etag_query(),
+            'format': self.request.accepted_renderer.format,
+        }
+
+    def get_etag_query(self) -> Dict[str, List[str]]:
+        """
+        Get the query parameters the response depends on. A list depends on all of them,
+        as they filter and paginate it. A detail only depends on etag_representation_params
+        (the format is part of the scope as rendered), so its ETag identifies the object
+        regardless of the url it was read from and matches the If-Match of an update.
+
+        :return: Dictionary of the query parameters and their values
+        :rtype: Dict[str, List[str]]
+        """
+        query_params = self.request.query_params
+        names = query_params.keys() if not self.detail else \
+            [name for name in self.etag_representation_params if name in query_params]
+        return {name: query_params.getlist(name) for name in sorted(names)}
+
+    def get_etag(self, queryset: QuerySet) -> Optional[str]:
+        """
+        Compute the ETag of the response for a queryset with a single aggregate query.
+
+        :param QuerySet queryset: The queryset of the response
+        :return: The quoted ETag, or None if the queryset is empty
+        :rtype: Optional[str]
+        """
+        aggregates = queryset.order_by().aggregate(**self.get_etag_aggregates())
+        if not aggregates['count']:
+            # A missing object is answered with 404, an empty list is cheap anyway
+            return None
+        return self.build_etag(aggregates)
+
+    def get_object_etag(self, instance: Any) -> str:
+        """
+        Compute the ETag of the detail response of a loaded object without a query.
+        Only valid for the default aggregates of get_etag_aggregates.
+
+        :param Any instance: The object
+        :return: The quoted ETag
+        :rtype: str
+        """
+        return self.build_etag({'count': 1, 'modified': getattr(instance, self.etag_timestamp_field)})
+
+    def build_etag(self, aggregates: Dict[str, Any]) -> str:
+        """
+        Build the ETag of a response from the aggregates of its queryset and the scope of the request.
+
+        :param Dict[str, Any] aggregates: The values of the aggregates
+        :return: The quoted ETag
+        :rtype: str
+        """
+        digest = hashlib.sha256(json.dumps([self.get_etag_scope(), aggregates],
+                                           default=str, sort_keys=True).encode())
+        return quote_etag(digest.hexdigest()[:32])
+
+    def check_if_match(self, instance: Any) -> None:
+        """
+        Check the If-Match header of an update request against the current ETag of the object.
+        Like in the ETag, the path and response format of the update have to be those of the
+        detail request. Requests without If-Match are not checked.
+
+        :param Any instance: The object to update
+        :return: None
+        :rtype: None
+        :raises PreconditionFailed: If the If-Match header contains neither the ETag nor '*'
+        """
+        header = self.request.META.get('HTTP_IF_MATCH')
+        if header is None:
+            return
+        # Strong comparison, as required for If-Match
+        if_match = parse_etags(header)
+        if '*' not in if_match and self.get_object_etag(instance) not in if_match:
+            raise PreconditionFailed()
+
+    def get_conditional_response(self, etag: Optional[str], respond: Callable[[], Response]) -> Response:
+        """
+        Answer with 304 if the If-None-Match header of the request contains the ETag,
+        otherwise build the full response and add the ETag to it.
+
+        :param Optional[str] etag: The quoted ETag of the response or None
+        :param Callable respond: Function building the full response
+        :return: HTTP response
+        :rtype: Response
+        """
+        if etag is None:
+            return respond()
+        # Weak comparison, as required for If-None-Match
+        if_none_match = {tag.removeprefix('W/')
+                         for tag in parse_etags(self.request.META.get('HTTP_IF_NONE_MATCH', ''))}
+        if etag in if_none_match or '*' in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        response = respond()
+        if status.is_success(response.status_code):
+            response['ETag'] = etag
+        return response
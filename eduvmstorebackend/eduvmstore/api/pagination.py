@@ -0,0 +1,184 @@
+import base64
+import json
+import uuid
+from typing import Any, List, Optional
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in cursor pagination ordered by (created_at, id).
+
+    Pagination is only applied if the request contains the cursor or page_size query
+    parameter, so existing clients still receive the full list. The cursor encodes the
+    ordering key of the last item of the previous page and the next page starts right
+    after it. Fetching a page therefore is an index range scan on (created_at, id)
+    regardless of the position in the list, instead of skipping rows with OFFSET.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view=None) -> Optional[List[Any]]:
+        """
+        Return a single page of the queryset or None if the request doesn't opt in.
+
+        :param QuerySet queryset: Queryset to paginate
+        :param Request request: The HTTP request object
+        :param view: The view paginating the queryset
+        :return: Items of the requested page or None
+        :rtype: Optional[List[Any]]
+        :raises NotFound: If the cursor is invalid
+        """
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by('created_at', 'id')
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created_at, id = self.decode_cursor(cursor)
+            # The first condition bounds the index range scan, the second skips ties up to the cursor
+            queryset = queryset.filter(Q(created_at__gte=created_at),
+                                       Q(created_at__gt=created_at) | Q(id__gt=id))
+
+        # Fetch one item more than the page size to know if there is a next page
+        items = list(queryset[:self.page_size + 1])
+        self.has_next = len(items) > self.page_size
+        self.page = items[:self.page_size]
+        return self.page
+
+    def is_requested(self, request: Request) -> bool:
+        """
+        Check if the request opts in to pagination through the cursor or page_size query parameter.
+
+        :param Request request: The HTTP request object
+        :return: True if the list is paginated
+        :rtype: bool
+        """
+        return (self.cursor_query_param in request.query_params
+                or self.page_size_query_param in request.query_params)
+
+    def get_paginated_response(self, data: List[Any]) -> Response:
+        """
+        Wrap the serialized page with the link to the next page.
+
+        :param List data: Serialized items of the page
+        :return: HTTP response with the next link and the results
+        :rtype: Response
+        """
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_page_size(self, request: Request) -> int:
+        """
+        Get the requested page size, limited to the configured maximum.
+
+        :param Request request: The HTTP request object
+        :return: Number of items per page
+        :rtype: int
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.PAGINATION['page_size']
+        if page_size < 1:
+            return settings.PAGINATION['page_size']
+        return min(page_size, settings.PAGINATION['max_page_size'])
+
+    def get_next_link(self) -> Optional[str]:
+        """
+        Build the url of the next page from the last item of the current page.
+
+        :return: Url of the next page or None on the last page
+        :rtype: Optional[str]
+        """
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(last.created_at, last.id))
+
+    def encode_cursor(self, created_at, id) -> str:
+        """
+        Encode the ordering key of an item as opaque cursor.
+
+        :param datetime created_at: Creation time of the item
+        :param UUID id: ID of the item
+        :return: The encoded cursor
+        :rtype: str
+        """
+        position = json.dumps([created_at.isoformat(), str(id)])
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, cursor: str) -> tuple:
+        """
+        Decode a cursor into the ordering key of the last item of the previous page.
+
+        :param str cursor: The encoded cursor
+        :return: Tuple of creation time and ID
+        :rtype: tuple
+        :raises NotFound: If the cursor is invalid
+        """
+        try:
+            created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            created_at = parse_datetime(created_at)
+            id = uuid.UUID(id)
+        except (TypeError, ValueError, AttributeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, id
+
+
+class ReviewQueuePagination(KeysetPagination):
+    """
+    Keyset pagination of the review queue, oldest items first.
+
+    Unlike the list, the review queue is always paginated, and every page contains
+    the total number of items in the queue for the badge in the UI.
+    """
+
+    def is_requested(self, request: Request) -> bool:
+        """
+        Always paginate the review queue.
+
+        :param Request request: The HTTP request object
+        :return: True
+        :rtype: bool
+        """
+        return True
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view=None) -> Optional[List[Any]]:
+        """
+        Count the items of the queue and return a single page of it.
+
+        :param QuerySet queryset: Queryset of the review queue
+        :param Request request: The HTTP request object
+        :param view: The view paginating the queryset
+        :return: Items of the requested page
+        :rtype: Optional[List[Any]]
+        :raises NotFound: If the cursor is invalid
+        """
+        self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data: List[Any]) -> Response:
+        """
+        Wrap the serialized page with the total count and the link to the next page.
+
+        :param List data: Serialized items of the page
+        :return: HTTP response with the count, the next link and the results
+        :rtype: Response
+        """
+        return Response({'count': self.count, 'next': self.get_next_link(), 'results': data})
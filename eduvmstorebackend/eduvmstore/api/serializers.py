@@ -1,8 +1,9 @@
 import logging
-from django.utils.timezone import now
-from typing import Dict, List
+from django.db import models, transaction
+from typing import Dict, Iterable, List, Optional, Type
 
 from rest_framework import serializers
+from eduvmstore.api.conditional import PreconditionFailed
 from eduvmstore.db.models import (AppTemplates, Users, Roles, AppTemplateInstantiationAttributes,
                                   AppTemplateAccountAttributes, Favorites, AppTemplateSecurityGroups)
 from eduvmstore.db.operations.app_templates import check_name_collision
@@ -102,6 +103,18 @@ class AppTemplateSerializer(serializers.ModelSerializer):
             'version'
         ]
 
+    def __init__(self, *args, fields: Optional[Iterable[str]] = None, **kwargs) -> None:
+        """
+        Initialize the serializer, optionally limited to a subset of its fields,
+        e.g. for the summary representation of AppTemplate lists.
+
+        :param Iterable[str] fields: Names of the fields to serialize, all fields if None
+        """
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
     # Validation method for the name field (automatically triggered by Django Rest Framework)
     def validate_name(self, name: str) -> str:
         """
@@ -111,6 +124,9 @@ class AppTemplateSerializer(serializers.ModelSerializer):
         :return: The validated name
         :raises: ValidationError if name has version suffix
         """
+        # An AppTemplate keeping its name doesn't collide with itself
+        if self.instance is not None and name == self.instance.name:
+            return name
         (collision, reason, context) = check_name_collision(name)
         if collision:
             raise serializers.ValidationError(reason.format(**context))
@@ -127,10 +143,10 @@ class AppTemplateSerializer(serializers.ModelSerializer):
         :return: None
         :rtype: None
         """
-        for instantiation_attribute_data in instantiation_attributes_data:
-            AppTemplateInstantiationAttributes.objects.create(
-                app_template_id=app_template,
-                **instantiation_attribute_data)
+        AppTemplateInstantiationAttributes.objects.bulk_create([
+            AppTemplateInstantiationAttributes(app_template_id=app_template, position=position,
+                                               **instantiation_attribute_data)
+            for position, instantiation_attribute_data in enumerate(instantiation_attributes_data)])
 
     def create_account_attributes(self,
                                   app_template: AppTemplates,
@@ -143,10 +159,10 @@ class AppTemplateSerializer(serializers.ModelSerializer):
         :return: None
         :rtype: None
         """
-        for account_attribute_data in account_attributes_data:
-            AppTemplateAccountAttributes.objects.create(
-                app_template_id=app_template,
-                **account_attribute_data)
+        AppTemplateAccountAttributes.objects.bulk_create([
+            AppTemplateAccountAttributes(app_template_id=app_template, position=position,
+                                         **account_attribute_data)
+            for position, account_attribute_data in enumerate(account_attributes_data)])
 
     def create_security_groups(self,
                                app_template: AppTemplates,
@@ -159,16 +175,54 @@ class AppTemplateSerializer(serializers.ModelSerializer):
         :return: None
         :rtype: None
         """
-        for security_group_data in security_groups_data:
-            AppTemplateSecurityGroups.objects.create(
-                app_template_id=app_template,
-                **security_group_data
-            )
-
+        AppTemplateSecurityGroups.objects.bulk_create([
+            AppTemplateSecurityGroups(app_template_id=app_template, position=position, **security_group_data)
+            for position, security_group_data in enumerate(security_groups_data)])
+
+    def update_related_names(self,
+                             model: Type[models.Model],
+                             app_template: AppTemplates,
+                             related_data: List[Dict]) -> bool:
+        """
+        Bring the attributes or security groups of an AppTemplate in line with the given list.
+        The rows are read by their position, so the order of the list is kept: existing rows
+        matching the longest possible beginning of the list are kept, all other rows are
+        deleted and the rest of the list is inserted at the positions after them. Removing rows
+        or appending rows therefore doesn't touch the other rows, while a moved or inserted row
+        is written again together with all rows following it in the list.
+
+        :param Type[models.Model] model: The model of the related rows, e.g. AppTemplateAccountAttributes
+        :param AppTemplates app_template: The AppTemplate instance the rows belong to
+        :param List[Dict] related_data: The complete new list of related data
+        :return: True if rows were deleted or inserted
+        :rtype: bool
+        """
+        # Match the list against the existing rows in order, skipping rows not in the list
+        kept = 0
+        next_position = 0
+        removed_ids = []
+        for id, name, position in (model.objects.filter(app_template_id=app_template)
+                                   .order_by('position').values_list('id', 'name', 'position')):
+            if kept < len(related_data) and related_data[kept]['name'] == name:
+                kept += 1
+                next_position = position + 1
+            else:
+                removed_ids.append(id)
+        added = [model(app_template_id=app_template, position=position, **related_data_item)
+                 for position, related_data_item in enumerate(related_data[kept:], start=next_position)]
+
+        if removed_ids:
+            model.objects.filter(id__in=removed_ids).delete()
+        if added:
+            model.objects.bulk_create(added)
+        return bool(removed_ids or added)
+
+    @transaction.atomic
     def create(self, validated_data: Dict) -> AppTemplates:
         """
         Custom create method to handle additional operations
         before saving an AppTemplates instance to the database.
+        The AppTemplate and its attributes are inserted in one transaction.
 
         :param Dict validated_data: Data validated through the serializer
         :return: Newly created AppTemplates instance
@@ -186,16 +240,23 @@ class AppTemplateSerializer(serializers.ModelSerializer):
             self.create_security_groups(app_template, security_groups_data)
         return app_template
 
+    @transaction.atomic
     def update(self, instance: AppTemplates, validated_data: Dict) -> AppTemplates:
         """
         Custom update method to handle additional operations
         before saving an AppTemplates instance to the database. Public AppTemplates
-        can't be updated.
+        can't be updated. The AppTemplate and its changed attributes are written in one transaction.
+        A full update (PUT) resets absent fields to their defaults, a partial update (PATCH)
+        only changes the given fields. Only changed columns are written, and nothing
+        is written if nothing changed.
+        If validated_data contains an expected_updated_at, the update is only applied
+        if the AppTemplate wasn't changed since then (optimistic concurrency control).
 
         :param AppTemplates instance: The instance to update
         :param Dict validated_data: Data validated through the serializer
         :return: Updated AppTemplates instance
         :rtype: AppTemplates
+        :raises PreconditionFailed: If the AppTemplate was changed since expected_updated_at
         """
 
         if instance.approved:
@@ -206,37 +267,51 @@ class AppTemplateSerializer(serializers.ModelSerializer):
                 code='forbidden'
             )
 
+        expected_updated_at = validated_data.pop('expected_updated_at', None)
+        if expected_updated_at is not None:
+            # Conditional UPDATE of the unchanged timestamp as first statement, instead of a row lock:
+            # it only matches if no other request changed the AppTemplate in between, and takes the
+            # SQLite write lock just for this transaction, so the reads below see the latest state
+            if not AppTemplates.objects.filter(pk=instance.pk, updated_at=expected_updated_at).update(
+                    updated_at=expected_updated_at):
+                raise PreconditionFailed()
+
+        # AppTemplates are only approved through the approve endpoint
+        validated_data.pop('approved', None)
         instantiation_attributes_data = validated_data.pop('instantiation_attributes', None)
         account_attributes_data = validated_data.pop('account_attributes', None)
         security_groups_data = validated_data.pop('security_groups', None)
 
+        related_changed = False
         if instantiation_attributes_data is not None:
-            AppTemplateInstantiationAttributes.objects.filter(app_template_id=instance).delete()
-            if instantiation_attributes_data:
-                self.create_instantiation_attributes(instance, instantiation_attributes_data)
+            related_changed |= self.update_related_names(
+                AppTemplateInstantiationAttributes, instance, instantiation_attributes_data)
 
         if account_attributes_data is not None:
-            AppTemplateAccountAttributes.objects.filter(app_template_id=instance).delete()
-            if account_attributes_data:
-                self.create_account_attributes(instance, account_attributes_data)
+            related_changed |= self.update_related_names(
+                AppTemplateAccountAttributes, instance, account_attributes_data)
 
         if security_groups_data is not None:
-            AppTemplateSecurityGroups.objects.filter(app_template_id=instance).delete()
-            if security_groups_data:
-                self.create_security_groups(instance, security_groups_data)
+            related_changed |= self.update_related_names(
+                AppTemplateSecurityGroups, instance, security_groups_data)
 
-        model_fields = {field.name: field for field in instance._meta.fields}
-        for field_name, field in model_fields.items():
-            if field_name in self.Meta.read_only_fields:
+        update_fields = []
+        for field in instance._meta.fields:
+            if field.name in self.Meta.read_only_fields or not field.editable:
                 continue
-            elif field_name in validated_data:
-                setattr(instance, field_name, validated_data[field_name])
-            elif field.has_default():
-                setattr(instance, field_name, field.default)
-
-        instance.updated_at = now()
-        instance.approved = False
-        instance.save()
+            elif field.name in validated_data:
+                value = validated_data[field.name]
+            elif not self.partial and field.has_default():
+                value = field.get_default()
+            else:
+                continue
+            if getattr(instance, field.name) != value:
+                setattr(instance, field.name, value)
+                update_fields.append(field.name)
+
+        if update_fields or related_changed:
+            # updated_at is set on save through auto_now
+            instance.save(update_fields=update_fields + ['updated_at'])
         return instance
 
 
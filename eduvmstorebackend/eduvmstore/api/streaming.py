@@ -0,0 +1,118 @@
+import json
+from typing import Any, Iterator, List
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from rest_framework.utils import encoders
+
+
+def render_line(item: Any) -> bytes:
+    """
+    Render an item as a single line of compact JSON, like the JSON responses of the API.
+
+    :param Any item: The serialized item
+    :return: UTF-8 encoded JSON followed by a newline
+    :rtype: bytes
+    """
+    line = json.dumps(item, cls=encoders.JSONEncoder, ensure_ascii=False, separators=(',', ':'))
+    return line.encode() + b'\n'
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renderer for newline delimited JSON (one JSON document per line).
+
+    Lists are rendered as one line per item, any other data (e.g. an error or a page)
+    as a single line. Streamed lists don't go through the renderer, see StreamingListMixin.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data: Any, _accepted_media_type: str = None, _renderer_context: dict = None) -> bytes:
+        """
+        Render the data as NDJSON.
+
+        :param Any data: The serialized data
+        :param str _accepted_media_type: The accepted media type of the request (unused)
+        :param dict _renderer_context: Context of the view (unused)
+        :return: The rendered data
+        :rtype: bytes
+        """
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return b''.join(render_line(item) for item in items)
+
+
+class StreamingListMixin:
+    """
+    Stream lists of a ModelViewSet as NDJSON if the client accepts application/x-ndjson.
+
+    The queryset is read in chunks of settings.STREAMING['chunk_size'] rows with
+    iterator(), which also prefetches the relations of every chunk separately, and
+    every row is serialized and sent on its own. Neither the queryset nor the serialized
+    list is materialized, so the memory of the worker stays flat however long the list is.
+    Paginated requests are answered with the page as a single line.
+    """
+
+    def get_renderers(self) -> List[BaseRenderer]:
+        """
+        Add the NDJSON renderer to the renderers of the view.
+
+        :return: The renderers of the view
+        :rtype: List[BaseRenderer]
+        """
+        return [*super().get_renderers(), NDJSONRenderer()]
+
+    def is_streaming_requested(self) -> bool:
+        """
+        Check if the list is streamed: the client accepts NDJSON and no page is requested.
+
+        :return: True if the list is streamed
+        :rtype: bool
+        """
+        paginator = self.paginator
+        return (self.request.accepted_renderer.format == NDJSONRenderer.format
+                and (paginator is None or not paginator.is_requested(self.request)))
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        """
+        List the objects, streamed as NDJSON if requested.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the objects
+        :rtype: Response
+        """
+        if not self.is_streaming_requested():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(self.stream_ndjson(queryset, self.get_serializer()),
+                                     content_type=NDJSONRenderer.media_type)
+
+    def stream_ndjson(self, queryset: QuerySet, serializer: BaseSerializer) -> Iterator[bytes]:
+        """
+        Serialize the objects of a queryset row by row, one chunk of lines at a time.
+
+        :param QuerySet queryset: The queryset to stream
+        :param BaseSerializer serializer: Serializer of a single object
+        :return: Iterator over the chunks of NDJSON lines
+        :rtype: Iterator[bytes]
+        """
+        chunk_size = settings.STREAMING['chunk_size']
+        lines = []
+        for instance in queryset.iterator(chunk_size=chunk_size):
+            lines.append(render_line(serializer.to_representation(instance)))
+            # Prefetched rows reference the instance and vice versa. Without this reference cycle,
+            # the rows of a chunk are freed with the chunk instead of waiting for the garbage collector.
+            getattr(instance, '_prefetched_objects_cache', {}).clear()
+            if len(lines) == chunk_size:
+                yield b''.join(lines)
+                lines = []
+        if lines:
+            yield b''.join(lines)
@@ -1,5 +1,6 @@
 from django.urls import path
-from .views import AppTemplateViewSet, UserViewSet, RoleViewSet, FavoritesViewSet
+from .views import (AppTemplateViewSet, UserViewSet, RoleViewSet, FavoritesViewSet, MetricsViewSet,
+                    health_live, health_ready)
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
@@ -7,10 +8,14 @@ router.register(r'app-templates', AppTemplateViewSet, basename='app-template')
 router.register(r'users', UserViewSet, basename='user')
 router.register(r'roles', RoleViewSet, basename='role')
 router.register(r'favorites', FavoritesViewSet, basename='favorite')
+router.register(r'metrics', MetricsViewSet, basename='metrics')
 
 urlpatterns = [
     *router.urls,
     path('app-templates/name/<str:name>/collision/',
          AppTemplateViewSet.as_view({'get': 'check_name_collision'}),
          name='check-name-collision'),
+    # Unauthenticated, see PUBLIC_PATHS in eduvmstore/middleware/authentication_middleware.py
+    path('health/live/', health_live, name='health-live'),
+    path('health/ready/', health_ready, name='health-ready'),
 ]
@@ -1,37 +1,75 @@
+import codecs
 import logging
+import uuid
+from typing import Any, Callable, Dict, List, Optional
 
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
-from django.db.models import Q, QuerySet
+from django.db import DatabaseError, connection
+from django.db.models import Max, Q, QuerySet, Value
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.http import require_safe
 from typing_extensions import override
 from rest_framework.request import Request
 
+from eduvmstore.api.conditional import ConditionalGetMixin
+from eduvmstore.api.pagination import KeysetPagination, ReviewQueuePagination
+from eduvmstore.api.streaming import StreamingListMixin
 from eduvmstore.api.serializers import (AppTemplateSerializer, FavoritesSerializer,
                                         UserSerializer, RoleSerializer)
 from eduvmstore.db.models import AppTemplates, Favorites, Users, Roles
-from eduvmstore.config.access_levels import REQUIRED_ACCESS_LEVELS
-from rest_framework import status, viewsets
+from rest_framework import exceptions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from eduvmstore.db.operations.app_templates import (approve_app_template,
-                                                    check_name_collision,
-                                                    reject_app_template)
-from eduvmstore.db.operations.users import delete_user
-from eduvmstore.utils.access_control import has_access_level
+from eduvmstore.db.operations.app_templates import (PUBLIC_SCOPE,
+                                                    app_template_response_cache,
+                                                    approve_app_template,
+                                                    approve_app_templates,
+                                                    check_name_collision_cached,
+                                                    check_name_collisions,
+                                                    reject_app_template,
+                                                    reject_app_templates,
+                                                    user_scope)
+from eduvmstore.db.operations.users import delete_user, import_users, user_cache
+from eduvmstore.db.search import (fuzzy_search_app_templates, is_search_index_available,
+                                  search_app_templates)
+from eduvmstore.middleware.authentication_middleware import keystone_metrics, keystone_reachable
+from eduvmstore.utils.roster import read_roster
 
 logger = logging.getLogger('eduvmstore_logger')
 
+# Relations of AppTemplates nested in the AppTemplateSerializer
+APP_TEMPLATE_PREFETCH = ('instantiation_attributes', 'account_attributes', 'security_groups')
 
-class AppTemplateViewSet(viewsets.ModelViewSet):
+# Fields of the summary representation of AppTemplate lists (?view=summary), e.g. for the catalog grid
+APP_TEMPLATE_SUMMARY_FIELDS = ('id', 'name', 'short_description', 'public', 'approved',
+                               'volume_size_gb', 'fixed_ram_gb', 'fixed_disk_gb', 'fixed_cores')
+
+# Actions of the AppTemplateViewSet supporting sparse fieldsets (?fields= and ?view=)
+SPARSE_FIELDSET_ACTIONS = ('list', 'favorites')
+
+# Maximum number of names of a single batch name collision check
+MAX_NAME_COLLISION_CHECKS = 1000
+
+# Maximum number of AppTemplates approved or rejected with a single bulk request
+MAX_BULK_REVIEW_IDS = 1000
+
+
+class AppTemplateViewSet(ConditionalGetMixin, StreamingListMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling AppTemplate model operations.
 
     This ViewSet provides default CRUD operations for the AppTemplates model,
     including custom actions for approving templates and checking for a name collision.
+    List and detail responses carry ETags and are answered with 304 if unchanged.
+    Lists can be limited to some fields, which are the only ones loaded from the database,
+    and are streamed if the client accepts NDJSON.
 
     :param serializer_class: Serializer class for AppTemplates model
+    :param pagination_class: Opt-in keyset pagination of the list
     """
     serializer_class = AppTemplateSerializer
+    pagination_class = KeysetPagination
 
     @override
     def perform_create(self, serializer: AppTemplateSerializer) -> None:
@@ -48,22 +86,57 @@ class AppTemplateViewSet(viewsets.ModelViewSet):
         # Create a favorite item of the newly created AppTemplate
         Favorites.objects.create(app_template_id=serializer.instance, user_id=self.request.myuser)
 
+    @override
+    def update(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Update an AppTemplate (PUT or PATCH). With an If-Match header the update is only
+        applied if the AppTemplate still has the given ETag, otherwise the response is 412.
+        The response contains the new ETag.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the updated AppTemplate
+        :rtype: Response
+        """
+        response = super().update(request, *args, **kwargs)
+        response['ETag'] = self.get_object_etag(self.updated_app_template)
+        return response
+
+    @override
+    def perform_update(self, serializer: AppTemplateSerializer) -> None:
+        """
+        Check the If-Match header and update the AppTemplate. The serializer applies the
+        update only if the AppTemplate is unchanged since it was checked here.
+
+        :param AppTemplateSerializer serializer: Serializer for the AppTemplates model
+        :return: None
+        :rtype: None
+        :raises PreconditionFailed: If the AppTemplate doesn't match the If-Match header
+        """
+        app_template = serializer.instance
+        self.check_if_match(app_template)
+        # If-Match: * only requires the AppTemplate to exist
+        if_match = self.request.META.get('HTTP_IF_MATCH', '*').strip()
+        expected_updated_at = app_template.updated_at if if_match != '*' else None
+        self.updated_app_template = serializer.save(expected_updated_at=expected_updated_at)
+
     @override
     def get_queryset(self) -> QuerySet[AppTemplates]:
         """
         Retrieve the queryset of AppTemplates,
-        optionally filtered by search, public, and approved status.
+        optionally filtered by search (fuzzy if requested), public, and approved status.
         The scope of retrieved AppTemplates depends on the access level of the user.
 
         :return: Filtered queryset of AppTemplates
         :rtype: QuerySet
+        :raises ValidationError: If a paginated list is searched
         """
         user = self.request.myuser
+        can_list_all = self.request.permissions.can_list_all_app_templates
 
         # Only consider AppTemplates that are not deleted
         queryset = AppTemplates.objects.filter(deleted=False)
 
-        if has_access_level(user, 'app-template-list-all', 'GET'):
+        if can_list_all:
             # Users with sufficient access level can see their own AppTemplates
             # and all public (including not approved AppTemplates
             queryset = queryset.filter(Q(creator_id=user) | Q(public=True))
@@ -75,6 +148,13 @@ class AppTemplateViewSet(viewsets.ModelViewSet):
         search = self.request.query_params.get('search', None)
         public = self.request.query_params.get('public', None)
         approved = self.request.query_params.get('approved', None)
+        fuzzy = self.request.query_params.get('fuzzy', 'false').lower() == 'true'
+
+        if search and self.action == 'list' and self.paginator.is_requested(self.request):
+            # The keyset pagination orders by creation time, which would discard the ranking
+            raise exceptions.ValidationError(
+                {'search': 'Search results are ranked and not paginated, '
+                           'request them without page_size and cursor'})
 
         # Convert query parameters to boolean if they are not None
         if public is not None:
@@ -83,11 +163,16 @@ class AppTemplateViewSet(viewsets.ModelViewSet):
             approved = approved.lower() == 'true'
 
         # If an admin explicitly requests all private AppTemplates (for review purposes), show them
-        if public is False and has_access_level(user, 'app-template-list-all', 'GET'):
-            queryset = queryset.filter(public=True)
-            queryset = AppTemplates.objects.filter(public=public)
-
-        if search:
+        if public is False and can_list_all:
+            queryset = AppTemplates.objects.filter(deleted=False, public=False)
+
+        if search and fuzzy:
+            # Typo tolerant search in names and short descriptions, ordered by similarity
+            queryset = fuzzy_search_app_templates(queryset, search)
+        elif search and is_search_index_available():
+            # Full-text search, ordered by relevance
+            queryset = search_app_templates(queryset, search)
+        elif search:
             # Search
             queryset = queryset.filter(
                 Q(name__icontains=search) |
@@ -103,7 +188,154 @@ class AppTemplateViewSet(viewsets.ModelViewSet):
         if approved is not None:
             queryset = queryset.filter(approved=approved)
 
-        return queryset
+        # Approval and rejection only check that the AppTemplate is visible to the user
+        if self.action in ('approve', 'reject', 'bulk_approve', 'bulk_reject'):
+            return queryset
+
+        fields = self.get_requested_fields()
+        if fields is None:
+            # Load the nested attributes with one query each instead of three queries per AppTemplate
+            return queryset.prefetch_related(*APP_TEMPLATE_PREFETCH)
+
+        # Load only the requested columns, plus the ordering key of the pagination, and relations
+        columns = {'id', 'created_at', *(field for field in fields if field not in APP_TEMPLATE_PREFETCH)}
+        return queryset.only(*columns).prefetch_related(
+            *(field for field in fields if field in APP_TEMPLATE_PREFETCH))
+
+    def get_requested_fields(self) -> Optional[List[str]]:
+        """
+        Get the fields of the AppTemplates requested for a list through the query parameter
+        fields (comma separated names, the id is always included) or view (summary or full).
+        fields takes precedence over view.
+
+        :return: Names of the requested fields, or None for all fields
+        :rtype: Optional[List[str]]
+        :raises ValidationError: If a requested field or the view is unknown
+        """
+        if self.action not in SPARSE_FIELDSET_ACTIONS:
+            return None
+
+        fields = self.request.query_params.get('fields')
+        if fields:
+            requested = ['id', *(field.strip() for field in fields.split(',') if field.strip())]
+            unknown = set(requested) - set(AppTemplateSerializer.Meta.fields)
+            if unknown:
+                raise exceptions.ValidationError({'fields': f"Unknown fields: {', '.join(sorted(unknown))}"})
+            return list(dict.fromkeys(requested))
+
+        view = self.request.query_params.get('view', 'full')
+        if view == 'summary':
+            return list(APP_TEMPLATE_SUMMARY_FIELDS)
+        if view != 'full':
+            raise exceptions.ValidationError({'view': f'Unknown view {view}, expected summary or full'})
+        return None
+
+    @override
+    def get_serializer(self, *args, **kwargs) -> AppTemplateSerializer:
+        """
+        Get the serializer of the action, limited to the requested fields for lists.
+
+        :return: The serializer
+        :rtype: AppTemplateSerializer
+        """
+        kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_response_cache_scopes(self, request: Request) -> Optional[List[str]]:
+        """
+        Get the response cache scopes of a list or detail request, once per request.
+        Normal users without own AppTemplates share the cached public catalog,
+        all others also depend on their own AppTemplates.
+
+        :param Request request: The HTTP request object
+        :return: The scopes, or None if the response is not cached
+        :rtype: Optional[List[str]]
+        """
+        if hasattr(self, '_response_cache_scopes'):
+            return self._response_cache_scopes
+
+        user = request.myuser
+        public = request.query_params.get('public', None)
+        if request.permissions.can_list_all_app_templates and public is not None and public.lower() != 'true':
+            # Contains the private AppTemplates of all users, which no scope covers
+            scopes = None
+        else:
+            scopes = [PUBLIC_SCOPE]
+            own_scope = user_scope(user.id)
+            if app_template_response_cache.get_or_set(
+                    [own_scope], 'has-app-templates',
+                    lambda: AppTemplates.objects.filter(creator_id=user, deleted=False).exists()):
+                scopes.append(own_scope)
+        self._response_cache_scopes = scopes
+        return scopes
+
+    def get_cached_response_data(self, request: Request, compute: Callable[[], Any],
+                                 kind: str = 'data') -> Any:
+        """
+        Return the response data of a list or detail request from the response cache,
+        computing it on a miss.
+
+        :param Request request: The HTTP request object
+        :param Callable compute: Function computing the response data
+        :param str kind: Kind of the cached value, e.g. the response data or its ETag
+        :return: The cached or computed response data
+        :rtype: Any
+        """
+        scopes = self.get_response_cache_scopes(request)
+        if scopes is None:
+            return compute()
+        visibility = 'all' if request.permissions.can_list_all_app_templates else 'approved'
+        return app_template_response_cache.get_or_set(
+            scopes, f'{kind} {visibility} {request.build_absolute_uri()}', compute)
+
+    @override
+    def get_etag(self, queryset: QuerySet[AppTemplates]) -> Optional[str]:
+        """
+        Compute the ETag of a list or detail response, from the response cache if possible.
+        A cached ETag is invalidated together with the cached response, so a 304
+        to a repeated request doesn't query the database at all. Writes bypassing the
+        signals of AppTemplates, e.g. queryset updates, therefore have to invalidate the
+        response cache themselves, like delete_user does.
+
+        :param QuerySet queryset: The queryset of the response
+        :return: The quoted ETag, or None if the queryset is empty
+        :rtype: Optional[str]
+        """
+        compute_etag = super().get_etag
+        # The ETag depends on the user and the format, unlike the response data
+        kind = f'etag {self.request.myuser.id} {self.request.accepted_renderer.format}'
+        return self.get_cached_response_data(self.request, lambda: compute_etag(queryset), kind)
+
+    @override
+    def get_list_response(self, request: Request, *args, **kwargs) -> Response:
+        """
+        List the AppTemplates visible to the user, from the response cache if possible.
+        Called if the ETag of the list doesn't match.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the AppTemplates
+        :rtype: Response
+        """
+        list_app_templates = super().get_list_response
+        if self.is_streaming_requested():
+            # Streamed row by row, caching it would hold the whole list in memory
+            return list_app_templates(request, *args, **kwargs)
+        return Response(self.get_cached_response_data(
+            request, lambda: list_app_templates(request, *args, **kwargs).data))
+
+    @override
+    def get_detail_response(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Retrieve an AppTemplate visible to the user, from the response cache if possible.
+        Called if the ETag of the AppTemplate doesn't match.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the AppTemplate
+        :rtype: Response
+        """
+        retrieve_app_template = super().get_detail_response
+        return Response(self.get_cached_response_data(
+            request, lambda: retrieve_app_template(request, *args, **kwargs).data))
 
     @action(detail=True, methods=['patch'])
     def approve(self, request: Request, pk: str = None) -> Response:
@@ -144,6 +376,82 @@ class AppTemplateViewSet(viewsets.ModelViewSet):
             {"id": app_template.id, "public": app_template.public, "approved": app_template.approved},
             status=status.HTTP_200_OK)
 
+    def get_bulk_review_ids(self, request: Request) -> List[uuid.UUID]:
+        """
+        Read the ids of a bulk approval or rejection from the list 'ids' in the request body
+        and keep those of AppTemplates visible to the user.
+
+        :param Request request: The HTTP request object
+        :return: The ids of the request without duplicates, in the order of the request
+        :rtype: List[uuid.UUID]
+        :raises ValidationError: If the ids are not a non-empty list of UUIDs or too many
+        """
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids or not all(isinstance(id, str) for id in ids):
+            raise ValidationError('ids must be a non-empty list of UUIDs')
+        if len(ids) > MAX_BULK_REVIEW_IDS:
+            raise ValidationError(f'At most {MAX_BULK_REVIEW_IDS} AppTemplates can be reviewed at once')
+        try:
+            return list(dict.fromkeys(uuid.UUID(id) for id in ids))
+        except ValueError:
+            raise ValidationError('ids must be a non-empty list of UUIDs')
+
+    @action(detail=False, methods=['patch'], url_path='bulk/approve', url_name='bulk-approve')
+    def bulk_approve(self, request: Request) -> Response:
+        """
+        Approve several AppTemplates in one transaction, e.g. while working through the review queue.
+        The ids are passed as list 'ids' in the request body.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the approval status per id, in the order of the request
+        :rtype: Response
+        """
+        try:
+            ids = self.get_bulk_review_ids(request)
+        except ValidationError as e:
+            return Response({'error': e.message}, status=status.HTTP_400_BAD_REQUEST)
+
+        visible_ids = self.get_queryset().filter(id__in=ids).values_list('id', flat=True)
+        public_app_templates = approve_app_templates(visible_ids)
+        results = []
+        for id in ids:
+            public_app_template = public_app_templates.get(id)
+            if public_app_template is None:
+                results.append({"id": id, "status": status.HTTP_404_NOT_FOUND,
+                                "error": f"AppTemplate {id} not found."})
+            else:
+                results.append({"id": id, "status": status.HTTP_200_OK,
+                                "public_app_template": {"id": public_app_template.id,
+                                                        "approved": public_app_template.approved}})
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['patch'], url_path='bulk/reject', url_name='bulk-reject')
+    def bulk_reject(self, request: Request) -> Response:
+        """
+        Reject several AppTemplates in one transaction. Sets public and approved to false,
+        making the AppTemplates only visible for their creators. The ids are passed
+        as list 'ids' in the request body.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the rejection status per id, in the order of the request
+        :rtype: Response
+        """
+        try:
+            ids = self.get_bulk_review_ids(request)
+        except ValidationError as e:
+            return Response({'error': e.message}, status=status.HTTP_400_BAD_REQUEST)
+
+        visible_ids = self.get_queryset().filter(id__in=ids).values_list('id', flat=True)
+        rejected_ids = set(reject_app_templates(visible_ids))
+        results = []
+        for id in ids:
+            if id in rejected_ids:
+                results.append({"id": id, "status": status.HTTP_200_OK, "public": False, "approved": False})
+            else:
+                results.append({"id": id, "status": status.HTTP_404_NOT_FOUND,
+                                "error": f"AppTemplate {id} not found."})
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['get'], url_path='name/(?P<name>[^/.]+)\\/collision',
             name='check-name-collision')
     def check_name_collision(self, request: Request, name: str = None) -> Response:
@@ -155,7 +463,7 @@ class AppTemplateViewSet(viewsets.ModelViewSet):
         :return: HTTP response with collision status
         :rtype: Response
         """
-        collision, reason, context = check_name_collision(name)
+        collision, reason, context = check_name_collision_cached(name)
 
         response_object = {
             "name": name,
@@ -164,10 +472,55 @@ class AppTemplateViewSet(viewsets.ModelViewSet):
         }
         return Response(response_object, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['post'], url_path='name/collisions', url_name='check-name-collisions')
+    def check_name_collisions(self, request: Request) -> Response:
+        """
+        Check several names for collisions with existing and future AppTemplates at once,
+        e.g. for bulk imports. The names are passed as list 'names' in the request body.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the collision status per name, in the order of the request
+        :rtype: Response
+        """
+        names = request.data.get('names')
+        if not isinstance(names, list) or not names or not all(isinstance(name, str) for name in names):
+            return Response({'error': 'names must be a non-empty list of strings'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(names) > MAX_NAME_COLLISION_CHECKS:
+            return Response({'error': f'At most {MAX_NAME_COLLISION_CHECKS} names can be checked at once'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        collisions = check_name_collisions(names)
+        results = []
+        for name in names:
+            collision, reason, context = collisions[name]
+            results.append({"name": name, "collision": collision, "reason": reason.format(**context)})
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['GET'], url_path='review-queue', url_name='review-queue')
+    def review_queue(self, request: Request) -> Response:
+        """
+        List the AppTemplates waiting for approval (public but not approved), oldest first.
+        The queue is paginated by cursor and every page contains the total count of the queue.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the count, the next link and a page of the queue
+        :rtype: Response
+        """
+        # Served by the index app_template_review_idx, without the filters of get_queryset.
+        # Compared with Value, as Django renders approved=False as NOT approved, which SQLite can't look up
+        queryset = AppTemplates.objects.filter(deleted=Value(False), public=Value(True),
+                                               approved=Value(False))
+        paginator = ReviewQueuePagination()
+        page = paginator.paginate_queryset(queryset.prefetch_related(*APP_TEMPLATE_PREFETCH), request, self)
+        serializer = AppTemplateSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     @action(detail=False, methods=['GET'], url_path='favorites')
     def favorites(self, request: Request) -> Response:
         """
         Lists all AppTemplate, which are favorites of the current user.
+        Like the list, the fields can be limited with the fields or view query parameter.
 
         :param Request request: The HTTP request object
         :return: HTTP response with the list of favorite AppTemplates
@@ -180,7 +533,7 @@ class AppTemplateViewSet(viewsets.ModelViewSet):
         # Filter for the list of app_template_ids
         app_templates = self.get_queryset().filter(id__in=favorites_app_template_ids)
 
-        serializer = AppTemplateSerializer(app_templates, many=True)
+        serializer = AppTemplateSerializer(app_templates, many=True, fields=self.get_requested_fields())
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @override
@@ -196,8 +549,7 @@ class AppTemplateViewSet(viewsets.ModelViewSet):
         """
         app_template = self.get_object()
         user = request.myuser
-        if (app_template.approved and
-                not has_access_level(user, 'app-template-delete-approved', 'DELETE')):
+        if app_template.approved and not request.permissions.can_delete_approved_app_templates:
             return Response(
                 {'error': f'Access level of user {user.id} not sufficient'
                           f' to delete approved AppTemplates'}, status=403)
@@ -206,8 +558,9 @@ class AppTemplateViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
-class FavoritesViewSet(viewsets.ModelViewSet):
+class FavoritesViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = FavoritesSerializer
+    etag_timestamp_field = 'created_at'
 
     def get_queryset(self) -> QuerySet[Favorites]:
         """
@@ -244,16 +597,29 @@ class FavoritesViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Favorite not found."}, status=status.HTTP_404_NOT_FOUND)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, StreamingListMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling Users model operations.
 
     This ViewSet provides default CRUD operations for the Users model.
+    List and detail responses carry ETags and are answered with 304 if unchanged.
+    The list is streamed if the client accepts NDJSON.
 
     :param serializer_class: Serializer class for Users model
     """
     serializer_class = UserSerializer
 
+    @override
+    def get_etag_aggregates(self) -> Dict[str, Any]:
+        """
+        Get the aggregates of the Users for the ETag, including the latest
+        change of their roles, as the role is nested in every User.
+
+        :return: Dictionary of aggregate expressions
+        :rtype: Dict[str, Any]
+        """
+        return {**super().get_etag_aggregates(), 'role_modified': Max('role_id__updated_at')}
+
     @override
     def get_queryset(self) -> QuerySet[Users]:
         """
@@ -264,12 +630,11 @@ class UserViewSet(viewsets.ModelViewSet):
         :rtype: QuerySet
         """
         user = self.request.myuser
-        user_access_level = user.role_id.access_level
 
-        # Only consider Users that are not deleted
-        queryset = Users.objects.filter(deleted=False)
+        # Only consider Users that are not deleted, with the role nested in every User
+        queryset = Users.objects.filter(deleted=False).select_related('role_id')
 
-        if user_access_level < REQUIRED_ACCESS_LEVELS[('user-list-all', 'GET')]:
+        if not self.request.permissions.can_list_all_users:
             # Users with insufficient access level can only see themselves
             queryset = queryset.filter(id=user.id)
 
@@ -299,14 +664,100 @@ class UserViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_409_CONFLICT
             )
 
-class RoleViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def import_roster(self, request: Request) -> Response:
+        """
+        Create the Users of an uploaded roster before their first login.
+        The roster is a CSV file (e.g. a Keystone project membership export)
+        uploaded as multipart form field 'roster' and read line by line.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the number of created, skipped and invalid rows
+        :rtype: Response
+        """
+        roster = request.FILES.get('roster')
+        if roster is None:
+            return Response({'error': 'Roster file missing'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = import_users(read_roster(codecs.iterdecode(roster, 'utf-8-sig')))
+        except ValidationError as e:
+            return Response({'error': e.message}, status=status.HTTP_400_BAD_REQUEST)
+        except UnicodeDecodeError:
+            return Response({'error': 'Roster is not UTF-8 encoded'}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info(f"Imported roster: {result}")
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+class RoleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling Roles model operations.
 
     This ViewSet provides default CRUD operations for the Roles model.
+    List and detail responses carry ETags and are answered with 304 if unchanged.
 
     :param queryset: Queryset of all Roles instances
     :param serializer_class: Serializer class for Roles model
     """
     queryset = Roles.objects.all()
     serializer_class = RoleSerializer
+
+
+class MetricsViewSet(viewsets.ViewSet):
+    """
+    ViewSet for exposing runtime metrics of the current worker process,
+    e.g. the state of the Keystone circuit breaker and the in-process caches.
+    """
+
+    def list(self, request: Request) -> Response:
+        """
+        List the metrics of the current worker process.
+
+        :param Request request: The HTTP request object
+        :return: HTTP response with the metrics
+        :rtype: Response
+        """
+        return Response({
+            'keystone': keystone_metrics(),
+            'user_cache': user_cache.stats(),
+            'app_template_cache': app_template_response_cache.stats(),
+        }, status=status.HTTP_200_OK)
+
+
+@require_safe
+def health_live(request: HttpRequest) -> JsonResponse:
+    """
+    Liveness check for load balancers. Served without authentication
+    and answered without touching Keystone or the database.
+
+    :param HttpRequest request: The HTTP request object
+    :return: HTTP response with the liveness status
+    :rtype: JsonResponse
+    """
+    return JsonResponse({'status': 'alive'})
+
+
+@require_safe
+def health_ready(request: HttpRequest) -> JsonResponse:
+    """
+    Readiness check for load balancers. Served without authentication.
+    The database is checked with a plain query, the reachability of Keystone
+    is taken from the circuit breaker of this worker instead of calling Keystone.
+
+    :param HttpRequest request: The HTTP request object
+    :return: HTTP response with the readiness status and the individual checks
+    :rtype: JsonResponse
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        database = True
+    except DatabaseError:
+        logger.error('Readiness check failed: database not reachable')
+        database = False
+
+    checks = {'database': database, 'keystone': keystone_reachable()}
+    ready = all(checks.values())
+    return JsonResponse({'status': 'ready' if ready else 'not ready', 'checks': checks},
+                        status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
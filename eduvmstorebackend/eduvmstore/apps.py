@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class EduvmstoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'eduvmstore'
+
+    def ready(self):
+        # Configure new database connections
+        from eduvmstore.db import backends  # noqa: F401
+        # Connect the signal handlers invalidating the in-process caches
+        from eduvmstore.db import signals  # noqa: F401
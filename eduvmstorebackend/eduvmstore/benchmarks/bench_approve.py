@@ -0,0 +1,86 @@
+import uuid
+
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from eduvmstore.benchmarks.utils import measure, report
+from eduvmstore.db.models import AppTemplates, Roles, Users
+from eduvmstore.db.operations.app_templates import (APPROVAL_COPIED_MODELS, approve_app_template,
+                                                    approve_app_templates)
+
+ITERATIONS = 50
+QUEUE_SIZE = 50
+
+
+@transaction.atomic
+def approve_app_template_per_row(id):
+    # Previous approve_app_template: two fetches and one INSERT per copied row
+    original_app_template = AppTemplates.objects.get(id=id, deleted=False)
+    public_app_template = AppTemplates.objects.get(id=original_app_template.id, deleted=False)
+    public_app_template.pk = None
+    public_app_template.name = f"{original_app_template.name}-V{original_app_template.version}"
+    public_app_template.approved = True
+    public_app_template.save()
+    for model in APPROVAL_COPIED_MODELS:
+        for row in model.objects.filter(app_template_id=id):
+            row.pk = None
+            row.app_template_id = public_app_template
+            row.save()
+    original_app_template.public = False
+    original_app_template.version += 1
+    original_app_template.save()
+    return public_app_template
+
+
+class ApproveBenchmark(TransactionTestCase):
+    """
+    Compare approving an AppTemplate with per-row copies of its attributes and
+    security groups against the set-based approval, for few and many rows.
+    """
+
+    def create_app_template(self, user, name, rows):
+        app_template = AppTemplates.objects.create(
+            image_id=uuid.uuid4(), name=name, short_description='Course VM', description='',
+            creator_id=user, public=True, fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+        for model in APPROVAL_COPIED_MODELS:
+            model.objects.bulk_create([model(app_template_id=app_template, name=f'Row{i}')
+                                       for i in range(rows)])
+        return app_template
+
+    def test_approve_latency(self):
+        role = Roles.objects.create(name='EduVMStoreAdmin', access_level=8000)
+        user = Users.objects.create(role_id=role)
+
+        results = {}
+        statements = {}
+        for rows in [2, 50]:
+            for label, approve in [('per row', approve_app_template_per_row),
+                                   ('set-based', approve_app_template)]:
+                app_template = self.create_app_template(user, f'{label} {rows}', rows)
+                with CaptureQueriesContext(connection) as queries:
+                    approve(app_template.id)
+                statements[f'{label}, {rows} rows per relation'] = len(queries.captured_queries)
+                results[f'{label}, {rows} rows per relation'] = measure(
+                    lambda: approve(app_template.id), ITERATIONS)
+
+        report('Approval of an AppTemplate', results)
+        print(f"{'variant':<40}{'statements':>10}")
+        for variant, count in statements.items():
+            print(f'{variant:<40}{count:>10}')
+
+    def test_bulk_approve_latency(self):
+        role = Roles.objects.create(name='EduVMStoreAdmin', access_level=8000)
+        user = Users.objects.create(role_id=role)
+        queues = {label: [self.create_app_template(user, f'{label} {i}', 5).id for i in range(QUEUE_SIZE)]
+                  for label in ['one by one', 'bulk']}
+
+        def approve_one_by_one():
+            for id in queues['one by one']:
+                approve_app_template(id)
+
+        results = {
+            'one by one': measure(approve_one_by_one, 10),
+            'bulk': measure(lambda: approve_app_templates(queues['bulk']), 10),
+        }
+        report(f'Approval of {QUEUE_SIZE} AppTemplates with 5 rows per relation', results)
@@ -0,0 +1,59 @@
+import uuid
+from unittest.mock import patch
+
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from eduvmstore.benchmarks.utils import measure, report
+from eduvmstore.db.models import AppTemplateAccountAttributes, AppTemplates, Roles, Users
+from eduvmstore.db.operations.app_templates import app_template_response_cache
+from eduvmstore.db.operations.users import user_cache
+
+CATALOG_SIZE = 1000
+USER_COUNT = 1000
+ITERATIONS = 20
+
+
+class ConditionalGetBenchmark(TransactionTestCase):
+    """
+    Compare polling unchanged lists with full responses and with If-None-Match (304).
+    The response cache is cleared before every AppTemplate request, so the 304 includes
+    computing the ETag.
+    """
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_poll_latency(self, mock_validate_token):
+        role = Roles.objects.create(name='EduVMStoreAdmin', access_level=7000)
+        admin = Users.objects.create(role_id=role)
+        Users.objects.bulk_create([Users(role_id=role) for _ in range(USER_COUNT)])
+        app_templates = AppTemplates.objects.bulk_create([
+            AppTemplates(image_id=uuid.uuid4(), name=f'Template {i}', short_description='Course VM',
+                         description='Description ' * 20, creator_id=admin, public=True, approved=True,
+                         fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+            for i in range(CATALOG_SIZE)])
+        AppTemplateAccountAttributes.objects.bulk_create([
+            AppTemplateAccountAttributes(app_template_id=app_template, name='Username')
+            for app_template in app_templates])
+
+        mock_validate_token.return_value = {'id': admin.id, 'name': 'Admin'}
+        user_cache.reset()
+        client = APIClient()
+
+        def poller(url, etag=None):
+            headers = {} if etag is None else {'HTTP_IF_NONE_MATCH': etag}
+
+            def get():
+                app_template_response_cache.clear()
+                response = client.get(url, HTTP_X_AUTH_TOKEN='valid_token', **headers)
+                assert response.status_code == (200 if etag is None else 304)
+            return get
+
+        results = {}
+        for name, url in (('app-templates', reverse('app-template-list')), ('users', reverse('user-list'))):
+            etag = client.get(url, HTTP_X_AUTH_TOKEN='valid_token')['ETag']
+            results[f'{name} 200'] = measure(poller(url), ITERATIONS)
+            results[f'{name} 304'] = measure(poller(url, etag), ITERATIONS)
+
+        report(f'Poll {CATALOG_SIZE} AppTemplates and {USER_COUNT} users', results)
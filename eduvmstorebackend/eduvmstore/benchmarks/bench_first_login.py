@@ -0,0 +1,67 @@
+import uuid
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from eduvmstore.benchmarks.utils import measure_concurrently, report
+from eduvmstore.db.models import Roles, Users
+from eduvmstore.db.operations.roles import role_cache
+from eduvmstore.db.operations.users import user_cache
+from eduvmstore.middleware.authentication_middleware import KeystoneAuthenticationMiddleware, token_cache
+from eduvmstore.tests.stub_keystone import StubKeystone
+
+CONCURRENT_LOGINS = 200
+
+
+class FirstLoginBenchmark(TransactionTestCase):
+    """
+    Measure the request latency when a whole course logs in for the first time
+    at once, and verify that every identity is provisioned exactly once.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.keystone = StubKeystone().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.keystone.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        token_cache.reset()
+        role_cache.reset()
+        user_cache.reset()
+
+    def test_concurrent_first_logins(self):
+        identities = [str(uuid.uuid4()) for _ in range(CONCURRENT_LOGINS)]
+        for user_id in identities:
+            self.keystone.add_token(user_id, user_id)
+
+        middleware = KeystoneAuthenticationMiddleware(lambda request: HttpResponse())
+        request_factory = RequestFactory()
+        statuses = []
+
+        def login(token):
+            try:
+                response = middleware(
+                    request_factory.get(reverse('app-template-list'), HTTP_X_AUTH_TOKEN=token))
+                statuses.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        with override_settings(OPENSTACK={**settings.OPENSTACK, 'auth_url': self.keystone.auth_url}):
+            first_logins = measure_concurrently(login, identities)
+            repeated_logins = measure_concurrently(login, identities)
+
+        report(f'Concurrent logins ({CONCURRENT_LOGINS} identities)', {
+            'first login (provisioning)': first_logins,
+            'repeated login (cached)': repeated_logins,
+        })
+        self.assertEqual(statuses, [200] * CONCURRENT_LOGINS * 2)
+        self.assertEqual(Users.objects.count(), CONCURRENT_LOGINS)
+        self.assertEqual(Roles.objects.count(), 1)
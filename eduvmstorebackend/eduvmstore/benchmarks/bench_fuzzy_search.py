@@ -0,0 +1,94 @@
+import random
+import time
+import tracemalloc
+import uuid
+
+from django.test import TransactionTestCase
+
+from eduvmstore.benchmarks.utils import measure, report
+from eduvmstore.db.models import AppTemplates, Roles, Users
+from eduvmstore.db.search import fuzzy_search_app_templates, get_fuzzy_index, reset_fuzzy_index
+from eduvmstore.utils.trigram_index import TrigramIndex, trigrams
+
+CATALOG_SIZE = 100_000
+ITERATIONS = 50
+WORDS = (
+    'jupyter', 'notebook', 'python', 'java', 'spring', 'boot', 'docker', 'kubernetes', 'cluster',
+    'postgres', 'mysql', 'mongodb', 'redis', 'kafka', 'spark', 'hadoop', 'linux', 'ubuntu', 'debian',
+    'windows', 'react', 'angular', 'django', 'flask', 'nginx', 'apache', 'tomcat', 'rust', 'golang',
+    'haskell', 'prolog', 'matlab', 'octave', 'latex', 'blender', 'unity', 'android', 'eclipse', 'intellij',
+    'vscode', 'tensorflow', 'pytorch', 'pandas', 'scipy', 'security', 'network', 'database', 'compiler',
+    'robotics', 'statistics', 'analysis', 'machine', 'learning', 'web', 'development', 'embedded',
+    'systems', 'operating', 'distributed', 'cloud',
+)
+SEARCHES = ('Jupiter Notebok', 'pyton', 'kubernets clustr', 'postgress', 'haskel prolog', 'xyzzy')
+
+
+def brute_force_search(documents, query, min_similarity):
+    # Compare the query to every document, as without an index
+    query_trigrams = trigrams(query)
+    matches = []
+    for key, document_trigrams in documents:
+        similarity = len(query_trigrams & document_trigrams) / len(query_trigrams)
+        if similarity >= min_similarity:
+            matches.append((similarity, key))
+    return sorted(matches, reverse=True)[:50]
+
+
+class FuzzySearchBenchmark(TransactionTestCase):
+    """
+    Measure building the trigram index for 100k AppTemplate names and
+    compare fuzzy searches through the index with comparing the search
+    to every name.
+    """
+
+    def tearDown(self):
+        reset_fuzzy_index()
+
+    def test_fuzzy_search_latency(self):
+        role = Roles.objects.create(name='EduVMStoreUser', access_level=2000)
+        user = Users.objects.create(role_id=role)
+        random.seed(CATALOG_SIZE)
+        app_templates = []
+        for i in range(CATALOG_SIZE):
+            words = random.sample(WORDS, 3)
+            app_templates.append(AppTemplates(
+                image_id=uuid.uuid4(), name=f"{words[0].title()} {words[1].title()} {i}",
+                short_description=f"{words[2]} course VM", description='', creator_id=user,
+                public=True, approved=True, fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0))
+        AppTemplates.objects.bulk_create(app_templates, batch_size=1000)
+        texts = [(str(app_template.id), f'{app_template.name} {app_template.short_description}')
+                 for app_template in app_templates]
+        del app_templates
+
+        reset_fuzzy_index()
+        start = time.perf_counter()
+        index = get_fuzzy_index()
+        build_seconds = time.perf_counter() - start
+
+        tracemalloc.start()
+        standalone = TrigramIndex()
+        for key, text in texts:
+            standalone.add(key, text)
+        memory_mb = tracemalloc.get_traced_memory()[0] / 2 ** 20
+        tracemalloc.stop()
+        del standalone
+        print(f'\nFuzzy search index ({CATALOG_SIZE} AppTemplates)')
+        print(f'build from database: {build_seconds:.3f} s, memory: {memory_mb:.1f} MB')
+
+        queryset = AppTemplates.objects.filter(deleted=False)
+        results = {}
+        for search in SEARCHES:
+            results[f'index "{search}"'] = measure(
+                lambda: index.search(search, limit=200, min_similarity=0.5), ITERATIONS)
+            results[f'api queryset "{search}"'] = measure(
+                lambda: list(fuzzy_search_app_templates(queryset, search)[:50]), ITERATIONS)
+        results['index add/replace'] = measure(
+            lambda: index.add(texts[0][0], 'Jupyter Notebook 0 python course VM'), ITERATIONS)
+
+        # Baseline without index, measured last as the trigram sets of all names slow down garbage collection
+        documents = [(key, trigrams(text)) for key, text in texts]
+        for search in SEARCHES:
+            results[f'scan "{search}"'] = measure(
+                lambda: brute_force_search(documents, search, 0.5), 5)
+        report(f'Fuzzy AppTemplate search ({CATALOG_SIZE} AppTemplates)', results)
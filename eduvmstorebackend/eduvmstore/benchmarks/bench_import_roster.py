@@ -0,0 +1,36 @@
+import time
+import uuid
+
+from django.test import TransactionTestCase
+
+from eduvmstore.db.models import Users
+from eduvmstore.db.operations.roles import role_cache
+from eduvmstore.db.operations.users import create_user, import_users
+
+ROSTER_SIZE = 5000
+
+
+class ImportRosterBenchmark(TransactionTestCase):
+    """
+    Compare creating the users of a roster one by one (as on their first login)
+    with the batched roster import.
+    """
+
+    def setUp(self):
+        role_cache.reset()
+
+    def test_roster_import_duration(self):
+        rows = [{'id': str(uuid.uuid4()), 'keystone_role_name': 'member'} for _ in range(ROSTER_SIZE)]
+        start = time.perf_counter()
+        for row in rows:
+            create_user(dict(row))
+        one_by_one = time.perf_counter() - start
+
+        Users.objects.all().delete()
+        result = import_users(rows)
+
+        print(f'\nRoster import ({ROSTER_SIZE} users)')
+        print(f"{'variant':<40}{'seconds':>10}")
+        print(f"{'create_user per row':<40}{one_by_one:>10.3f}")
+        print(f"{'import_users (batched)':<40}{result['duration_seconds']:>10.3f}")
+        self.assertEqual(result['created'], ROSTER_SIZE)
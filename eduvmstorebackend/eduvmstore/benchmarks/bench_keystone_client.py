@@ -0,0 +1,44 @@
+import requests
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from eduvmstore.benchmarks.utils import measure, report
+from eduvmstore.tests.stub_keystone import StubKeystone
+from eduvmstore.utils.keystone_client import KeystoneClient
+
+ITERATIONS = 500
+
+
+class KeystoneClientBenchmark(SimpleTestCase):
+    """
+    Compare the token validation latency of a new connection per request
+    (previous behavior) with the pooled keep-alive Keystone client.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.keystone = StubKeystone().start()
+        cls.keystone.add_token("valid_token", "user_id")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.keystone.stop()
+        super().tearDownClass()
+
+    def test_token_validation_latency(self):
+        with override_settings(OPENSTACK={**settings.OPENSTACK, 'auth_url': self.keystone.auth_url}):
+            url = f"http://{settings.OPENSTACK['auth_url']}v3/auth/tokens"
+            headers = {'X-Auth-Token': "valid_token", 'X-Subject-Token': "valid_token"}
+            client = KeystoneClient(pool_size=10, connect_timeout=3, read_timeout=10, max_retries=2)
+
+            unpooled = measure(lambda: requests.get(url, headers=headers, timeout=10), ITERATIONS)
+            self.keystone.reset()
+            pooled = measure(lambda: client.validate_token("valid_token"), ITERATIONS)
+            client.close()
+
+        report(f'Keystone token validation ({ITERATIONS} requests)', {
+            'requests.get (new connection)': unpooled,
+            'KeystoneClient (pooled keep-alive)': pooled,
+        })
+        self.assertEqual(len(self.keystone.connections), 1)
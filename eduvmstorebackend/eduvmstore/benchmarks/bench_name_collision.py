@@ -0,0 +1,56 @@
+import uuid
+
+from django.test import TransactionTestCase
+
+from eduvmstore.benchmarks.utils import measure, report
+from eduvmstore.db.models import AppTemplates, Roles, Users
+from eduvmstore.db.operations.app_templates import (check_name_collision, check_name_collision_cached,
+                                                    check_name_collisions, free_name_cache)
+from eduvmstore.utils.string_utils import create_version_pattern, split_version_suffix
+
+CATALOG_SIZE = 100_000
+ITERATIONS = 50
+NAMES = ('Template 500', 'Template 501', 'Unused name')
+# Names of a bulk import, half of them taken
+BATCH_NAMES = [f'Template {i}' for i in range(99_900, 100_100)]
+
+
+def regex_versioned_name_exists(name):
+    # Previous check for versioned templates, REGEXP is a Python callback per row on SQLite
+    return AppTemplates.objects.filter(name__regex=create_version_pattern(name), deleted=False).exists()
+
+
+class NameCollisionBenchmark(TransactionTestCase):
+    """
+    Compare the check for versioned templates with the same base name using
+    a regex on the name with the lookup of the indexed base name, and checking
+    the names of a bulk import one by one with a single batch check.
+    """
+
+    def test_name_collision_latency(self):
+        role = Roles.objects.create(name='EduVMStoreUser', access_level=2000)
+        user = Users.objects.create(role_id=role)
+        app_templates = []
+        for i in range(CATALOG_SIZE):
+            # Every other AppTemplate is an approved version
+            name = f'Template {i}-V1' if i % 2 == 0 else f'Template {i}'
+            base_name, name_version = split_version_suffix(name)
+            app_templates.append(AppTemplates(
+                image_id=uuid.uuid4(), name=name, base_name=base_name, name_version=name_version,
+                short_description='Course VM', description='', creator_id=user,
+                fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0))
+        AppTemplates.objects.bulk_create(app_templates, batch_size=1000)
+
+        results = {}
+        for name in NAMES:
+            results[f'regex "{name}"'] = measure(lambda: regex_versioned_name_exists(name), 5)
+            results[f'base_name "{name}"'] = measure(lambda: check_name_collision(name), ITERATIONS)
+
+        free_name_cache.reset()
+        results['cached "Unused name"'] = measure(
+            lambda: check_name_collision_cached('Unused name'), ITERATIONS)
+        results[f'{len(BATCH_NAMES)} names one by one'] = measure(
+            lambda: [check_name_collision(name) for name in BATCH_NAMES], 5)
+        results[f'{len(BATCH_NAMES)} names in batch'] = measure(
+            lambda: check_name_collisions(BATCH_NAMES), ITERATIONS)
+        report(f'Name collision check ({CATALOG_SIZE} AppTemplates)', results)
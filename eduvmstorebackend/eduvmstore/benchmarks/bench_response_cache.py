@@ -0,0 +1,65 @@
+import uuid
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from eduvmstore.benchmarks.utils import measure, report
+from eduvmstore.db.models import AppTemplateAccountAttributes, AppTemplates, Roles, Users
+from eduvmstore.db.operations.app_templates import app_template_response_cache
+from eduvmstore.db.operations.users import user_cache
+
+CATALOG_SIZE = 1000
+ITERATIONS = 50
+BACKENDS = {
+    'locmem': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench'},
+    'database': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'bench_cache'},
+}
+
+
+class ResponseCacheBenchmark(TransactionTestCase):
+    """
+    Compare listing the public catalog of a normal user without the response cache
+    with cache hits of the locmem and the (SQLite) database backend.
+    """
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_list_latency(self, mock_validate_token):
+        role = Roles.objects.create(name='EduVMStoreUser', access_level=2000)
+        user = Users.objects.create(role_id=role)
+        creator = Users.objects.create(role_id=role)
+        app_templates = AppTemplates.objects.bulk_create([
+            AppTemplates(image_id=uuid.uuid4(), name=f'Template {i}', short_description='Course VM',
+                         description='Description ' * 20, creator_id=creator, public=True, approved=True,
+                         fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+            for i in range(CATALOG_SIZE)])
+        AppTemplateAccountAttributes.objects.bulk_create([
+            AppTemplateAccountAttributes(app_template_id=app_template, name='Username')
+            for app_template in app_templates])
+
+        mock_validate_token.return_value = {'id': user.id, 'name': 'User'}
+        user_cache.reset()
+        client = APIClient()
+        url = reverse('app-template-list')
+
+        def get():
+            response = client.get(url, HTTP_X_AUTH_TOKEN='valid_token')
+            assert len(response.data) == CATALOG_SIZE
+
+        def get_uncached():
+            app_template_response_cache.clear()
+            get()
+
+        results = {}
+        for backend, cache in BACKENDS.items():
+            with override_settings(CACHES={'default': BACKENDS['locmem'], 'app_templates': cache}):
+                call_command('createcachetable')
+                if backend == 'locmem':
+                    results['uncached'] = measure(get_uncached, ITERATIONS)
+                get()
+                results[f'{backend} hit'] = measure(get, ITERATIONS)
+
+        report(f'List of {CATALOG_SIZE} public AppTemplates', results)
@@ -0,0 +1,48 @@
+import uuid
+from datetime import timedelta
+
+from django.db.models import Value
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from eduvmstore.benchmarks.utils import measure, report
+from eduvmstore.db.models import AppTemplates, Roles, Users
+
+CATALOG_SIZE = 100_000
+# Every 50th AppTemplate waits for approval
+PENDING_EVERY = 50
+PAGE_SIZE = 50
+ITERATIONS = 50
+
+
+class ReviewQueueBenchmark(TransactionTestCase):
+    """
+    Compare the first page and the count of pending AppTemplates through the list filters
+    (public=true&approved=false) with the review queue query on app_template_review_idx.
+    """
+
+    def test_review_queue_latency(self):
+        role = Roles.objects.create(name='EduVMStoreAdmin', access_level=8000)
+        user = Users.objects.create(role_id=role)
+        created_at = timezone.now()
+        AppTemplates.objects.bulk_create([
+            AppTemplates(image_id=uuid.uuid4(), name=f'Template {i}', short_description='Course VM',
+                         description='', creator_id=user, public=True, approved=i % PENDING_EVERY != 0,
+                         created_at=created_at - timedelta(seconds=i),
+                         fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+            for i in range(CATALOG_SIZE)], batch_size=1000)
+
+        # Previous list filters, Django renders the booleans as (NOT) column expressions
+        list_filters = AppTemplates.objects.filter(deleted=False).filter(public=True).filter(approved=False)
+        review_queue = AppTemplates.objects.filter(deleted=Value(False), public=Value(True),
+                                                   approved=Value(False))
+        results = {
+            'list filters page': measure(
+                lambda: list(list_filters.order_by('created_at', 'id')[:PAGE_SIZE + 1]), ITERATIONS),
+            'review queue page': measure(
+                lambda: list(review_queue.order_by('created_at', 'id')[:PAGE_SIZE + 1]), ITERATIONS),
+            'list filters count': measure(lambda: list_filters.count(), ITERATIONS),
+            'review queue count': measure(lambda: review_queue.count(), ITERATIONS),
+        }
+        report(f'Review queue of {CATALOG_SIZE // PENDING_EVERY} pending in {CATALOG_SIZE} AppTemplates',
+               results)
@@ -0,0 +1,81 @@
+import random
+import uuid
+
+from django.db.models import Q
+from django.test import TransactionTestCase
+
+from eduvmstore.benchmarks.utils import measure, report
+from eduvmstore.db.models import AppTemplates, Roles, Users
+from eduvmstore.db.search import rebuild_search_index, search_app_templates
+
+CATALOG_SIZES = (10_000, 100_000)
+ITERATIONS = 20
+# Subjects appear in names and short descriptions, like the software of a course VM
+SUBJECTS = [f'subject{i}' for i in range(500)]
+# Filler words of the long descriptions
+VOCABULARY = [f'word{i}' for i in range(5000)]
+SEARCHES = (
+    'subject42',  # prefix of 11 subjects, ~8% of the catalog
+    'subject42 subject7',  # both subjects, a few AppTemplates
+    'subject49',  # prefix of subject49 and subject490-499
+    'course',  # every AppTemplate, worst case for ranking
+    'notfound',
+)
+
+
+def icontains_search(queryset, search):
+    # Previous substring search of AppTemplateViewSet.get_queryset
+    return queryset.filter(
+        Q(name__icontains=search) |
+        Q(description__icontains=search) |
+        Q(short_description__icontains=search) |
+        Q(instantiation_notice__icontains=search) |
+        Q(id__icontains=search)
+    )
+
+
+class SearchBenchmark(TransactionTestCase):
+    """
+    Compare the latency of the substring search with the full-text search at
+    growing catalog sizes, for the first page (50 results) and for counting
+    all matches. Without pagination the list endpoint returns all matches, so
+    the count shows the cost of filtering the whole catalog. The first page of
+    the substring search is cheap for frequent terms, because the scan stops
+    after 50 unordered matches, while the full-text search ranks all matches.
+    """
+
+    def seed(self, user, start, stop):
+        random.seed(stop)
+        app_templates = []
+        for i in range(start, stop):
+            subjects = random.sample(SUBJECTS, 4)
+            app_templates.append(AppTemplates(
+                image_id=uuid.uuid4(), name=f"{subjects[0]} {subjects[1]} {i}",
+                short_description=f"{subjects[0]} and {subjects[1]} course VM",
+                description=' '.join(random.choices(VOCABULARY, k=60)),
+                instantiation_notice=f"Connect and start {subjects[2]} {subjects[3]}",
+                creator_id=user, public=True, approved=True,
+                fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0))
+        AppTemplates.objects.bulk_create(app_templates, batch_size=1000)
+        rebuild_search_index()
+
+    def test_search_latency(self):
+        role = Roles.objects.create(name='EduVMStoreUser', access_level=2000)
+        user = Users.objects.create(role_id=role)
+        seeded = 0
+        for catalog_size in CATALOG_SIZES:
+            self.seed(user, seeded, catalog_size)
+            seeded = catalog_size
+            queryset = AppTemplates.objects.filter(deleted=False)
+
+            results = {}
+            for search in SEARCHES:
+                results[f'icontains "{search}" page'] = measure(
+                    lambda: list(icontains_search(queryset, search)[:50]), ITERATIONS)
+                results[f'fts5 "{search}" page'] = measure(
+                    lambda: list(search_app_templates(queryset, search)[:50]), ITERATIONS)
+                results[f'icontains "{search}" count'] = measure(
+                    lambda: icontains_search(queryset, search).count(), ITERATIONS)
+                results[f'fts5 "{search}" count'] = measure(
+                    lambda: search_app_templates(queryset, search).count(), ITERATIONS)
+            report(f'AppTemplate search ({catalog_size} AppTemplates)', results)
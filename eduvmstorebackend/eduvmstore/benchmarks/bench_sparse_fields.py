@@ -0,0 +1,68 @@
+import uuid
+from unittest.mock import patch
+
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from eduvmstore.benchmarks.utils import measure, report
+from eduvmstore.db.models import (AppTemplateAccountAttributes, AppTemplateInstantiationAttributes,
+                                  AppTemplates, AppTemplateSecurityGroups, Roles, Users)
+from eduvmstore.db.operations.app_templates import app_template_response_cache
+from eduvmstore.db.operations.users import user_cache
+
+CATALOG_SIZE = 1000
+ITERATIONS = 20
+SCRIPT = '#cloud-config\npackages:\n' + '  - package-with-a-long-name\n' * 300
+VARIANTS = {
+    'full': {},
+    'view=summary': {'view': 'summary'},
+    'fields=name,short_description': {'fields': 'name,short_description'},
+}
+
+
+class SparseFieldsBenchmark(TransactionTestCase):
+    """
+    Compare the payload size and latency of the full list of a catalog with large
+    cloud-init scripts with the summary representation and a sparse fieldset.
+    The response cache is cleared before every request.
+    """
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_list_payload_and_latency(self, mock_validate_token):
+        role = Roles.objects.create(name='EduVMStoreUser', access_level=2000)
+        user = Users.objects.create(role_id=role)
+        app_templates = AppTemplates.objects.bulk_create([
+            AppTemplates(image_id=uuid.uuid4(), name=f'Template {i}', short_description='Course VM',
+                         description='Description of the course VM. ' * 60,
+                         instantiation_notice='Log in with the account below. ' * 30, script=SCRIPT,
+                         creator_id=user, public=True, approved=True,
+                         fixed_ram_gb=4.0, fixed_disk_gb=40.0, fixed_cores=2.0)
+            for i in range(CATALOG_SIZE)])
+        for model, name in ((AppTemplateInstantiationAttributes, 'JavaVersion'),
+                            (AppTemplateAccountAttributes, 'Username'),
+                            (AppTemplateSecurityGroups, 'default')):
+            model.objects.bulk_create([model(app_template_id=app_template, name=name)
+                                       for app_template in app_templates])
+
+        mock_validate_token.return_value = {'id': user.id, 'name': 'User'}
+        user_cache.reset()
+        client = APIClient()
+        url = reverse('app-template-list')
+
+        payloads = {}
+        results = {}
+        for variant, params in VARIANTS.items():
+            def get():
+                app_template_response_cache.clear()
+                response = client.get(url, params, HTTP_X_AUTH_TOKEN='valid_token')
+                assert len(response.data) == CATALOG_SIZE
+                payloads[variant] = len(response.content)
+
+            results[variant] = measure(get, ITERATIONS)
+
+        report(f'List of {CATALOG_SIZE} AppTemplates with {len(SCRIPT)} byte scripts', results)
+        print(f"{'variant':<40}{'payload KB':>10}")
+        for variant, size in payloads.items():
+            print(f'{variant:<40}{size / 1024:>10.1f}')
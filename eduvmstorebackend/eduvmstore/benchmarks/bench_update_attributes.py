@@ -0,0 +1,56 @@
+import uuid
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from eduvmstore.api.serializers import AppTemplateSerializer
+from eduvmstore.benchmarks.utils import measure, report
+from eduvmstore.db.models import AppTemplateAccountAttributes, AppTemplates, Roles, Users
+
+ATTRIBUTE_COUNT = 50
+ITERATIONS = 50
+
+
+def recreate_account_attributes(app_template, account_attributes_data):
+    # Previous update of AppTemplateSerializer: delete all rows, insert one by one
+    AppTemplateAccountAttributes.objects.filter(app_template_id=app_template).delete()
+    for account_attribute_data in account_attributes_data:
+        AppTemplateAccountAttributes.objects.create(app_template_id=app_template, **account_attribute_data)
+
+
+class UpdateAttributesBenchmark(TransactionTestCase):
+    """
+    Compare recreating all account attributes of an AppTemplate on update
+    with writing only the changed ones, for an edit that keeps all attributes
+    and one that changes a single attribute.
+    """
+
+    def test_update_attributes_latency(self):
+        role = Roles.objects.create(name='EduVMStoreUser', access_level=2000)
+        user = Users.objects.create(role_id=role)
+        app_template = AppTemplates.objects.create(
+            image_id=uuid.uuid4(), name='Template', short_description='Course VM', description='',
+            creator_id=user, fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+        unchanged = [{'name': f'Attribute{i}'} for i in range(ATTRIBUTE_COUNT)]
+        one_changed = unchanged[1:] + [{'name': 'Changed'}]
+        serializer = AppTemplateSerializer()
+        edits = [unchanged, one_changed]
+
+        results = {}
+        statements = {}
+        for label, update in [('recreate all', recreate_account_attributes),
+                              ('write changed', lambda app_template, data: serializer.update_related_names(
+                                  AppTemplateAccountAttributes, app_template, data))]:
+            for edit_label, data in [('unchanged', unchanged), ('one changed', one_changed)]:
+                # Start each edit from the other edit, so every call changes the attribute
+                update(app_template, edits[1 - edits.index(data)])
+                with CaptureQueriesContext(connection) as queries:
+                    update(app_template, data)
+                statements[f'{label}, {edit_label}'] = len(queries.captured_queries)
+                results[f'{label}, {edit_label}'] = measure(lambda: update(app_template, data), ITERATIONS)
+
+        report(f'Update of {ATTRIBUTE_COUNT} account attributes', results)
+        print(f"{'variant':<40}{'statements':>10}")
+        for variant, count in statements.items():
+            print(f'{variant:<40}{count:>10}')
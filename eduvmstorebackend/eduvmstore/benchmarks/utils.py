@@ -0,0 +1,84 @@
+import statistics
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List
+
+
+def measure(function: Callable, iterations: int) -> List[float]:
+    """
+    Call the function repeatedly and measure the latency of each call.
+
+    :param function function: Function to measure
+    :param int iterations: Number of calls
+    :return: Latency of each call in milliseconds
+    :rtype: List[float]
+    """
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def measure_concurrently(function: Callable, arguments: Iterable[Any]) -> List[float]:
+    """
+    Call the function once per argument, all calls started at the same time
+    in their own thread, and measure the latency of each call.
+
+    :param function function: Function to measure, called with a single argument
+    :param Iterable arguments: Argument of each call
+    :return: Latency of each call in milliseconds
+    :rtype: List[float]
+    """
+    arguments = list(arguments)
+    barrier = threading.Barrier(len(arguments))
+    latencies = []
+    lock = threading.Lock()
+
+    def call(argument):
+        barrier.wait()
+        start = time.perf_counter()
+        function(argument)
+        latency = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(latency)
+
+    threads = [threading.Thread(target=call, args=(argument,)) for argument in arguments]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """
+    Summarize latencies in milliseconds.
+
+    :param List[float] latencies: Measured latencies in milliseconds
+    :return: Dictionary with mean, p50 and p99 latency
+    :rtype: Dict[str, float]
+    """
+    ordered = sorted(latencies)
+    return {
+        'mean': statistics.fmean(ordered),
+        'p50': ordered[len(ordered) // 2],
+        'p99': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+    }
+
+
+def report(title: str, results: Dict[str, List[float]]) -> None:
+    """
+    Print a latency table for the given results.
+
+    :param str title: Title of the benchmark
+    :param Dict results: Measured latencies in milliseconds by variant name
+    :return: None
+    :rtype: None
+    """
+    print(f'\n{title}')
+    print(f"{'variant':<40}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for variant, latencies in results.items():
+        summary = summarize(latencies)
+        print(f"{variant:<40}{summary['mean']:>10.3f}{summary['p50']:>10.3f}{summary['p99']:>10.3f}")
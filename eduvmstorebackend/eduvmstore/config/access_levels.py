@@ -1,14 +1,19 @@
 REQUIRED_ACCESS_LEVELS = {
     ('app-template-list', 'GET'): 1001,
     ('app-template-check-name-collision', 'GET'): 1001,
+    ('app-template-check-name-collisions', 'POST'): 1001,
     ('app-template-detail', 'GET'): 1002,
     ('app-template-list', 'POST'): 1101,
     ('app-template-favorites', 'GET'): 1102,
     ('app-template-detail', 'PUT'): 1201,
+    ('app-template-detail', 'PATCH'): 1201,
     ('app-template-detail', 'DELETE'): 1202,
     ('app-template-list-all', 'GET'): 3101,  # No Endpoint, access to see all AppTemplates
+    ('app-template-review-queue', 'GET'): 3101,
     ('app-template-reject', 'PATCH'): 3102,
     ('app-template-approve', 'PATCH'): 3103,
+    ('app-template-bulk-reject', 'PATCH'): 3102,
+    ('app-template-bulk-approve', 'PATCH'): 3103,
     ('app-template-delete-approved', 'DELETE'): 4001,  # No Endpoint, right to delete approved AppTemplates
 
     ('favorite-list', 'POST'): 1103,
@@ -21,12 +26,15 @@ REQUIRED_ACCESS_LEVELS = {
     ('user-detail', 'PUT'): 6201,
     ('user-detail', 'DELETE'): 6202,
     ('user-detail', 'PATCH'): 6301,
+    ('user-import', 'POST'): 6101,
 
     ('role-list', 'GET'): 1,
     ('role-detail', 'GET'): 2,
     ('role-list', 'POST'): 6501,
     ('role-detail', 'PUT'): 6601,
     ('role-detail', 'DELETE'): 6602,
+
+    ('metrics-list', 'GET'): 6001,
 }
 
 DEFAULT_ACCESS_LEVEL = 8000
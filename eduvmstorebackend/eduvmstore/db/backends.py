@@ -0,0 +1,17 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def enable_sqlite_wal(connection, **kwargs) -> None:
+    """
+    Switch SQLite databases to write-ahead logging, so reads don't block
+    on concurrent writes, e.g. while many users log in for the first time.
+
+    :param connection: The newly created database connection
+    :return: None
+    :rtype: None
+    """
+    if connection.vendor == 'sqlite' and not connection.is_in_memory_db():
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL')
@@ -4,6 +4,8 @@ from django.db import models
 
 from django.utils.timezone import now
 
+from eduvmstore.utils.string_utils import split_version_suffix
+
 
 class AppTemplates(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -23,6 +25,10 @@ class AppTemplates(models.Model):
     deleted_at = models.DateTimeField(null=True)
     deleted = models.BooleanField(default=False)
     version = models.IntegerField(default=1)  # versioning for approval naming
+    # name split into base name and version suffix number ('example-V2' -> 'example', 2),
+    # set on save for index lookups of versioned names
+    base_name = models.CharField(max_length=255, default='', editable=False)
+    name_version = models.IntegerField(null=True, default=None, editable=False)
 
     # visibility
     public = models.BooleanField(default=False)
@@ -36,6 +42,31 @@ class AppTemplates(models.Model):
     fixed_disk_gb = models.FloatField()
     fixed_cores = models.FloatField()
 
+    class Meta:
+        indexes = [
+            # Ordering key of the keyset pagination (eduvmstore/api/pagination.py)
+            models.Index(fields=['created_at', 'id'], name='app_template_created_id_idx'),
+            # Versioned names with the same base name (eduvmstore/db/operations/app_templates.py)
+            models.Index(fields=['base_name', 'name_version'], name='app_template_base_name_idx'),
+            # Review queue of AppTemplates waiting for approval, oldest first (eduvmstore/api/views.py)
+            models.Index(fields=['deleted', 'public', 'approved', 'created_at', 'id'],
+                         name='app_template_review_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Visibility when loaded, so a change to private also invalidates cached public responses
+        instance._loaded_public = instance.__dict__.get('public', True)
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.base_name, self.name_version = split_version_suffix(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'base_name', 'name_version'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
@@ -45,10 +76,16 @@ class AppTemplateInstantiationAttributes(models.Model):
     app_template_id = (
         models.ForeignKey(AppTemplates, on_delete=models.CASCADE, related_name='instantiation_attributes'))
     name = models.CharField(max_length=255)
+    # Position in the list of the AppTemplate, rows are read in this order
+    position = models.PositiveIntegerField(default=0)
 
     # No CRUD Info as AppTemplateInstantiationAttributes are strongly bound to AppTemplates
     # Due to the strong bound, there is no dedicated db-operation file to access
     # instantiation attributes alone
+
+    class Meta:
+        ordering = ['position']
+
     def __str__(self):
         return self.name
 
@@ -58,10 +95,16 @@ class AppTemplateAccountAttributes(models.Model):
     app_template_id = (
         models.ForeignKey(AppTemplates, on_delete=models.CASCADE, related_name='account_attributes'))
     name = models.CharField(max_length=255)
+    # Position in the list of the AppTemplate, rows are read in this order
+    position = models.PositiveIntegerField(default=0)
 
     # No CRUD Info as AppTemplateAccountAttributes are strongly bound to AppTemplates
     # Due to the strong bound, there is no dedicated db-operation file to access
     # account attributes alone
+
+    class Meta:
+        ordering = ['position']
+
     def __str__(self):
         return self.name
 
@@ -71,14 +114,33 @@ class AppTemplateSecurityGroups(models.Model):
     app_template_id = (
         models.ForeignKey(AppTemplates, on_delete=models.CASCADE, related_name='security_groups'))
     name = models.CharField(max_length=255)
+    # Position in the list of the AppTemplate, rows are read in this order
+    position = models.PositiveIntegerField(default=0)
 
     # No CRUD Info as AppTemplateSecurityGroups are strongly bound to AppTemplates
     # Due to the strong bound, there is no dedicated db-operation file to access
     # security groups alone
+
+    class Meta:
+        ordering = ['position']
+
     def __str__(self):
         return self.name
 
 
+class AppTemplateSearchIndex(models.Model):
+    # SQLite FTS5 table of the full-text search, created by migration 0020 and written by
+    # eduvmstore/db/search.py. The model is only used to join the table in search queries.
+    app_template_id = models.OneToOneField(AppTemplates, on_delete=models.DO_NOTHING, primary_key=True,
+                                           db_column='id', db_constraint=False, related_name='search_index')
+    # Hidden column named like the table, a MATCH on it searches all indexed columns
+    document = models.TextField(db_column='eduvmstore_apptemplates_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'eduvmstore_apptemplates_fts'
+
+
 class Users(models.Model):
     # default needs to be deleted, the moment we get the user from keystone/token
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -99,6 +161,8 @@ class Roles(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255, unique=True)
     access_level = models.IntegerField()
+    # Changes the ETags of roles and users (eduvmstore/api/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -108,6 +172,8 @@ class Favorites(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user_id = models.ForeignKey(Users, on_delete=models.CASCADE)
     app_template_id = models.ForeignKey(AppTemplates, on_delete=models.CASCADE)
+    # Favorites are never updated, a new favorite changes the ETag of the list (eduvmstore/api/conditional.py)
+    created_at = models.DateTimeField(default=now, editable=False)
 
     class Meta:
         constraints = [
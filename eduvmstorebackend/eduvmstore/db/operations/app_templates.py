@@ -1,10 +1,40 @@
+import uuid
+from django.conf import settings
 from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 from enum import Enum
+from typing import Dict, Iterable, List
 from django.core.exceptions import ObjectDoesNotExist
 from eduvmstore.db.models import AppTemplates, AppTemplateAccountAttributes, \
     AppTemplateInstantiationAttributes, AppTemplateSecurityGroups
-from eduvmstore.utils.string_utils import has_version_suffix, extract_version_suffix, create_version_pattern
+from eduvmstore.db.search import index_app_templates, update_fuzzy_index
+from eduvmstore.utils.string_utils import has_version_suffix, extract_version_suffix, split_version_suffix
+from eduvmstore.utils.response_cache import ResponseCache
+from eduvmstore.utils.ttl_cache import TTLCache
+
+# Per worker cache of names known to be free, for the name collision check while typing.
+# Entries are invalidated by the signal handlers in eduvmstore/db/signals.py.
+free_name_cache = TTLCache(max_size=settings.NAME_COLLISION_CACHE['size'],
+                           ttl=settings.NAME_COLLISION_CACHE['ttl'])
+
+# Cached AppTemplate list and detail responses (eduvmstore/api/views.py). Invalidated per scope
+# by the signal handlers in eduvmstore/db/signals.py and by bulk approvals and rejections.
+app_template_response_cache = ResponseCache('app_templates')
+# Scope of all public AppTemplates, the scope of the AppTemplates of a user is user_scope(user_id)
+PUBLIC_SCOPE = 'public'
+
+
+def user_scope(user_id: uuid.UUID) -> str:
+    """
+    Return the response cache scope of the AppTemplates created by a user.
+
+    :param UUID user_id: The UUID of the creator
+    :return: The scope
+    :rtype: str
+    """
+    return f'user:{user_id}'
+
 
 
 class CollisionReason(Enum):
@@ -21,7 +51,7 @@ def check_name_collision(name: str) -> tuple[bool, CollisionReason, dict]:
     """
     Check if the given AppTemplate name collides with any existing AppTemplates.
     Checks for direct matches, versioned templates with the same base name,
-    and reserved version suffixes.
+    and reserved version suffixes. Both queries are index lookups.
 
     :param str name: The name of the AppTemplate to check
     :return: A tuple (collision_found, reason)
@@ -37,13 +67,67 @@ def check_name_collision(name: str) -> tuple[bool, CollisionReason, dict]:
         return True, CollisionReason.VERSION_SUFFIX_RESERVED, {"suffix": suffix}
 
     # Check if any versioned template exists with this name as a base
-    versioned_name_pattern = create_version_pattern(name)
-    if AppTemplates.objects.filter(name__regex=versioned_name_pattern, deleted=False).exists():
+    if AppTemplates.objects.filter(base_name=name, name_version__isnull=False, deleted=False).exists():
         return True, CollisionReason.VERSIONED_TEMPLATE_EXISTS, {"name": name}
 
     return False, CollisionReason.NO_COLLISION, {"name": name}
 
 
+def check_name_collision_cached(name: str) -> tuple[bool, CollisionReason, dict]:
+    """
+    Check if the given AppTemplate name collides with any existing AppTemplates,
+    answering from the cache of free names if possible. A name that became taken
+    in another worker may still be reported free until the cache entry expires,
+    so creating and updating AppTemplates checks without the cache.
+
+    :param str name: The name of the AppTemplate to check
+    :return: A tuple (collision_found, reason, context)
+    :rtype: tuple[bool, CollisionReason, dict]
+    """
+    if free_name_cache.get(name):
+        return False, CollisionReason.NO_COLLISION, {"name": name}
+    result = check_name_collision(name)
+    if not result[0]:
+        free_name_cache.set(name, True)
+    return result
+
+
+def check_name_collisions(names: Iterable[str]) -> Dict[str, tuple[bool, CollisionReason, dict]]:
+    """
+    Check several AppTemplate names for collisions with existing AppTemplates
+    at once, with the same rules as check_name_collision but two queries in total.
+
+    :param Iterable[str] names: The names of the AppTemplates to check
+    :return: A tuple (collision_found, reason, context) per name
+    :rtype: Dict[str, tuple[bool, CollisionReason, dict]]
+    """
+    names = set(names)
+    existing_names = set(AppTemplates.objects.filter(name__in=names, deleted=False)
+                         .values_list('name', flat=True))
+    base_names = {name for name in names - existing_names if not has_version_suffix(name)}
+    versioned_base_names = set(AppTemplates.objects
+                               .filter(base_name__in=base_names, name_version__isnull=False, deleted=False)
+                               .values_list('base_name', flat=True))
+
+    results = {}
+    for name in names:
+        if name in existing_names:
+            results[name] = (True, CollisionReason.DIRECT_MATCH, {"name": name})
+        elif name not in base_names:
+            suffix = extract_version_suffix(name)
+            results[name] = (True, CollisionReason.VERSION_SUFFIX_RESERVED, {"suffix": suffix})
+        elif name in versioned_base_names:
+            results[name] = (True, CollisionReason.VERSIONED_TEMPLATE_EXISTS, {"name": name})
+        else:
+            results[name] = (False, CollisionReason.NO_COLLISION, {"name": name})
+    return results
+
+
+# Relations of AppTemplates copied on approval
+APPROVAL_COPIED_MODELS = (AppTemplateAccountAttributes, AppTemplateInstantiationAttributes,
+                          AppTemplateSecurityGroups)
+
+
 @transaction.atomic
 def approve_app_template(id: str) -> AppTemplates:
     """
@@ -56,45 +140,68 @@ def approve_app_template(id: str) -> AppTemplates:
     :rtype: AppTemplates
     :raises ObjectDoesNotExist: If the AppTemplate is not found
     """
-    try:
-        original_app_template = AppTemplates.objects.get(id=id, deleted=False)
-        original_account_attributes = AppTemplateAccountAttributes.objects.filter(app_template_id=id)
-        original_instantiation_attributes = (
-            AppTemplateInstantiationAttributes.objects.filter(app_template_id=id))
-        original_security_groups = AppTemplateSecurityGroups.objects.filter(app_template_id=id)
-
-        # Create a copy by setting pk to None
-        # https://docs.djangoproject.com/en/2.2/topics/db/queries/#copying-model-instances
-        public_app_template = AppTemplates.objects.get(id=original_app_template.id, deleted=False)
-        public_app_template.pk = None
-        public_app_template.name = f"{original_app_template.name}-V{original_app_template.version}"
-        public_app_template.approved = True  # Approve the copy
-        public_app_template.ssh_user_requested = original_app_template.ssh_user_requested
-        public_app_template.save()
-
-        # Copy account and instantiation attributes
-        for account_attribute in original_account_attributes:
-            account_attribute.pk = None
-            account_attribute.app_template_id = public_app_template
-            account_attribute.save()
-        for instantiation_attribute in original_instantiation_attributes:
-            instantiation_attribute.pk = None
-            instantiation_attribute.app_template_id = public_app_template
-            instantiation_attribute.save()
-        for security_group in original_security_groups:
-            security_group.pk = None
-            security_group.app_template_id = public_app_template
-            security_group.save()
-
-        # No need for public visibility on original app_template
-        # -> no request for approval
-        original_app_template.public = False
-        original_app_template.version += 1
-        original_app_template.save()
-
-        return public_app_template
-    except ObjectDoesNotExist:
+    public_app_templates = approve_app_templates([id])
+    if not public_app_templates:
         raise ObjectDoesNotExist(f"AppTemplate {id} not found.")
+    return next(iter(public_app_templates.values()))
+
+
+@transaction.atomic
+def approve_app_templates(ids: Iterable[str]) -> Dict[uuid.UUID, AppTemplates]:
+    """
+    Approve several AppTemplates at once like approve_app_template.
+    The number of statements doesn't depend on the number of AppTemplates, attributes and security groups.
+    The versions are incremented in the database first, which locks the AppTemplates,
+    so concurrent approvals of the same AppTemplate get different version numbers.
+
+    :param Iterable[str] ids: The UUIDs of the AppTemplates to approve
+    :return: The approved copy per UUID of an approved AppTemplate, missing AppTemplates are left out
+    :rtype: Dict[uuid.UUID, AppTemplates]
+    """
+    ids = list(ids)
+    AppTemplates.objects.filter(id__in=ids, deleted=False).update(version=F('version') + 1)
+
+    public_app_templates = {}
+    for public_app_template in AppTemplates.objects.filter(id__in=ids, deleted=False):
+        original_id = public_app_template.id
+        version = public_app_template.version - 1
+        # Create a copy with a new primary key, bulk_create doesn't call save()
+        public_app_template.id = uuid.uuid4()
+        public_app_template._state.adding = True
+        public_app_template.name = f"{public_app_template.name}-V{version}"
+        public_app_template.base_name, public_app_template.name_version = (
+            split_version_suffix(public_app_template.name))
+        public_app_template.version = version
+        public_app_template.approved = True  # Approve the copy
+        public_app_templates[original_id] = public_app_template
+    if not public_app_templates:
+        return {}
+    AppTemplates.objects.bulk_create(public_app_templates.values())
+
+    # Copy account and instantiation attributes and security groups
+    for model in APPROVAL_COPIED_MODELS:
+        model.objects.bulk_create([
+            model(app_template_id=public_app_templates[original_id], name=name, position=position)
+            for original_id, name, position in model.objects
+            .filter(app_template_id__in=public_app_templates.keys())
+            .values_list('app_template_id', 'name', 'position')])
+
+    # No need for public visibility on original app_template
+    # -> no request for approval
+    AppTemplates.objects.filter(id__in=public_app_templates.keys()).update(
+        public=False, updated_at=timezone.now())
+
+    # bulk_create and update don't send post_save, so the search indexes and caches are updated here
+    index_app_templates(public_app_templates.values())
+    for public_app_template in public_app_templates.values():
+        update_fuzzy_index(public_app_template)
+        free_name_cache.delete(public_app_template.name)
+        free_name_cache.delete(public_app_template.base_name)
+    app_template_response_cache.invalidate(
+        [PUBLIC_SCOPE] + [user_scope(public_app_template.creator_id_id)
+                          for public_app_template in public_app_templates.values()])
+
+    return public_app_templates
 
 
 @transaction.atomic
@@ -117,6 +224,28 @@ def reject_app_template(id: str) -> AppTemplates:
         raise ObjectDoesNotExist(f"AppTemplate {id} not found.")
 
 
+@transaction.atomic
+def reject_app_templates(ids: Iterable[str]) -> List[uuid.UUID]:
+    """
+    Reject several AppTemplates at once like reject_app_template, with one query and one update.
+
+    :param Iterable[str] ids: The UUIDs of the AppTemplates to reject
+    :return: The UUIDs of the rejected AppTemplates, missing AppTemplates are left out
+    :rtype: List[uuid.UUID]
+    """
+    rejected = list(AppTemplates.objects.filter(id__in=list(ids), deleted=False)
+                    .values_list('id', 'creator_id'))
+    if not rejected:
+        return []
+    rejected_ids = [id for id, _ in rejected]
+    AppTemplates.objects.filter(id__in=rejected_ids).update(
+        approved=False, public=False, updated_at=timezone.now())
+    # update doesn't send post_save
+    app_template_response_cache.invalidate(
+        [PUBLIC_SCOPE] + [user_scope(creator_id) for _, creator_id in rejected])
+    return rejected_ids
+
+
 # Currently unused, potential enhancement for the future
 @transaction.atomic
 def soft_delete_app_template(id: str) -> None:
@@ -1,15 +1,25 @@
-import uuid
-
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db import transaction
 from eduvmstore.db.models import Roles
+from eduvmstore.utils.ttl_cache import TTLCache
 
+# Per worker cache of roles by name, used to resolve the default roles of new users.
+# Entries are invalidated by the signal handlers in eduvmstore/db/signals.py.
+role_cache = TTLCache(max_size=100, ttl=settings.USER_CACHE['ttl'])
 
-def create_role(role_data: dict) -> Roles:
-    """
-    Create a new Role entry in the database using Django ORM.
 
-    :param Dict role_data: Dictionary containing the Role details
-    :return: The newly created Role object
+def get_or_create_role(role_data: dict) -> Roles:
+    """
+    Retrieve a Role entry by name or create it if it does not exist.
+    Concurrent calls for the same name are safe, as the unique name makes
+    all but one insert fail and those calls retrieve the created Role instead.
+    Roles are cached per worker, so repeated calls don't query the database.
+    A created Role is only cached once the transaction is committed, so a rollback
+    doesn't leave a Role in the cache that doesn't exist.
+
+    :param Dict role_data: Dictionary containing the Role name and access level
+    :return: The existing or newly created Role object
     :rtype: Roles
     :raises ValidationError: If any required field is missing or invalid
     """
@@ -18,15 +28,17 @@ def create_role(role_data: dict) -> Roles:
     if role_data['access_level'] is None:
         raise ValidationError("Access level cannot be empty")
 
-    try:
-        new_role = Roles.objects.create(
-            id=str(uuid.uuid4()),  # Generate unique UUID
+    role = role_cache.get(role_data['name'])
+    if role is None:
+        role, created = Roles.objects.get_or_create(
             name=role_data['name'],
-            access_level=role_data['access_level']
+            defaults={'access_level': role_data['access_level']}
         )
-        return new_role
-    except ValidationError as e:
-        raise e
+        if created:
+            transaction.on_commit(lambda: role_cache.set(role_data['name'], role))
+        else:
+            role_cache.set(role_data['name'], role)
+    return role
 
 
 def update_role(id: str, update_role_data: dict) -> Roles:
@@ -68,16 +80,3 @@ def get_role_by_id(id: str) -> Roles:
     except ObjectDoesNotExist:
         raise ObjectDoesNotExist(f"Role with id {id} not found")
 
-
-def get_role_by_name(name: str) -> Roles:
-    """
-    Retrieve a Role entry from the database using its ID.
-
-    :param str name: The unique name of the role.
-    :return: The Role object if found.
-    :raises ObjectDoesNotExist: If no Role is found with the given name.
-    """
-    try:
-        return Roles.objects.get(name=name)
-    except ObjectDoesNotExist:
-        raise ObjectDoesNotExist(f"Role with name {name} not found")
@@ -1,11 +1,24 @@
+import threading
+import time
+from itertools import islice
+
+from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.db import transaction
 from eduvmstore.config.access_levels import DEFAULT_ROLES
-from eduvmstore.db.models import Users, AppTemplates
-from eduvmstore.db.operations.roles import get_role_by_name, create_role
+from eduvmstore.db.models import Users, AppTemplates, Roles
+from eduvmstore.db.operations.app_templates import PUBLIC_SCOPE, app_template_response_cache, user_scope
+from eduvmstore.db.operations.roles import get_or_create_role
+from eduvmstore.utils.ttl_cache import TTLCache
+
+from typing import Dict, Iterable
 
-from typing import Dict
+# Per worker cache of users including their role, keyed by the user id.
+# Entries are invalidated by the signal handlers in eduvmstore/db/signals.py.
+user_cache = TTLCache(max_size=settings.USER_CACHE['size'], ttl=settings.USER_CACHE['ttl'])
+
+provisioning_lock = threading.Lock()
 
 
 def create_user(user_data: Dict) -> Users:
@@ -14,6 +27,8 @@ def create_user(user_data: Dict) -> Users:
         according to the default roles in eduvmstore/config/access_levels.py.
         If the default role is not found,
         this role is created.
+        Concurrent calls for the same user ID (e.g. parallel first requests of a new user)
+        are safe and all return the same User.
 
     :param Dict user_data: Dictionary containing the User details. This is either id and role_id or id
         and role_name.
@@ -27,33 +42,106 @@ def create_user(user_data: Dict) -> Users:
 
     # Only if no role ID is given match the role name to the default roles
     if not user_data.get('role_id'):
-        # match statement -> extensibility with further roles, add them in eduvmstore/config/access_levels.py
-        match user_data.get('keystone_role_name').lower():
-            case 'admin':
-                role_name = DEFAULT_ROLES['EduVMStoreAdmin']['name']
-                default_access_level = DEFAULT_ROLES['EduVMStoreAdmin']['access_level']
-            case _:
-                role_name = DEFAULT_ROLES['EduVMStoreUser']['name']
-                default_access_level = DEFAULT_ROLES['EduVMStoreUser']['access_level']
-
-        try:
-            role_id = get_role_by_name(role_name)
-        except ObjectDoesNotExist:
-            role_id = create_role({'name': role_name, 'access_level': default_access_level})
-
-        user_data['role_id'] = role_id
+        user_data['role_id'] = resolve_default_role(user_data.get('keystone_role_name'))
 
-    try:
-        new_user = Users.objects.create(
+    # SQLite allows only one writer at a time. Serializing the inserts of this worker
+    # avoids failing lock upgrades of concurrent transactions during login bursts.
+    with provisioning_lock:
+        new_user, created = Users.objects.get_or_create(
             id=user_data['id'],
-            role_id=user_data['role_id'],
-            created_at=timezone.now(),
-            updated_at=timezone.now(),
-            deleted=False
+            defaults={
+                'role_id': user_data['role_id'],
+                'created_at': timezone.now(),
+                'updated_at': timezone.now(),
+                'deleted': False
+            }
         )
-        return new_user
-    except ValidationError as e:
-        raise e
+    return new_user
+
+
+def get_default_role(keystone_role_name: str) -> Dict:
+    """
+    Match a Keystone role name to the default roles in eduvmstore/config/access_levels.py.
+
+    :param str keystone_role_name: Name of the role in Keystone
+    :return: Dictionary with name and access level of the default role
+    :rtype: Dict
+    """
+    # match statement -> extensibility with further roles, add them in eduvmstore/config/access_levels.py
+    match keystone_role_name.lower():
+        case 'admin':
+            return DEFAULT_ROLES['EduVMStoreAdmin']
+        case _:
+            return DEFAULT_ROLES['EduVMStoreUser']
+
+
+def resolve_default_role(keystone_role_name: str) -> Roles:
+    """
+    Retrieve the default Role matching a Keystone role name, creating it if it does not exist.
+
+    :param str keystone_role_name: Name of the role in Keystone
+    :return: The matching default Role object
+    :rtype: Roles
+    """
+    return get_or_create_role(get_default_role(keystone_role_name or ''))
+
+
+def import_users(rows: Iterable[Dict], batch_size: int = 500) -> Dict:
+    """
+    Create Users in bulk, e.g. from a course roster, so that they don't have to be
+    created one by one on their first request. The rows are consumed lazily in batches,
+    each batch is inserted with a single query in its own transaction. An interrupted
+    import can be repeated, as the Users of committed batches are skipped.
+    The roles are matched to the default roles like in create_user.
+    Existing Users (including deleted ones) are skipped and keep their role.
+
+    :param Iterable[Dict] rows: Dictionaries containing the User id and keystone_role_name
+    :param int batch_size: Number of rows inserted per query
+    :return: Dictionary with the number of created, skipped and invalid rows and the duration in seconds
+    :rtype: Dict
+    """
+    result = {'created': 0, 'skipped': 0, 'invalid': 0}
+    roles = {}
+    rows = iter(rows)
+    start = time.perf_counter()
+
+    while batch := list(islice(rows, batch_size)):
+        new_users = {}
+        for row in batch:
+            try:
+                user_id = Users._meta.pk.to_python(row.get('id') or None)
+            except ValidationError:
+                user_id = None
+            if user_id is None:
+                result['invalid'] += 1
+                continue
+            if user_id in new_users:
+                result['skipped'] += 1
+                continue
+
+            keystone_role_name = (row.get('keystone_role_name') or '').lower()
+            if keystone_role_name not in roles:
+                roles[keystone_role_name] = resolve_default_role(keystone_role_name)
+            new_users[user_id] = roles[keystone_role_name]
+
+        # The lock is held per batch only, so logins of this worker wait for one insert at most
+        with provisioning_lock, transaction.atomic():
+            existing_ids = set(Users.objects.filter(id__in=new_users).values_list('id', flat=True))
+            now = timezone.now()
+            Users.objects.bulk_create(
+                [Users(id=user_id, role_id=role, created_at=now, updated_at=now)
+                 for user_id, role in new_users.items() if user_id not in existing_ids],
+                # Users created concurrently by other workers are skipped as well
+                ignore_conflicts=True
+            )
+            # With ignore_conflicts, bulk_create returns all objects, including the skipped ones.
+            # Users created concurrently since the check above carry another creation time.
+            created = Users.objects.filter(id__in=new_users, created_at=now).count()
+        result['created'] += created
+        result['skipped'] += len(new_users) - created
+
+    result['duration_seconds'] = time.perf_counter() - start
+    return result
 
 
 def get_user_by_id(id: str) -> Users:
@@ -70,6 +158,26 @@ def get_user_by_id(id: str) -> Users:
     except ObjectDoesNotExist:
         raise ObjectDoesNotExist(f"User with id {id} not found.")
 
+
+def get_cached_user_by_id(id: str) -> Users:
+    """
+    Retrieve a User entry including role information from the per worker user cache.
+    On a cache miss the user is loaded from the database and cached.
+
+    :param str id: The unique identifier of the user
+    :return: The User object if found, with role information accessible
+    :rtype: Users
+    :raises ObjectDoesNotExist: If no User is found with the given ID
+    :raises ValidationError: If the ID is not a valid UUID
+    """
+    cache_key = Users._meta.pk.to_python(id)
+    user = user_cache.get(cache_key)
+    if user is None:
+        user = get_user_by_id(cache_key)
+        user_cache.set(cache_key, user)
+    return user
+
+
 @transaction.atomic
 def delete_user(user_to_delete: Users, current_user: Users = None) -> None:
     """
@@ -102,10 +210,14 @@ def delete_user(user_to_delete: Users, current_user: Users = None) -> None:
 
         # For public AppTemplates, transfer ownership to the current admin performing the deletion
         # Updated at needs to be manually set as this is a direct sql update
-        public_app_templates.update(
+        transferred = public_app_templates.update(
             creator_id=current_user,
             updated_at=timezone.now()
         )
+        if transferred:
+            # update doesn't send post_save, so the cached responses (and ETags) are invalidated here
+            app_template_response_cache.invalidate(
+                [PUBLIC_SCOPE, user_scope(current_user.id), user_scope(user_to_delete.id)])
         user_to_delete.delete()
     except ValidationError as e:
         raise e
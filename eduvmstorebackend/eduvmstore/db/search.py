@@ -0,0 +1,300 @@
+import logging
+import re
+import threading
+import uuid
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import CharField, F, FloatField, Func, Lookup, QuerySet, Value
+from django.db.models.functions import Cast, StrIndex
+
+from eduvmstore.db.models import AppTemplates, AppTemplateSearchIndex
+from eduvmstore.utils.trigram_index import TrigramIndex
+
+logger = logging.getLogger('eduvmstore_logger')
+
+# SQLite FTS5 table indexing the searchable text of AppTemplates.
+# The table is created by migration 0020 and kept in sync by the signal handlers in eduvmstore/db/signals.py.
+# Queries below interpolate only this constant table name, all values are passed as parameters.
+FTS_TABLE = AppTemplateSearchIndex._meta.db_table
+
+SEARCH_TERM_PATTERN = re.compile(r'\w+')
+
+# In-process trigram index of AppTemplate names and short descriptions for fuzzy search.
+# It is built once per worker and kept up to date by the signal handlers in eduvmstore/db/signals.py.
+fuzzy_index = TrigramIndex()
+_fuzzy_index_lock = threading.Lock()
+_fuzzy_index_built = False
+
+
+class Match(Lookup):
+    """
+    FTS5 full-text query, e.g. search_index__document__match='"rust"*'.
+    """
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+AppTemplateSearchIndex._meta.get_field('document').register_lookup(Match)
+
+
+class SearchRank(Func):
+    """
+    bm25 relevance of a row matched in the search index, lower is better.
+    The weights of the indexed columns are: id, name, short_description,
+    description, instantiation_notice.
+    """
+    function = 'bm25'
+    template = '%(function)s(%(expressions)s, 1.0, 10.0, 5.0, 1.0, 1.0)'
+    output_field = FloatField()
+
+
+def search_rowid(id: uuid.UUID) -> int:
+    """
+    Derive the row id of an AppTemplate in the search index from its UUID.
+    FTS5 rows can only be updated and deleted efficiently by their integer row id,
+    the upper 63 bits of the random UUID are unique in practice.
+
+    :param UUID id: The UUID of the AppTemplate
+    :return: Positive 63 bit integer
+    :rtype: int
+    """
+    return uuid.UUID(str(id)).int >> 65
+
+
+def is_search_index_available() -> bool:
+    """
+    Check whether the database supports the full-text search index.
+
+    :return: True for SQLite databases, else False
+    :rtype: bool
+    """
+    return connection.vendor == 'sqlite'
+
+
+def index_app_templates(app_templates: Iterable[AppTemplates]) -> None:
+    """
+    Add or replace AppTemplates in the search index.
+
+    :param Iterable[AppTemplates] app_templates: The created or updated AppTemplates
+    :return: None
+    :rtype: None
+    """
+    if not is_search_index_available():
+        return
+    rows = []
+    for app_template in app_templates:
+        # Stored like the primary key of AppTemplates, as 32 hex digits
+        id = uuid.UUID(str(app_template.id))
+        rows.append((search_rowid(id), id.hex, app_template.name, app_template.short_description,
+                     app_template.description, app_template.instantiation_notice or ''))
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])  # nosec B608
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} '
+            f'(rowid, id, name, short_description, description, instantiation_notice) '
+            f'VALUES (%s, %s, %s, %s, %s, %s)', rows)  # nosec B608
+
+
+def remove_app_template(id: uuid.UUID) -> None:
+    """
+    Remove an AppTemplate from the search index.
+
+    :param UUID id: The UUID of the deleted AppTemplate
+    :return: None
+    :rtype: None
+    """
+    if not is_search_index_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [search_rowid(id)])  # nosec B608
+
+
+def rebuild_search_index() -> None:
+    """
+    Rebuild the search index from all AppTemplates, e.g. after bulk inserts,
+    which bypass the signal handlers.
+
+    :return: None
+    :rtype: None
+    """
+    if not is_search_index_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')  # nosec B608
+    index_app_templates(AppTemplates.objects.only(
+        'id', 'name', 'short_description', 'description', 'instantiation_notice').iterator())
+
+
+def build_match_query(search: str) -> Optional[str]:
+    """
+    Build an FTS5 query from a user search string. Every word of the search
+    has to match the beginning of a word in the AppTemplate (prefix search).
+
+    :param str search: The search string
+    :return: FTS5 query or None if the search contains no words
+    :rtype: Optional[str]
+    """
+    # Allow searching for full UUIDs, which are indexed without dashes
+    try:
+        return f'"{uuid.UUID(search.strip()).hex}"'
+    except ValueError:
+        pass
+    terms = SEARCH_TERM_PATTERN.findall(search)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_app_templates(queryset: QuerySet, search: str) -> QuerySet:
+    """
+    Filter AppTemplates by a search string using the full-text index,
+    ordered by relevance (best match first).
+
+    :param QuerySet queryset: Queryset of AppTemplates to search in
+    :param str search: The search string
+    :return: Matching AppTemplates annotated with their search_rank
+    :rtype: QuerySet
+    """
+    match_query = build_match_query(search)
+    if match_query is None:
+        return queryset.none()
+    # A join, unlike a correlated subquery per AppTemplate, evaluates the MATCH only once
+    return (queryset.filter(search_index__document__match=match_query)
+            .annotate(search_rank=SearchRank(F('search_index__document')))
+            .order_by('search_rank'))
+
+
+def fuzzy_key(id: uuid.UUID) -> str:
+    """
+    Return the key of an AppTemplate in the fuzzy search index. Keys are strings,
+    which unlike UUIDs are not tracked by the garbage collector.
+
+    :param UUID id: The UUID of the AppTemplate
+    :return: The UUID as string
+    :rtype: str
+    """
+    return str(uuid.UUID(str(id)))
+
+
+def fuzzy_text(app_template: AppTemplates) -> str:
+    """
+    Return the text of an AppTemplate covered by the fuzzy search.
+
+    :param AppTemplates app_template: The AppTemplate
+    :return: Name and short description
+    :rtype: str
+    """
+    return f'{app_template.name} {app_template.short_description}'
+
+
+def get_fuzzy_index() -> TrigramIndex:
+    """
+    Return the fuzzy search index of this worker, building it from
+    all AppTemplates on first use.
+
+    :return: The fuzzy search index
+    :rtype: TrigramIndex
+    """
+    global _fuzzy_index_built
+    if not _fuzzy_index_built:
+        with _fuzzy_index_lock:
+            if not _fuzzy_index_built:
+                fuzzy_index.clear()
+                app_templates = AppTemplates.objects.filter(deleted=False).values_list(
+                    'id', 'name', 'short_description')
+                for id, name, short_description in app_templates.iterator(chunk_size=5000):
+                    fuzzy_index.add(fuzzy_key(id), f'{name} {short_description}')
+                _fuzzy_index_built = True
+                logger.info(f'Built fuzzy search index with {len(fuzzy_index)} AppTemplates')
+    return fuzzy_index
+
+
+def warm_up_fuzzy_index() -> threading.Thread:
+    """
+    Build the fuzzy search index in a background thread at worker startup,
+    so the first fuzzy search does not have to wait for it.
+
+    :return: The started thread
+    :rtype: threading.Thread
+    """
+    def build():
+        try:
+            get_fuzzy_index()
+        except DatabaseError as e:
+            # E.g. before the first migration, the index is built on first use instead
+            logger.warning(f'Could not build fuzzy search index at startup: {e}')
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=build, name='fuzzy-index-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+def reset_fuzzy_index() -> None:
+    """
+    Drop the fuzzy search index, it is rebuilt on next use.
+
+    :return: None
+    :rtype: None
+    """
+    global _fuzzy_index_built
+    with _fuzzy_index_lock:
+        fuzzy_index.clear()
+        _fuzzy_index_built = False
+
+
+def update_fuzzy_index(app_template: AppTemplates, removed: bool = False) -> None:
+    """
+    Add, replace or remove an AppTemplate in the fuzzy search index once
+    the current transaction is committed.
+
+    :param AppTemplates app_template: The saved or deleted AppTemplate
+    :param bool removed: Whether the AppTemplate was deleted
+    :return: None
+    :rtype: None
+    """
+    key = fuzzy_key(app_template.id)
+    text = None if removed or app_template.deleted else fuzzy_text(app_template)
+
+    def update():
+        with _fuzzy_index_lock:
+            # An index that is not built yet reads the AppTemplate when it is built
+            if not _fuzzy_index_built:
+                return
+            if text is None:
+                fuzzy_index.remove(key)
+            else:
+                fuzzy_index.add(key, text)
+
+    transaction.on_commit(update)
+
+
+def fuzzy_search_app_templates(queryset: QuerySet, search: str) -> QuerySet:
+    """
+    Filter AppTemplates by a search string tolerating typos, using the
+    trigram index over names and short descriptions, ordered by similarity
+    (best match first).
+
+    :param QuerySet queryset: Queryset of AppTemplates to search in
+    :param str search: The search string
+    :return: Matching AppTemplates annotated with their search_rank
+    :rtype: QuerySet
+    """
+    matches = get_fuzzy_index().search(search, limit=settings.FUZZY_SEARCH['max_results'],
+                                       min_similarity=settings.FUZZY_SEARCH['min_similarity'])
+    if not matches:
+        return queryset.none()
+    ids = [id for id, _ in matches]
+    # Position of the id in the ids of all matches, in order of similarity. Unlike one When() per match,
+    # which costs more than the search, this is a single expression with a single parameter.
+    pk = AppTemplates._meta.pk
+    ranked_ids = ','.join(str(pk.get_db_prep_value(id, connection)) for id in ids)
+    ranking = StrIndex(Value(ranked_ids), Cast('id', CharField()))
+    return queryset.filter(id__in=ids).annotate(search_rank=ranking).order_by('search_rank')
@@ -0,0 +1,98 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from eduvmstore.db.models import AppTemplates, Roles, Users
+from eduvmstore.db.operations.app_templates import (PUBLIC_SCOPE, app_template_response_cache,
+                                                    free_name_cache, user_scope)
+from eduvmstore.db.operations.roles import role_cache
+from eduvmstore.db.operations.users import user_cache
+from eduvmstore.db.search import index_app_templates, remove_app_template, update_fuzzy_index
+
+
+@receiver([post_save, post_delete], sender=Users)
+def invalidate_cached_user(instance: Users, **kwargs) -> None:
+    """
+    Remove a changed or deleted user from the user cache.
+
+    :param Users instance: The changed or deleted user
+    :return: None
+    :rtype: None
+    """
+    user_cache.delete(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Roles)
+def invalidate_cached_users_of_role(instance: Roles, **kwargs) -> None:
+    """
+    Remove all roles and users from the caches if a role changes,
+    as the cached users contain the access level of their role.
+
+    :param Roles instance: The changed or deleted role
+    :return: None
+    :rtype: None
+    """
+    role_cache.clear()
+    user_cache.clear()
+
+
+@receiver(post_save, sender=AppTemplates)
+def invalidate_free_names(instance: AppTemplates, **kwargs) -> None:
+    """
+    Remove the names taken by a saved AppTemplate from the cache of free names.
+    Besides its name, a versioned AppTemplate (e.g. an approved copy) reserves its base name.
+    Names freed by a rename or deletion are not cached, so nothing else becomes outdated.
+
+    :param AppTemplates instance: The created or updated AppTemplate
+    :return: None
+    :rtype: None
+    """
+    free_name_cache.delete(instance.name)
+    free_name_cache.delete(instance.base_name)
+
+
+@receiver(post_save, sender=AppTemplates)
+def index_saved_app_template(instance: AppTemplates, **kwargs) -> None:
+    """
+    Add a created AppTemplate to the search indexes or update it,
+    e.g. after an update, approval or rejection.
+
+    :param AppTemplates instance: The created or updated AppTemplate
+    :return: None
+    :rtype: None
+    """
+    index_app_templates([instance])
+    update_fuzzy_index(instance)
+
+
+@receiver(post_delete, sender=AppTemplates)
+def remove_deleted_app_template(instance: AppTemplates, **kwargs) -> None:
+    """
+    Remove a deleted AppTemplate from the search indexes.
+
+    :param AppTemplates instance: The deleted AppTemplate
+    :return: None
+    :rtype: None
+    """
+    remove_app_template(instance.pk)
+    update_fuzzy_index(instance, removed=True)
+
+
+@receiver([post_save, post_delete], sender=AppTemplates)
+def invalidate_cached_responses(instance: AppTemplates, created: bool = False, **kwargs) -> None:
+    """
+    Invalidate the cached responses containing a changed or deleted AppTemplate: those of
+    its creator and, if the AppTemplate is or was public, those of the public catalog.
+    Attributes and security groups are only written together with their AppTemplate
+    or on approval, which invalidates the cache itself.
+
+    :param AppTemplates instance: The created, updated or deleted AppTemplate
+    :param bool created: Whether the AppTemplate was created
+    :return: None
+    :rtype: None
+    """
+    scopes = [user_scope(instance.creator_id_id)]
+    if instance.public or (not created and getattr(instance, '_loaded_public', True)):
+        scopes.append(PUBLIC_SCOPE)
+    instance._loaded_public = instance.public
+    app_template_response_cache.invalidate(scopes)
+
@@ -0,0 +1,39 @@
+import sys
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from eduvmstore.db.operations.users import import_users
+from eduvmstore.utils.roster import read_roster
+
+
+class Command(BaseCommand):
+    help = ('Create the Users of a course roster (CSV or Keystone project membership export) '
+            'before their first login.')
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('roster', help="Path of the roster file, '-' reads from stdin")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of Users inserted per query (default: 500)')
+
+    def handle(self, *args, **options) -> None:
+        """
+        Import the roster and report the number of created Users and the duration.
+        """
+        if options['batch_size'] < 1:
+            raise CommandError('Batch size must be at least 1')
+
+        try:
+            if options['roster'] == '-':
+                result = import_users(read_roster(sys.stdin), batch_size=options['batch_size'])
+            else:
+                with open(options['roster'], newline='', encoding='utf-8-sig') as roster:
+                    result = import_users(read_roster(roster), batch_size=options['batch_size'])
+        except OSError as e:
+            raise CommandError(f"Roster can't be read: {e}")
+        except ValidationError as e:
+            raise CommandError(e.message)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']} users, skipped {result['skipped']} existing, "
+            f"{result['invalid']} invalid rows in {result['duration_seconds']:.3f}s"))
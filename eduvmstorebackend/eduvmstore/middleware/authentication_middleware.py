@@ -1,3 +1,4 @@
+import hashlib
 import logging
 from typing import Callable, Optional, Dict
 
@@ -8,13 +9,104 @@ from django.http import JsonResponse
 from rest_framework.request import Request
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from eduvmstore.db.models import Users
-from eduvmstore.db.operations.users import get_user_by_id, create_user
+from eduvmstore.db.operations.users import get_cached_user_by_id, create_user
 from eduvmstore.utils.access_control import check_request_access
+from eduvmstore.utils.circuit_breaker import OPEN, CircuitBreaker
+from eduvmstore.utils.keystone_client import KeystoneUnavailableError, get_keystone_client
+from eduvmstore.utils.singleflight import SingleFlight
+from eduvmstore.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger('eduvmstore_logger')
 
+# Paths served without authentication, e.g. for load balancer health checks.
+# They must neither require a token nor trigger a Keystone call. Listed with a trailing
+# slash, requests without it are matched as well, see is_public_path.
+PUBLIC_PATHS = frozenset(['/api/health/live/', '/api/health/ready/'])
+
+# Per worker cache of validated tokens, keyed by a hash of the token
+token_cache = TTLCache(max_size=settings.OPENSTACK['token_cache_size'],
+                       ttl=settings.OPENSTACK['token_cache_ttl'])
+# Per worker coalescing of concurrent validations of the same token
+token_validation_flight = SingleFlight()
+# Per worker coalescing of concurrent first logins of the same user
+user_provisioning_flight = SingleFlight()
+# Per worker circuit breaker, failing fast while Keystone is unavailable
+keystone_breaker = CircuitBreaker(
+    name='keystone',
+    failure_threshold=settings.OPENSTACK['breaker_failure_threshold'],
+    window_size=settings.OPENSTACK['breaker_window_size'],
+    min_calls=settings.OPENSTACK['breaker_min_calls'],
+    open_duration=settings.OPENSTACK['breaker_open_seconds'],
+)
+
+
+def hash_token(token: str) -> str:
+    """
+    Hash a token so that raw tokens are never kept in memory as cache keys.
+
+    :param str token: The OpenStack token
+    :return: Hex digest of the token
+    :rtype: str
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def seconds_until_expiry(expires_at: Optional[str]) -> Optional[float]:
+    """
+    Calculate the remaining lifetime of a token from the Keystone expires_at value.
+
+    :param str expires_at: ISO 8601 timestamp of the token expiry
+    :return: Remaining lifetime in seconds or None if unknown
+    :rtype: Optional[float]
+    """
+    if not expires_at:
+        return None
+    expiry = parse_datetime(expires_at)
+    if expiry is None:
+        return None
+    return (expiry - timezone.now()).total_seconds()
+
+
+def is_public_path(path: str) -> bool:
+    """
+    Check whether a path is served without authentication. Paths without the trailing
+    slash match too, so CommonMiddleware can redirect them instead of a 401 being returned.
+
+    :param str path: The path of the request
+    :return: True if the path is public
+    :rtype: bool
+    """
+    return path.rstrip('/') + '/' in PUBLIC_PATHS
+
+
+def keystone_metrics() -> Dict:
+    """
+    Collect the metrics of the Keystone token validation of this worker.
+
+    :return: Dictionary with circuit breaker, token cache and coalescing metrics
+    :rtype: Dict
+    """
+    return {
+        'circuit_breaker': keystone_breaker.metrics(),
+        'token_cache': token_cache.stats(),
+        'token_validation': token_validation_flight.stats(),
+    }
+
+
+def keystone_reachable() -> bool:
+    """
+    Check whether Keystone is considered reachable by this worker, based on the
+    recent token validations recorded by the circuit breaker. Keystone is not called.
+
+    :return: False while the circuit breaker is open, else True
+    :rtype: bool
+    """
+    return keystone_breaker.state != OPEN
+
 
 class KeystoneAuthenticationMiddleware:
     """
@@ -42,50 +134,142 @@ class KeystoneAuthenticationMiddleware:
         :return: Response or the response from the view function
         :rtype: Response or HttpResponse
         """
+        if is_public_path(request.path):
+            return self.get_response(request)
+
         token = request.headers.get('X-Auth-Token')
         if not token:
             logger.error('OpenStack Authentication Token missing')
             return JsonResponse({'error': 'OpenStack Authentication Token missing'}, status=401)
 
-        keystone_user_info = self.validate_token_with_keystone(token)
+        try:
+            keystone_user_info = self.validate_token_with_keystone(token)
+        except KeystoneUnavailableError:
+            logger.error('Keystone unavailable, token validation rejected')
+            return JsonResponse({'error': 'Keystone unavailable'}, status=503)
         if keystone_user_info is None:
             logger.error('Invalid token')
             return JsonResponse({'error': 'Invalid token'}, status=401)
-        user = self.get_or_create_user(keystone_user_info)
-        request.myuser = user
-        if not check_request_access(request):
-            return JsonResponse({'error': f'Access level of user {user.id} not sufficient'}, status=403)
+        request.myuser = self.get_or_create_user(keystone_user_info)
 
         response = self.get_response(request)
         return response
 
+    def process_view(self, request: Request, _view_func: Callable, _view_args: list,
+                     _view_kwargs: dict) -> Optional[JsonResponse]:
+        """
+        Check the access level of the user once Django resolved the route,
+        so the route does not have to be resolved a second time.
+
+        :param Request request: The incoming HTTP request
+        :param function _view_func: The resolved view function (unused)
+        :param list _view_args: Positional arguments of the view (unused)
+        :param dict _view_kwargs: Keyword arguments of the view (unused)
+        :return: Response if access is denied, else None to continue with the view
+        :rtype: Optional[JsonResponse]
+        """
+        if is_public_path(request.path):
+            return None
+        if not check_request_access(request):
+            return JsonResponse({'error': f'Access level of user {request.myuser.id} not sufficient'},
+                                status=403)
+        return None
+
     def validate_token_with_keystone(self, token: str) -> Optional[Dict]:
         """
         Validate the OpenStack authentication token with Keystone.
+        Successfully validated tokens are cached until they expire in Keystone
+        or the configured TTL is reached, so cache hits skip the Keystone call.
+        On a cache miss, concurrent validations of the same token wait for a single
+        Keystone call and share its result.
+
+        While the Keystone circuit breaker is open, recently validated tokens are
+        served from the cache within the configured grace window, all other
+        validations fail fast.
 
         :param str token: The OpenStack token to validate
         :return: Dictionary with Keystone user information if valid, else None
         :rtype: Optional[Dict]
+        :raises KeystoneUnavailableError: If Keystone is unavailable and the token is not cached
+        """
+        cache_key = hash_token(token)
+        keystone_user_info = token_cache.get(cache_key)
+        if keystone_user_info is not None:
+            return keystone_user_info
+
+        if not keystone_breaker.allow_request():
+            keystone_user_info = token_cache.get_stale(cache_key)
+            if keystone_user_info is not None:
+                return keystone_user_info
+            raise KeystoneUnavailableError('Keystone circuit breaker is open')
+
+        # Concurrent validations of the same token share a single Keystone call
+        return token_validation_flight.do(cache_key, lambda: self.request_token_validation(token, cache_key))
+
+    def request_token_validation(self, token: str, cache_key: str) -> Optional[Dict]:
+        """
+        Request the validation of the OpenStack authentication token from Keystone
+        and cache the result if the token is valid. The outcome is recorded in the
+        Keystone circuit breaker. If Keystone fails, a recently validated token is
+        served from the cache within the configured grace window.
+
+        :param str token: The OpenStack token to validate
+        :param str cache_key: Key of the token in the token cache
+        :return: Dictionary with Keystone user information if valid, else None
+        :rtype: Optional[Dict]
+        :raises KeystoneUnavailableError: If Keystone fails and the token is not cached
         """
-        keystone_url = f"http://{settings.OPENSTACK['auth_url']}v3/auth/tokens"
-        headers = {'X-Auth-Token': token, 'X-Subject-Token': token}
         try:
-            response = requests.get(keystone_url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                return response.json()['token']['user']
-            else:
-                logger.error('Keystone token validation failed with status code: %s', response.status_code)
-                return None
+            response = get_keystone_client().validate_token(token)
         except requests.Timeout:
             logger.error('Keystone token validation request timed out')
-            return None
+            return self.handle_keystone_failure(cache_key)
         except requests.RequestException as e:
             logger.error(f'Keystone token validation request failed: {e}')
+            return self.handle_keystone_failure(cache_key)
+        except Exception:
+            # Any other error, e.g. while creating the client, must not leave a probe of a
+            # half open breaker in flight, which would reject all calls from then on
+            keystone_breaker.record_failure()
+            raise
+
+        if response.status_code >= 500:
+            logger.error('Keystone token validation failed with status code: %s', response.status_code)
+            return self.handle_keystone_failure(cache_key)
+
+        keystone_breaker.record_success()
+        if response.status_code == 200:
+            token_data = response.json()['token']
+            remaining_lifetime = seconds_until_expiry(token_data.get('expires_at'))
+            stale_lifetime = token_cache.ttl + settings.OPENSTACK['stale_token_grace']
+            if remaining_lifetime is not None:
+                stale_lifetime = min(stale_lifetime, remaining_lifetime)
+            token_cache.set(cache_key, token_data['user'], ttl=remaining_lifetime, stale_ttl=stale_lifetime)
+            return token_data['user']
+        else:
+            logger.error('Keystone token validation failed with status code: %s', response.status_code)
             return None
 
+    def handle_keystone_failure(self, cache_key: str) -> Dict:
+        """
+        Record a failed Keystone call and fall back to a recently validated token.
+
+        :param str cache_key: Key of the token in the token cache
+        :return: Cached Keystone user information within the grace window
+        :rtype: Dict
+        :raises KeystoneUnavailableError: If the token is not cached within the grace window
+        """
+        keystone_breaker.record_failure()
+        keystone_user_info = token_cache.get_stale(cache_key)
+        if keystone_user_info is None:
+            raise KeystoneUnavailableError('Keystone token validation failed')
+        return keystone_user_info
+
     def get_or_create_user(self, keystone_user_info: Dict) -> Users:
         """
         Retrieve or create a user based on Keystone user information.
+        Existing users are served from the per worker user cache,
+        concurrent first requests of a new user create it only once.
 
         :param Dict keystone_user_info: Keystone user information dictionary
         :return: User instance
@@ -95,11 +279,11 @@ class KeystoneAuthenticationMiddleware:
         keystone_role = keystone_user_info['name']
 
         try:
-            user = get_user_by_id(user_id)
+            user = get_cached_user_by_id(user_id)
         except ObjectDoesNotExist:
             user_dict = {
                 'id': user_id,
                 'keystone_role_name': keystone_role
             }
-            user = create_user(user_dict)
+            user = user_provisioning_flight.do(user_id, lambda: create_user(user_dict))
         return user
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-18 07:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eduvmstore', '0018_remove_apptemplates_per_user_cores_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='apptemplates',
+            index=models.Index(fields=['created_at', 'id'], name='app_template_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+import uuid
+
+from django.db import migrations
+
+FTS_TABLE = 'eduvmstore_apptemplates_fts'
+
+
+def create_search_index(apps, schema_editor):
+    # Full-text search relies on SQLite FTS5, other databases fall back to substring search
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    AppTemplates = apps.get_model('eduvmstore', 'AppTemplates')
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        f"id, name, short_description, description, instantiation_notice, "
+        f"tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')")
+    rows = [(uuid.UUID(str(app_template.id)).int >> 65, app_template.id.hex, app_template.name,
+             app_template.short_description, app_template.description,
+             app_template.instantiation_notice or '')
+            for app_template in AppTemplates.objects.all().iterator()]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} '
+            f'(rowid, id, name, short_description, description, instantiation_notice) '
+            f'VALUES (%s, %s, %s, %s, %s, %s)', rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eduvmstore', '0019_apptemplates_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,49 @@
+import re
+
+from django.db import migrations, models
+
+# Copy of eduvmstore.utils.string_utils.VERSION_SUFFIX_PATTERN at the time of this migration
+VERSION_SUFFIX_PATTERN = r'-V\d+$'
+BATCH_SIZE = 1000
+
+
+def backfill_base_names(apps, schema_editor):
+    AppTemplates = apps.get_model('eduvmstore', 'AppTemplates')
+    batch = []
+    for app_template in AppTemplates.objects.only('id', 'name').iterator(chunk_size=BATCH_SIZE):
+        match = re.search(VERSION_SUFFIX_PATTERN, app_template.name)
+        if match is None:
+            app_template.base_name, app_template.name_version = app_template.name, None
+        else:
+            app_template.base_name = app_template.name[:match.start()]
+            app_template.name_version = int(match.group(0)[2:])
+        batch.append(app_template)
+        if len(batch) == BATCH_SIZE:
+            AppTemplates.objects.bulk_update(batch, ['base_name', 'name_version'])
+            batch = []
+    AppTemplates.objects.bulk_update(batch, ['base_name', 'name_version'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eduvmstore', '0020_apptemplates_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apptemplates',
+            name='base_name',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='apptemplates',
+            name='name_version',
+            field=models.IntegerField(default=None, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_base_names, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='apptemplates',
+            index=models.Index(fields=['base_name', 'name_version'], name='app_template_base_name_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-18 07:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eduvmstore', '0021_apptemplates_base_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='apptemplates',
+            index=models.Index(fields=['deleted', 'public', 'approved', 'created_at', 'id'],
+                               name='app_template_review_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.20 on 2026-10-18 08:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eduvmstore', '0022_apptemplates_review_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='favorites',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='roles',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
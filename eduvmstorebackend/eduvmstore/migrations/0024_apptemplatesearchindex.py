@@ -0,0 +1,25 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eduvmstore', '0023_favorites_created_at_roles_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppTemplateSearchIndex',
+            fields=[
+                ('app_template_id', models.OneToOneField(db_column='id', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='eduvmstore.apptemplates')),
+                ('document', models.TextField(db_column='eduvmstore_apptemplates_fts')),
+            ],
+            options={
+                'db_table': 'eduvmstore_apptemplates_fts',
+                'managed': False,
+            },
+        ),
+    ]
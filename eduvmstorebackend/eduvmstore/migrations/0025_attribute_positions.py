@@ -0,0 +1,58 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:05
+
+from django.db import migrations, models
+
+POSITIONED_MODELS = ('AppTemplateAccountAttributes', 'AppTemplateInstantiationAttributes',
+                     'AppTemplateSecurityGroups')
+
+
+def backfill_positions(apps, schema_editor):
+    # Until now the rows were read in insertion order, which SQLite keeps in the rowid.
+    # Other databases had no defined order, their rows keep position 0.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for model_name in POSITIONED_MODELS:
+        model = apps.get_model('eduvmstore', model_name)
+        table = schema_editor.quote_name(model._meta.db_table)
+        column = schema_editor.quote_name(model._meta.get_field('app_template_id').column)
+        schema_editor.execute(
+            f'UPDATE {table} SET position = (SELECT COUNT(*) FROM {table} AS previous '
+            f'WHERE previous.{column} = {table}.{column} AND previous.rowid < {table}.rowid)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eduvmstore', '0024_apptemplatesearchindex'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='apptemplateaccountattributes',
+            options={'ordering': ['position']},
+        ),
+        migrations.AlterModelOptions(
+            name='apptemplateinstantiationattributes',
+            options={'ordering': ['position']},
+        ),
+        migrations.AlterModelOptions(
+            name='apptemplatesecuritygroups',
+            options={'ordering': ['position']},
+        ),
+        migrations.AddField(
+            model_name='apptemplateaccountattributes',
+            name='position',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='apptemplateinstantiationattributes',
+            name='position',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='apptemplatesecuritygroups',
+            name='position',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_positions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+from django.utils import timezone
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients closing the connection early (e.g. after a timeout) are expected
+        pass
+
+
+class StubKeystone:
+    """
+    Minimal local Keystone that answers token validation requests.
+
+    Tokens have to be registered with add_token before they are accepted.
+    The number of received validation requests and opened connections is
+    counted, so tests can measure how often the backend actually contacts Keystone.
+    Latency and error responses can be injected to simulate a degraded Keystone.
+    """
+
+    def __init__(self) -> None:
+        self.tokens: Dict[str, Dict] = {}
+        self.request_count = 0
+        self.connections = set()
+        # Seconds to wait before answering a request
+        self.latency = 0.0
+        # Number of upcoming requests answered with error_status
+        self.fail_count = 0
+        self.error_status = 503
+        self._lock = threading.Lock()
+        self._server = _QuietHTTPServer(('127.0.0.1', 0), self._create_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def auth_url(self) -> str:
+        """Auth url in the format expected by settings.OPENSTACK['auth_url']."""
+        host, port = self._server.server_address
+        return f'{host}:{port}/identity/'
+
+    def add_token(self, token: str, user_id: str, user_name: str = 'User',
+                  expires_in: float = 3600) -> None:
+        expires_at = timezone.now() + timedelta(seconds=expires_in)
+        self.tokens[token] = {
+            'expires_at': expires_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+            'user': {'id': user_id, 'name': user_name},
+        }
+
+    def reset(self) -> None:
+        self.request_count = 0
+        self.connections = set()
+        self.latency = 0.0
+        self.fail_count = 0
+
+    def start(self) -> 'StubKeystone':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _create_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 keeps connections alive between requests
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):  # noqa: N802
+                with stub._lock:
+                    stub.request_count += 1
+                    stub.connections.add(self.client_address)
+                    fail = stub.fail_count > 0
+                    if fail:
+                        stub.fail_count -= 1
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                token = stub.tokens.get(self.headers.get('X-Subject-Token'))
+                if fail:
+                    self._send(stub.error_status, {'error': {'code': stub.error_status}})
+                elif self.path != '/identity/v3/auth/tokens' or token is None:
+                    self._send(404, {'error': {'code': 404}})
+                else:
+                    self._send(200, {'token': token})
+
+            def _send(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from eduvmstore.config.access_levels import DEFAULT_ROLES
+from eduvmstore.db.models import Roles, Users
+from eduvmstore.utils.access_control import PermissionContext, get_allowed_operations
+
+
+class PermissionContextTests(TestCase):
+
+    def setUp(self):
+        self.admin_role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreAdmin"]["name"],
+                                               access_level=DEFAULT_ROLES["EduVMStoreAdmin"]["access_level"])
+        self.user_role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreUser"]["name"],
+                                              access_level=DEFAULT_ROLES["EduVMStoreUser"]["access_level"])
+        self.admin_user = Users.objects.create(role_id=self.admin_role)
+        self.normal_user = Users.objects.create(role_id=self.user_role)
+
+    def test_precomputes_capabilities_from_access_level(self):
+        admin = PermissionContext(self.admin_user, 'app-template-list', 'GET')
+        user = PermissionContext(self.normal_user, 'app-template-list', 'GET')
+
+        self.assertTrue(admin.allowed and user.allowed)
+        self.assertTrue(admin.can_list_all_app_templates)
+        self.assertTrue(admin.can_delete_approved_app_templates)
+        self.assertFalse(user.can_list_all_app_templates)
+        self.assertFalse(user.can_list_all_users)
+
+    def test_denied_request_and_unknown_operation(self):
+        context = PermissionContext(self.normal_user, 'user-list', 'POST')
+        self.assertFalse(context.allowed)
+        # Operations without a required access level need the default access level
+        self.assertFalse(context.allows('unknown-route', 'GET'))
+
+    def test_allowed_operations_are_computed_once_per_access_level(self):
+        self.assertIs(get_allowed_operations(2000), get_allowed_operations(2000))
+
+    def test_capability_probes_do_not_log(self):
+        with self.assertNoLogs('eduvmstore_logger', level='ERROR'):
+            PermissionContext(self.normal_user, 'app-template-list', 'GET').allows('user-list-all', 'GET')
+
+
+@patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+       '.validate_token_with_keystone')
+class RequestPermissionTests(APITestCase):
+
+    def setUp(self):
+        user_role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreUser"]["name"],
+                                         access_level=DEFAULT_ROLES["EduVMStoreUser"]["access_level"])
+        self.normal_user = Users.objects.create(role_id=user_role)
+
+    def test_list_request_of_normal_user_resolves_once_and_does_not_log(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.normal_user.id, 'name': 'User'}
+        with patch('eduvmstore.utils.access_control.resolve') as mock_resolve, \
+                self.assertNoLogs('eduvmstore_logger', level='ERROR'):
+            response = self.client.get(reverse('app-template-list'), HTTP_X_AUTH_TOKEN="valid_token")
+
+        self.assertEqual(response.status_code, 200)
+        mock_resolve.assert_not_called()
+
+    def test_denied_request_is_logged(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.normal_user.id, 'name': 'User'}
+        with self.assertLogs('eduvmstore_logger', level='ERROR') as logs:
+            response = self.client.post(reverse('role-list'), {'name': 'Role', 'access_level': 1},
+                                        HTTP_X_AUTH_TOKEN="valid_token")
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(len(logs.output), 1)
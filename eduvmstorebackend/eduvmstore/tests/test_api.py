@@ -1,17 +1,36 @@
 import logging
+from datetime import timedelta
 
 from rest_framework import status
 from rest_framework.test import APITestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.urls import reverse
 
-from eduvmstore.config.access_levels import DEFAULT_ROLES
+from eduvmstore.api.conditional import ConditionalGetMixin
+from eduvmstore.config.access_levels import DEFAULT_ACCESS_LEVEL, DEFAULT_ROLES
 from eduvmstore.db.models import (AppTemplates, Users, Roles, AppTemplateInstantiationAttributes,
                                   AppTemplateAccountAttributes, Favorites, AppTemplateSecurityGroups)
+from eduvmstore.db.operations.app_templates import app_template_response_cache, free_name_cache
+from eduvmstore.db.operations.roles import role_cache
+from eduvmstore.db.operations.users import delete_user, user_cache
+from eduvmstore.db.search import reset_fuzzy_index
+from eduvmstore.middleware.authentication_middleware import keystone_breaker
 from unittest.mock import patch
 import uuid
 
 logger = logging.getLogger('eduvmstore_logger')
 
+# Query counts of the response cache depend on its backend, the database backend queries the cache table
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'app_templates': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                      'LOCATION': 'test-app-templates'},
+}
+
 
 class AppTemplateViewSetTests(APITestCase):
 
@@ -62,6 +81,9 @@ class AppTemplateViewSetTests(APITestCase):
 
     def setUp(self):
         self.create_user_and_role()
+        role_cache.reset()
+        free_name_cache.reset()
+        app_template_response_cache.clear()
         self.client.force_authenticate(user=self.admin_user)
         self.app_template = self.create_app_template()
 
@@ -214,6 +236,169 @@ class AppTemplateViewSetTests(APITestCase):
         # Verify that the app template was not updated
         self.assertEqual(AppTemplates.objects.get(id=self.app_template.id).name, self.app_template.name)
 
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_update_only_writes_changed_attributes(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': str(uuid.uuid4()), 'name': 'Admin'}
+        url = reverse('app-template-detail', args=[self.app_template.id])
+        account_attributes = [{"name": f"Attribute{i}"} for i in range(50)]
+        data = {
+            "name": "Renamed Template",
+            "description": "A test template",
+            "short_description": "Test",
+            "image_id": self.app_template.image_id,
+            "instantiation_attributes": [{"name": "JavaVersion"}],
+            "account_attributes": account_attributes,
+            "security_groups": [{"name": "default"}],
+            "public": True,
+            "fixed_ram_gb": 1.0,
+            "fixed_disk_gb": 10.0,
+            "fixed_cores": 1.0,
+        }
+        self.client.put(url, data, format='json', **self.get_auth_headers())
+        kept_ids = set(AppTemplateAccountAttributes.objects.filter(name__in=["Attribute1", "Attribute2"])
+                       .values_list('id', flat=True))
+
+        data["name"] = "Renamed Template 2"
+        data["account_attributes"] = account_attributes[1:] + [{"name": "Added"}]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(url, data, format='json', **self.get_auth_headers())
+        self.assertEqual(response.status_code, 200)
+
+        writes = [query['sql'] for query in queries.captured_queries
+                  if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        # One insert and one delete of the account attributes and the update of the AppTemplate,
+        # the unchanged instantiation attributes and security groups are not written
+        self.assertEqual(len(writes), 3)
+        self.assertEqual(sorted(attribute['name'] for attribute in response.data['account_attributes']),
+                         sorted(attribute['name'] for attribute in data["account_attributes"]))
+        self.assertEqual(kept_ids, set(AppTemplateAccountAttributes.objects
+                                       .filter(name__in=["Attribute1", "Attribute2"])
+                                       .values_list('id', flat=True)))
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_update_keeps_order_of_reordered_attributes(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': str(uuid.uuid4()), 'name': 'Admin'}
+        url = reverse('app-template-detail', args=[self.app_template.id])
+        data = {"account_attributes": [{"name": "Username"}, {"name": "Password"}]}
+        response = self.client.patch(url, data, format='json', **self.get_auth_headers())
+        self.assertEqual(response.status_code, 200)
+
+        data = {"account_attributes": [{"name": "Password"}, {"name": "Username"}]}
+        response = self.client.patch(url, data, format='json', **self.get_auth_headers())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([attribute['name'] for attribute in response.data['account_attributes']],
+                         ["Password", "Username"])
+        stored = AppTemplateAccountAttributes.objects.filter(app_template_id=self.app_template.id)
+        self.assertEqual(list(stored.values_list('name', flat=True)), ["Password", "Username"])
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_update_orders_attributes_by_position_after_partial_updates(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': str(uuid.uuid4()), 'name': 'Admin'}
+        url = reverse('app-template-detail', args=[self.app_template.id])
+        AppTemplateAccountAttributes.objects.filter(app_template_id=self.app_template).delete()
+        # Inserted in another order than their positions
+        password = AppTemplateAccountAttributes.objects.create(
+            app_template_id=self.app_template, name="Password", position=1)
+        username = AppTemplateAccountAttributes.objects.create(
+            app_template_id=self.app_template, name="Username", position=0)
+        stored = AppTemplateAccountAttributes.objects.filter(app_template_id=self.app_template.id)
+
+        for names in (["Username", "Password", "SSH Key"], ["Username", "SSH Key"],
+                      ["Username", "SSH Key", "Password"]):
+            data = {"account_attributes": [{"name": name} for name in names]}
+            response = self.client.patch(url, data, format='json', **self.get_auth_headers())
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([attribute['name'] for attribute in response.data['account_attributes']], names)
+            self.assertEqual(list(stored.values_list('name', flat=True)), names)
+        # Rows matching the beginning of the list were never written again
+        self.assertTrue(stored.filter(id=username.id).exists())
+        self.assertFalse(stored.filter(id=password.id).exists())
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_update_keeps_duplicate_attribute_names(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': str(uuid.uuid4()), 'name': 'Admin'}
+        url = reverse('app-template-detail', args=[self.app_template.id])
+        data = {
+            "name": "Renamed Template",
+            "description": "A test template",
+            "short_description": "Test",
+            "image_id": self.app_template.image_id,
+            "instantiation_attributes": [{"name": "JavaVersion"}, {"name": "JavaVersion"}],
+            "account_attributes": [],
+            "security_groups": [{"name": "default"}],
+            "fixed_ram_gb": 1.0,
+            "fixed_disk_gb": 10.0,
+            "fixed_cores": 1.0,
+        }
+        response = self.client.put(url, data, format='json', **self.get_auth_headers())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([attribute['name'] for attribute in response.data['instantiation_attributes']],
+                         ["JavaVersion", "JavaVersion"])
+        self.assertEqual(response.data['account_attributes'], [])
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_partial_update_writes_only_changed_columns(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        url = reverse('app-template-detail', args=[self.app_template.id])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {"short_description": "Patched"}, format='json',
+                                         **self.get_auth_headers())
+        self.assertEqual(response.status_code, 200)
+
+        writes = [query['sql'] for query in queries.captured_queries
+                  if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        self.assertEqual(len(writes), 1)
+        self.assertIn('"short_description"', writes[0])
+        self.assertIn('"updated_at"', writes[0])
+        self.assertNotIn('"description"', writes[0])
+        self.assertNotIn('"script"', writes[0])
+
+        app_template = AppTemplates.objects.get(id=self.app_template.id)
+        self.assertEqual(app_template.short_description, "Patched")
+        # Absent fields keep their values instead of being reset to their defaults
+        self.assertTrue(app_template.ssh_user_requested)
+        self.assertTrue(app_template.public)
+        self.assertEqual(app_template.volume_size_gb, 100)
+        self.assertEqual(response.data['account_attributes'][0]['name'], "Username")
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_update_without_changes_writes_nothing(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        url = reverse('app-template-detail', args=[self.app_template.id])
+        data = {
+            "name": self.app_template.name,
+            "description": self.app_template.description,
+            "short_description": self.app_template.short_description,
+            "instantiation_notice": self.app_template.instantiation_notice,
+            "script": self.app_template.script,
+            "ssh_user_requested": True,
+            "instantiation_attributes": [{"name": "JavaVersion"}],
+            "account_attributes": [{"name": "Username"}],
+            "security_groups": [{"name": "default"}],
+            "image_id": self.app_template.image_id,
+            "public": True,
+            "volume_size_gb": 100,
+            "fixed_ram_gb": 1.0,
+            "fixed_disk_gb": 10.0,
+            "fixed_cores": 1.0,
+        }
+        for method in [self.client.put, self.client.patch]:
+            with CaptureQueriesContext(connection) as queries:
+                response = method(url, data, format='json', **self.get_auth_headers())
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse([query['sql'] for query in queries.captured_queries
+                              if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))])
+        self.assertEqual(AppTemplates.objects.get(id=self.app_template.id).updated_at,
+                         self.app_template.updated_at)
+
     @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
            '.validate_token_with_keystone')
     def test_filters_app_templates_by_search(self, mock_validate_token):
@@ -224,6 +409,17 @@ class AppTemplateViewSetTests(APITestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['name'], self.app_template.name)
 
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_filters_app_templates_by_fuzzy_search(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': str(uuid.uuid4()), 'name': 'Admin'}
+        reset_fuzzy_index()
+        url = reverse('app-template-list') + '?search=Tset Templat&fuzzy=true'
+        response = self.client.get(url, format='json', **self.get_auth_headers())
+        reset_fuzzy_index()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([app_template['name'] for app_template in response.data], [self.app_template.name])
+
     @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
            '.validate_token_with_keystone')
     def test_list_app_templates_for_admin_with_private_templates(self, mock_validate_token):
@@ -330,6 +526,39 @@ class AppTemplateViewSetTests(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertFalse(response.data['collision'])
 
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_name_collision_check_caches_free_names_until_taken(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': str(uuid.uuid4()), 'name': 'Admin'}
+        url = reverse('app-template-check-name-collision', kwargs={'name': 'Free Template'})
+        self.client.get(url, format='json', **self.get_auth_headers())
+        with self.assertNumQueries(0):
+            self.assertEqual(free_name_cache.get('Free Template'), True)
+
+        self.app_template.name = 'Free Template-V1'
+        self.app_template.save()
+        response = self.client.get(url, format='json', **self.get_auth_headers())
+        self.assertTrue(response.data['collision'])
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_checks_name_collisions_in_batch(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': str(uuid.uuid4()), 'name': 'Admin'}
+        url = reverse('app-template-check-name-collisions')
+        names = ['Free Template', self.app_template.name, 'Reserved-V2', 'Free Template']
+        response = self.client.post(url, {'names': names}, format='json', **self.get_auth_headers())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['name'] for result in response.data['results']], names)
+        self.assertEqual([result['collision'] for result in response.data['results']],
+                         [False, True, True, False])
+        self.assertEqual(response.data['results'][2]['reason'],
+                         "The version suffix '-V2' is reserved for approved templates")
+
+        for data in [{}, {'names': []}, {'names': 'Free Template'}, {'names': [1]},
+                     {'names': ['Name'] * 1001}]:
+            response = self.client.post(url, data, format='json', **self.get_auth_headers())
+            self.assertEqual(response.status_code, 400)
+
     @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
            '.validate_token_with_keystone')
     def test_approve_app_template_via_api_successfully(self, mock_validate_token):
@@ -364,6 +593,69 @@ class AppTemplateViewSetTests(APITestCase):
         self.assertFalse(AppTemplates.objects.get(id=self.app_template.id).approved)
         self.assertFalse(AppTemplates.objects.get(id=self.app_template.id).public)
 
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_bulk_approves_app_templates(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        other_app_template = AppTemplates.objects.create(
+            image_id=uuid.uuid4(), name="Other Template", description="", short_description="Other",
+            creator_id=self.normal_user, public=True, fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+        missing_id = str(uuid.uuid4())
+        url = reverse('app-template-bulk-approve')
+        data = {"ids": [str(self.app_template.id), missing_id, str(other_app_template.id)]}
+        response = self.client.patch(url, data, format='json', **self.get_auth_headers())
+        self.assertEqual(response.status_code, 200)
+
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], [200, 404, 200])
+        self.assertEqual(str(results[1]['id']), missing_id)
+        self.assertEqual(AppTemplates.objects.get(id=results[0]['public_app_template']['id']).name,
+                         "API Test Template-V1")
+        self.assertEqual(AppTemplateAccountAttributes.objects.filter(
+            app_template_id=results[0]['public_app_template']['id']).count(), 1)
+        self.assertTrue(AppTemplates.objects.get(id=results[2]['public_app_template']['id']).approved)
+        self.assertFalse(AppTemplates.objects.filter(id__in=[self.app_template.id, other_app_template.id],
+                                                     public=True).exists())
+
+        # The copies are found through the search index
+        response = self.client.get(reverse('app-template-list') + '?search=V1', format='json',
+                                   **self.get_auth_headers())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(app_template['name'] for app_template in response.data),
+                         ["API Test Template-V1", "Other Template-V1"])
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_bulk_rejects_app_templates(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        url = reverse('app-template-bulk-reject')
+        missing_id = str(uuid.uuid4())
+        data = {"ids": [str(self.app_template.id), missing_id, str(self.app_template.id)]}
+        response = self.client.patch(url, data, format='json', **self.get_auth_headers())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.data['results']], [200, 404])
+        self.assertFalse(AppTemplates.objects.get(id=self.app_template.id).public)
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_bulk_review_rejects_invalid_ids(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        for url in [reverse('app-template-bulk-approve'), reverse('app-template-bulk-reject')]:
+            for data in [{}, {'ids': []}, {'ids': ['not-a-uuid']}, {'ids': [str(uuid.uuid4())] * 1001}]:
+                response = self.client.patch(url, data, format='json', **self.get_auth_headers())
+                self.assertEqual(response.status_code, 400)
+        self.assertTrue(AppTemplates.objects.get(id=self.app_template.id).public)
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_bulk_approve_requires_approval_access_level(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.normal_user.id, 'name': 'User'}
+        url = reverse('app-template-bulk-approve')
+        response = self.client.patch(url, {"ids": [str(self.app_template.id)]}, format='json',
+                                     **self.get_auth_headers())
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(AppTemplates.objects.count(), 1)
+
     # As soft delete is currently not used, the assert statements are commented out
     @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
            '.validate_token_with_keystone')
@@ -476,6 +768,7 @@ class UserViewSetTests(APITestCase):
 
     def setUp(self):
         self.create_user_and_role()
+        role_cache.reset()
 
     @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
            '.validate_token_with_keystone')
@@ -648,4 +941,741 @@ class UserViewSetTests(APITestCase):
         self.assertFalse(Users.objects.filter(id=self.admin_user.id).exists())
 
         # Check that private templates are deleted
-        self.assertFalse(AppTemplates.objects.filter(id=private_template.id).exists())
\ No newline at end of file
+        self.assertFalse(AppTemplates.objects.filter(id=private_template.id).exists())
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_admin_imports_roster(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        new_user_id = uuid.uuid4()
+        roster = SimpleUploadedFile(
+            "roster.csv",
+            f"ID,Name\n{new_user_id.hex},student\n{self.normal_user.id.hex},User\n".encode(),
+            content_type="text/csv")
+
+        response = self.client.post(reverse('user-import'), {'roster': roster}, format='multipart',
+                                    **self.get_auth_headers())
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['created'], response.data['skipped']), (1, 1))
+        self.assertIn('duration_seconds', response.data)
+        self.assertEqual(Users.objects.get(id=new_user_id).role_id, self.normal_user.role_id)
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_normal_user_cannot_import_roster(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.normal_user.id, 'name': 'User'}
+        roster = SimpleUploadedFile("roster.csv", f"id\n{uuid.uuid4()}\n".encode(), content_type="text/csv")
+
+        response = self.client.post(reverse('user-import'), {'roster': roster}, format='multipart',
+                                    **self.get_auth_headers())
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Users.objects.count(), 2)
+
+
+@patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+       '.validate_token_with_keystone')
+class UnauthenticatedFastPathTests(APITestCase):
+
+    def tearDown(self):
+        keystone_breaker.reset()
+
+    def test_liveness_without_token_or_queries(self, mock_validate_token):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('health-live'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'status': 'alive'})
+        mock_validate_token.assert_not_called()
+
+    def test_health_paths_without_trailing_slash_redirect_without_token(self, mock_validate_token):
+        for name in ('health-live', 'health-ready'):
+            path = reverse(name)
+            response = self.client.get(path.rstrip('/'))
+            self.assertEqual(response.status_code, status.HTTP_301_MOVED_PERMANENTLY)
+            self.assertEqual(response['Location'], path)
+
+            response = self.client.get(path.rstrip('/'), follow=True)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_validate_token.assert_not_called()
+
+    def test_readiness_checks_database_and_keystone(self, mock_validate_token):
+        response = self.client.get(reverse('health-ready'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['checks'], {'database': True, 'keystone': True})
+        mock_validate_token.assert_not_called()
+
+    def test_not_ready_while_keystone_breaker_is_open(self, mock_validate_token):
+        for _ in range(keystone_breaker.min_calls):
+            keystone_breaker.record_failure()
+        response = self.client.get(reverse('health-ready'))
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(response.json()['checks']['keystone'])
+
+    def test_cors_preflight_is_answered_without_token(self, mock_validate_token):
+        with self.assertNumQueries(0):
+            response = self.client.options(reverse('app-template-list'),
+                                           HTTP_ORIGIN='http://frontend.example',
+                                           HTTP_ACCESS_CONTROL_REQUEST_METHOD='GET',
+                                           HTTP_ACCESS_CONTROL_REQUEST_HEADERS='x-auth-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('x-auth-token', response['Access-Control-Allow-Headers'])
+        mock_validate_token.assert_not_called()
+
+    def test_other_requests_still_require_token(self, mock_validate_token):
+        response = self.client.options(reverse('app-template-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+       '.validate_token_with_keystone')
+@override_settings(CACHES=LOCMEM_CACHES)
+class AppTemplateQueryCountTests(APITestCase):
+    # AppTemplates plus one query per nested relation, independent of the number of AppTemplates
+    MAX_QUERIES = 4
+    CATALOG_SIZE = 1000
+
+    @classmethod
+    def setUpTestData(cls):
+        role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreAdmin"]["name"],
+                                    access_level=DEFAULT_ROLES["EduVMStoreAdmin"]["access_level"])
+        cls.admin_user = Users.objects.create(role_id=role)
+        app_templates = AppTemplates.objects.bulk_create([
+            AppTemplates(image_id=uuid.uuid4(), name=f"Template {i}", description="Description",
+                         short_description="Short", creator_id=cls.admin_user, public=True, approved=True,
+                         fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+            for i in range(cls.CATALOG_SIZE)
+        ])
+        AppTemplateInstantiationAttributes.objects.bulk_create(
+            [AppTemplateInstantiationAttributes(app_template_id=app_template, name="JavaVersion")
+             for app_template in app_templates])
+        AppTemplateAccountAttributes.objects.bulk_create(
+            [AppTemplateAccountAttributes(app_template_id=app_template, name="Username")
+             for app_template in app_templates])
+        AppTemplateSecurityGroups.objects.bulk_create(
+            [AppTemplateSecurityGroups(app_template_id=app_template, name="default")
+             for app_template in app_templates])
+        Favorites.objects.bulk_create([Favorites(user_id=cls.admin_user, app_template_id=app_template)
+                                       for app_template in app_templates])
+        cls.app_template = app_templates[0]
+
+    def setUp(self):
+        user_cache.reset()
+
+    def get(self, url, extra_queries=0):
+        # The first request caches the user, so only the queries of the view are counted
+        self.client.get(url, HTTP_X_AUTH_TOKEN="valid_token")
+        app_template_response_cache.clear()
+        with self.assertNumQueries(self.MAX_QUERIES + extra_queries):
+            return self.client.get(url, HTTP_X_AUTH_TOKEN="valid_token")
+
+    def test_list_query_count(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        # Uncached, plus the check of the response cache whether the user has own AppTemplates
+        # and the aggregate of the ETag
+        response = self.get(reverse('app-template-list'), extra_queries=2)
+        self.assertEqual(len(response.data), self.CATALOG_SIZE)
+        self.assertEqual(len(response.data[0]['security_groups']), 1)
+
+    def test_detail_query_count(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        response = self.get(reverse('app-template-detail', args=[self.app_template.id]), extra_queries=2)
+        self.assertEqual(response.data['instantiation_attributes'][0]['name'], "JavaVersion")
+
+    def test_favorites_query_count(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        response = self.get(reverse('app-template-favorites'))
+        self.assertEqual(len(response.data), self.CATALOG_SIZE)
+        self.assertEqual(len(response.data[0]['account_attributes']), 1)
+
+
+@patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+       '.validate_token_with_keystone')
+class AppTemplatePaginationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreUser"]["name"],
+                                    access_level=DEFAULT_ROLES["EduVMStoreUser"]["access_level"])
+        cls.user = Users.objects.create(role_id=role)
+        created_at = timezone.now()
+        # Templates 0-4 share the same creation time to cover ties of the ordering key
+        cls.app_templates = AppTemplates.objects.bulk_create([
+            AppTemplates(image_id=uuid.uuid4(), name=f"Template {i}", description="Description",
+                         short_description="Short", creator_id=cls.user, public=True, approved=True,
+                         created_at=created_at + timedelta(seconds=max(i - 4, 0)),
+                         fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+            for i in range(12)
+        ])
+
+    def setUp(self):
+        app_template_response_cache.clear()
+
+    def get(self, params):
+        return self.client.get(reverse('app-template-list'), params, HTTP_X_AUTH_TOKEN="valid_token")
+
+    def test_list_without_opt_in_is_not_paginated(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.user.id, 'name': 'User'}
+        response = self.get({})
+        self.assertEqual(len(response.data), 12)
+
+    def test_pages_cover_the_list_in_stable_order(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.user.id, 'name': 'User'}
+        response = self.get({'page_size': 5})
+        pages = [[app_template['id'] for app_template in response.data['results']]]
+        while response.data['next']:
+            response = self.client.get(response.data['next'], HTTP_X_AUTH_TOKEN="valid_token")
+            pages.append([app_template['id'] for app_template in response.data['results']])
+
+        self.assertEqual([len(page) for page in pages], [5, 5, 2])
+        ids = [id for page in pages for id in page]
+        expected = AppTemplates.objects.order_by('created_at', 'id').values_list('id', flat=True)
+        self.assertEqual(ids, [str(id) for id in expected])
+
+    def test_page_query_uses_key_instead_of_offset(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.user.id, 'name': 'User'}
+        next_url = self.get({'page_size': 5}).data['next']
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(next_url, HTTP_X_AUTH_TOKEN="valid_token")
+        # Skip the aggregate of the ETag
+        page_query = next(query['sql'] for query in queries.captured_queries
+                          if 'FROM "eduvmstore_apptemplates"' in query['sql']
+                          and 'COUNT' not in query['sql'])
+        self.assertNotIn('OFFSET', page_query)
+        self.assertIn('LIMIT 6', page_query)
+
+    def test_invalid_cursor(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.user.id, 'name': 'User'}
+        response = self.get({'cursor': 'invalid'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_is_not_paginated(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.user.id, 'name': 'User'}
+        for params in ({'search': 'Template', 'page_size': 5},
+                       {'search': 'Template', 'fuzzy': 'true', 'page_size': 5},
+                       {'search': 'Template', 'cursor': 'invalid'}):
+            response = self.get(params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('search', response.data)
+
+
+@patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+       '.validate_token_with_keystone')
+class AppTemplateReviewQueueTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        admin_role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreAdmin"]["name"],
+                                          access_level=DEFAULT_ROLES["EduVMStoreAdmin"]["access_level"])
+        user_role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreUser"]["name"],
+                                         access_level=DEFAULT_ROLES["EduVMStoreUser"]["access_level"])
+        cls.admin_user = Users.objects.create(role_id=admin_role)
+        cls.user = Users.objects.create(role_id=user_role)
+        created_at = timezone.now()
+
+        def create(name, minutes, **kwargs):
+            return AppTemplates(image_id=uuid.uuid4(), name=name, description="Description",
+                                short_description="Short", creator_id=cls.user,
+                                created_at=created_at - timedelta(minutes=minutes),
+                                fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0, **kwargs)
+
+        cls.pending = AppTemplates.objects.bulk_create([
+            create(f"Pending {i}", minutes=10 - i, public=True, approved=False) for i in range(5)])
+        AppTemplates.objects.bulk_create([
+            create("Private", minutes=20, public=False, approved=False),
+            create("Approved", minutes=20, public=True, approved=True),
+            create("Deleted", minutes=20, public=True, approved=False, deleted=True),
+        ])
+
+    def get(self, params):
+        return self.client.get(reverse('app-template-review-queue'), params, HTTP_X_AUTH_TOKEN="valid_token")
+
+    def test_lists_pending_app_templates_oldest_first(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        response = self.get({'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 5)
+        names = [app_template['name'] for app_template in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'], HTTP_X_AUTH_TOKEN="valid_token")
+            self.assertEqual(response.data['count'], 5)
+            names += [app_template['name'] for app_template in response.data['results']]
+        self.assertEqual(names, [f"Pending {i}" for i in range(5)])
+
+    def test_review_queue_is_paginated_by_default(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        response = self.get({})
+        self.assertEqual(response.data['count'], 5)
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_review_queue_uses_index(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        with CaptureQueriesContext(connection) as queries:
+            self.get({'page_size': 2})
+        for query in queries.captured_queries:
+            if 'FROM "eduvmstore_apptemplates"' not in query['sql']:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+                plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+            self.assertIn('app_template_review_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_review_queue_requires_access_level(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.user.id, 'name': 'User'}
+        self.assertEqual(self.get({}).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_private_filter_for_admins_excludes_deleted(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        response = self.client.get(reverse('app-template-list'), {'public': 'false'},
+                                   HTTP_X_AUTH_TOKEN="valid_token")
+        self.assertEqual([app_template['name'] for app_template in response.data], ["Private"])
+
+
+@patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+       '.validate_token_with_keystone')
+@override_settings(CACHES=LOCMEM_CACHES)
+class AppTemplateResponseCacheTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        admin_role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreAdmin"]["name"],
+                                          access_level=DEFAULT_ROLES["EduVMStoreAdmin"]["access_level"])
+        user_role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreUser"]["name"],
+                                         access_level=DEFAULT_ROLES["EduVMStoreUser"]["access_level"])
+        cls.admin_user = Users.objects.create(role_id=admin_role)
+        cls.users = [Users.objects.create(role_id=user_role) for _ in range(2)]
+        cls.public_app_template = AppTemplates.objects.create(
+            image_id=uuid.uuid4(), name="Public Template", description="", short_description="Public",
+            creator_id=cls.admin_user, public=True, approved=True,
+            fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+        cls.draft = AppTemplates.objects.create(
+            image_id=uuid.uuid4(), name="Draft", description="", short_description="Draft",
+            creator_id=cls.admin_user, fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+
+    def setUp(self):
+        user_cache.reset()
+        app_template_response_cache.clear()
+
+    def get(self, mock_validate_token, user, url=None):
+        mock_validate_token.return_value = {'id': user.id, 'name': 'User'}
+        return self.client.get(url or reverse('app-template-list'), HTTP_X_AUTH_TOKEN="valid_token")
+
+    def names(self, response):
+        return sorted(app_template['name'] for app_template in response.data)
+
+    def test_users_without_own_app_templates_share_the_public_catalog(self, mock_validate_token):
+        self.get(mock_validate_token, self.users[0])
+        self.get(mock_validate_token, self.users[1])
+        with self.assertNumQueries(0):
+            response = self.get(mock_validate_token, self.users[0])
+        self.assertEqual(self.names(response), ["Public Template"])
+        # The list of the second user and the three lookups of the last request hit
+        self.assertEqual(app_template_response_cache.stats()['hits'], 4)
+
+    def test_detail_is_cached(self, mock_validate_token):
+        url = reverse('app-template-detail', args=[self.public_app_template.id])
+        self.get(mock_validate_token, self.users[0], url)
+        with self.assertNumQueries(0):
+            response = self.get(mock_validate_token, self.users[0], url)
+        self.assertEqual(response.data['name'], "Public Template")
+
+    def test_update_of_public_app_template_invalidates_catalog(self, mock_validate_token):
+        self.get(mock_validate_token, self.users[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.public_app_template.name = "Renamed Template"
+            self.public_app_template.save()
+        self.assertEqual(self.names(self.get(mock_validate_token, self.users[0])), ["Renamed Template"])
+
+    def test_private_draft_keeps_catalog_cached(self, mock_validate_token):
+        self.get(mock_validate_token, self.users[0])
+        admin_response = self.get(mock_validate_token, self.admin_user)
+        self.assertEqual(self.names(admin_response), ["Draft", "Public Template"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.short_description = "Changed"
+            self.draft.save()
+        hits = app_template_response_cache.stats()['hits']
+        self.get(mock_validate_token, self.users[0])
+        self.assertEqual(app_template_response_cache.stats()['hits'], hits + 3)
+        admin_response = self.get(mock_validate_token, self.admin_user)
+        draft = next(app_template for app_template in admin_response.data if app_template['name'] == "Draft")
+        self.assertEqual(draft['short_description'], "Changed")
+
+    def test_first_own_app_template_moves_user_to_own_scope(self, mock_validate_token):
+        self.get(mock_validate_token, self.users[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            AppTemplates.objects.create(
+                image_id=uuid.uuid4(), name="Own Template", description="", short_description="Own",
+                creator_id=self.users[0], fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+        self.assertEqual(self.names(self.get(mock_validate_token, self.users[0])),
+                         ["Own Template", "Public Template"])
+        self.assertEqual(self.names(self.get(mock_validate_token, self.users[1])), ["Public Template"])
+
+    def test_deleting_user_invalidates_transferred_app_templates(self, mock_validate_token):
+        with self.captureOnCommitCallbacks(execute=True):
+            owned = AppTemplates.objects.create(
+                image_id=uuid.uuid4(), name="Owned Template", description="", short_description="Owned",
+                creator_id=self.users[1], public=True, approved=True,
+                fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+        detail_url = reverse('app-template-detail', args=[owned.id])
+        self.get(mock_validate_token, self.users[0])
+        self.get(mock_validate_token, self.users[0], detail_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_user(self.users[1], self.admin_user)
+
+        response = self.get(mock_validate_token, self.users[0])
+        listed = {app_template['id']: app_template for app_template in response.data}
+        self.assertEqual(str(listed[str(owned.id)]['creator_id']), str(self.admin_user.id))
+        response = self.get(mock_validate_token, self.users[0], detail_url)
+        self.assertEqual(str(response.data['creator_id']), str(self.admin_user.id))
+
+    def test_bulk_reject_invalidates_catalog(self, mock_validate_token):
+        self.get(mock_validate_token, self.users[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+            response = self.client.patch(reverse('app-template-bulk-reject'),
+                                         {"ids": [str(self.public_app_template.id)]}, format='json',
+                                         HTTP_X_AUTH_TOKEN="valid_token")
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.names(self.get(mock_validate_token, self.users[0])), [])
+
+    def test_metrics_report_cache_statistics(self, mock_validate_token):
+        self.get(mock_validate_token, self.admin_user)
+        self.get(mock_validate_token, self.admin_user)
+        metrics = self.get(mock_validate_token, self.admin_user, reverse('metrics-list')).data
+        self.assertEqual(metrics['app_template_cache']['backend'], 'LocMemCache')
+        self.assertGreater(metrics['app_template_cache']['hits'], 0)
+
+
+@patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+       '.validate_token_with_keystone')
+@override_settings(CACHES=LOCMEM_CACHES)
+class ConditionalGetTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreAdmin"]["name"],
+                                              access_level=DEFAULT_ROLES["EduVMStoreAdmin"]["access_level"])
+        user_role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreUser"]["name"],
+                                         access_level=DEFAULT_ROLES["EduVMStoreUser"]["access_level"])
+        # Only roles above the default roles can list the favorites of the favorites endpoint
+        favorites_role = Roles.objects.create(name="FavoritesAdmin", access_level=DEFAULT_ACCESS_LEVEL)
+        cls.admin_user = Users.objects.create(role_id=cls.admin_role)
+        cls.user = Users.objects.create(role_id=user_role)
+        cls.favorites_user = Users.objects.create(role_id=favorites_role)
+        cls.app_templates = [
+            AppTemplates.objects.create(
+                image_id=uuid.uuid4(), name=f"Template {i}", description="", short_description="Short",
+                creator_id=cls.admin_user, public=True, approved=True,
+                fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+            for i in range(3)
+        ]
+        for app_template in cls.app_templates[:2]:
+            Favorites.objects.create(user_id=cls.favorites_user, app_template_id=app_template)
+
+    def setUp(self):
+        user_cache.reset()
+        app_template_response_cache.clear()
+
+    def get(self, mock_validate_token, url, user=None, etag=None):
+        mock_validate_token.return_value = {'id': (user or self.admin_user).id, 'name': 'User'}
+        headers = {} if etag is None else {'HTTP_IF_NONE_MATCH': etag}
+        return self.client.get(url, HTTP_X_AUTH_TOKEN="valid_token", **headers)
+
+    def assert_not_modified(self, mock_validate_token, url, user=None, queries=1):
+        etag = self.get(mock_validate_token, url, user)['ETag']
+        # The user is cached by the first request, the 304 is answered by the aggregate query alone
+        with self.assertNumQueries(queries):
+            response = self.get(mock_validate_token, url, user, etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        return etag
+
+    def test_app_template_list_not_modified(self, mock_validate_token):
+        # The ETag is cached in the response cache like the response
+        self.assert_not_modified(mock_validate_token, reverse('app-template-list'), queries=0)
+
+    def test_app_template_detail_not_modified(self, mock_validate_token):
+        self.assert_not_modified(mock_validate_token,
+                                 reverse('app-template-detail', args=[self.app_templates[0].id]), queries=0)
+
+    def test_app_template_list_not_modified_without_cached_etag(self, mock_validate_token):
+        url = reverse('app-template-list')
+        etag = self.get(mock_validate_token, url)['ETag']
+        app_template_response_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(mock_validate_token, url, etag=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        # Whether the user has own AppTemplates and the aggregate, no AppTemplate is loaded
+        self.assertEqual(len(queries), 2)
+        self.assertFalse(any('"eduvmstore_apptemplates"."script"' in query['sql']
+                             for query in queries.captured_queries))
+
+    def test_favorites_list_not_modified(self, mock_validate_token):
+        self.assert_not_modified(mock_validate_token, reverse('favorite-list'), self.favorites_user)
+
+    def test_user_list_not_modified(self, mock_validate_token):
+        self.assert_not_modified(mock_validate_token, reverse('user-list'))
+
+    def test_user_detail_not_modified(self, mock_validate_token):
+        self.assert_not_modified(mock_validate_token, reverse('user-detail', args=[self.user.id]))
+
+    def test_role_list_not_modified(self, mock_validate_token):
+        self.assert_not_modified(mock_validate_token, reverse('role-list'))
+
+    def test_ownership_transfer_changes_etag(self, mock_validate_token):
+        with self.captureOnCommitCallbacks(execute=True):
+            owned = AppTemplates.objects.create(
+                image_id=uuid.uuid4(), name="Owned Template", description="", short_description="Owned",
+                creator_id=self.user, public=True, approved=True,
+                fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+        urls = [reverse('app-template-list'), reverse('app-template-detail', args=[owned.id])]
+        etags = [self.assert_not_modified(mock_validate_token, url, queries=0) for url in urls]
+
+        # The public AppTemplates of the deleted user are transferred with a queryset update
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_user(self.user, self.admin_user)
+
+        for url, etag in zip(urls, etags):
+            response = self.get(mock_validate_token, url, etag=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_weak_etag_matches(self, mock_validate_token):
+        url = reverse('app-template-list')
+        etag = self.get(mock_validate_token, url)['ETag']
+        response = self.get(mock_validate_token, url, etag=f'W/{etag}')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_update_changes_etag(self, mock_validate_token):
+        url = reverse('app-template-list')
+        etag = self.assert_not_modified(mock_validate_token, url, queries=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.app_templates[2].short_description = "Changed"
+            self.app_templates[2].save()
+
+        response = self.get(mock_validate_token, url, etag=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn("Changed", [app_template['short_description'] for app_template in response.data])
+
+    def test_delete_changes_etag(self, mock_validate_token):
+        url = reverse('app-template-list')
+        etag = self.get(mock_validate_token, url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.app_templates[0].delete()
+        self.assertEqual(self.get(mock_validate_token, url, etag=etag).status_code, status.HTTP_200_OK)
+
+    def test_replaced_favorite_changes_etag(self, mock_validate_token):
+        url = reverse('favorite-list')
+        etag = self.get(mock_validate_token, url, self.favorites_user)['ETag']
+        # Same number of favorites, but a different one
+        Favorites.objects.filter(app_template_id=self.app_templates[0]).delete()
+        Favorites.objects.create(user_id=self.favorites_user, app_template_id=self.app_templates[2])
+        response = self.get(mock_validate_token, url, self.favorites_user, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_role_change_changes_user_etag(self, mock_validate_token):
+        url = reverse('user-detail', args=[self.user.id])
+        etag = self.get(mock_validate_token, url)['ETag']
+        self.user.role_id.name = "Renamed"
+        self.user.role_id.save()
+        response = self.get(mock_validate_token, url, etag=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['role']['name'], "Renamed")
+
+    def test_etag_depends_on_user(self, mock_validate_token):
+        url = reverse('app-template-list')
+        etag = self.get(mock_validate_token, url)['ETag']
+        response = self.get(mock_validate_token, url, self.user, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_query(self, mock_validate_token):
+        url = reverse('app-template-list')
+        etag = self.get(mock_validate_token, url)['ETag']
+        response = self.get(mock_validate_token, f'{url}?search=Template', etag=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_missing_app_template_is_not_found(self, mock_validate_token):
+        self.assertEqual(self.get(mock_validate_token, reverse('app-template-detail', args=[uuid.uuid4()]),
+                                  etag='*').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.get(mock_validate_token, reverse('app-template-detail', args=['invalid']),
+                                  etag='*').status_code, status.HTTP_404_NOT_FOUND)
+
+
+@patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+       '.validate_token_with_keystone')
+@override_settings(CACHES=LOCMEM_CACHES)
+class ConditionalUpdateTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreAdmin"]["name"],
+                                    access_level=DEFAULT_ROLES["EduVMStoreAdmin"]["access_level"])
+        cls.admin_user = Users.objects.create(role_id=role)
+
+    def setUp(self):
+        user_cache.reset()
+        free_name_cache.reset()
+        app_template_response_cache.clear()
+        self.app_template = AppTemplates.objects.create(
+            image_id=uuid.uuid4(), name="Draft", description="", short_description="Draft",
+            creator_id=self.admin_user, fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+        AppTemplateAccountAttributes.objects.create(app_template_id=self.app_template, name="Username")
+        self.url = reverse('app-template-detail', args=[self.app_template.id])
+
+    def get_etag(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        return self.client.get(self.url, HTTP_X_AUTH_TOKEN="valid_token")['ETag']
+
+    def patch(self, data, if_match=None):
+        headers = {} if if_match is None else {'HTTP_IF_MATCH': if_match}
+        return self.client.patch(self.url, data, format='json', HTTP_X_AUTH_TOKEN="valid_token", **headers)
+
+    def test_update_with_current_etag(self, mock_validate_token):
+        etag = self.get_etag(mock_validate_token)
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            response = self.patch({"short_description": "Patched"}, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['short_description'], "Patched")
+        self.assertNotEqual(response['ETag'], etag)
+        # The timestamp is claimed by a conditional UPDATE, not locked with SELECT ... FOR UPDATE
+        claims = [query['sql'] for query in queries.captured_queries
+                  if query['sql'].startswith('UPDATE') and '"updated_at" =' in query['sql'].split('WHERE')[1]]
+        self.assertEqual(len(claims), 1)
+        self.assertFalse(any('FOR UPDATE' in query['sql'] for query in queries.captured_queries))
+
+        # The new ETag of the response is the one of the detail
+        self.assertEqual(self.get_etag(mock_validate_token), response['ETag'])
+        self.assertEqual(self.patch({"short_description": "Again"}, response['ETag']).status_code,
+                         status.HTTP_200_OK)
+
+    def test_update_with_etag_of_detail_read_with_query(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        etag = self.client.get(self.url, {'format': 'json'}, HTTP_X_AUTH_TOKEN="valid_token")['ETag']
+        self.assertEqual(etag, self.get_etag(mock_validate_token))
+
+        response = self.patch({"short_description": "Patched"}, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_with_outdated_etag_fails(self, mock_validate_token):
+        etag = self.get_etag(mock_validate_token)
+        self.assertEqual(self.patch({"short_description": "First"}, etag).status_code, status.HTTP_200_OK)
+
+        response = self.patch({"short_description": "Second", "account_attributes": []}, etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.app_template.refresh_from_db()
+        self.assertEqual(self.app_template.short_description, "First")
+        self.assertEqual(self.app_template.account_attributes.count(), 1)
+
+    def test_concurrent_update_between_check_and_write_fails(self, mock_validate_token):
+        etag = self.get_etag(mock_validate_token)
+        check_if_match = ConditionalGetMixin.check_if_match
+
+        def check_and_update_concurrently(view, instance):
+            check_if_match(view, instance)
+            # Another editor commits right after the check of this request
+            AppTemplates.objects.filter(id=instance.id).update(short_description="Concurrent",
+                                                                updated_at=timezone.now())
+
+        with patch.object(ConditionalGetMixin, 'check_if_match', check_and_update_concurrently):
+            response = self.patch({"short_description": "Patched", "account_attributes": []}, etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.app_template.refresh_from_db()
+        self.assertEqual(self.app_template.short_description, "Concurrent")
+        # The attributes written before the failed claim are rolled back
+        self.assertEqual(self.app_template.account_attributes.count(), 1)
+
+    def test_update_without_if_match_is_unconditional(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        self.assertEqual(self.patch({"short_description": "Patched"}).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.patch({"short_description": "Patched"}, '*').status_code, status.HTTP_200_OK)
+
+
+@patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+       '.validate_token_with_keystone')
+@override_settings(CACHES=LOCMEM_CACHES)
+class SparseFieldsetTests(APITestCase):
+    SUMMARY_FIELDS = {'id', 'name', 'short_description', 'public', 'approved',
+                      'volume_size_gb', 'fixed_ram_gb', 'fixed_disk_gb', 'fixed_cores'}
+
+    @classmethod
+    def setUpTestData(cls):
+        role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreAdmin"]["name"],
+                                    access_level=DEFAULT_ROLES["EduVMStoreAdmin"]["access_level"])
+        cls.admin_user = Users.objects.create(role_id=role)
+        for i in range(3):
+            app_template = AppTemplates.objects.create(
+                image_id=uuid.uuid4(), name=f"Template {i}", description="Description " * 100,
+                short_description="Short", script="echo script\n" * 500, creator_id=cls.admin_user,
+                public=True, approved=True, fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+            AppTemplateSecurityGroups.objects.create(app_template_id=app_template, name="default")
+            AppTemplateAccountAttributes.objects.create(app_template_id=app_template, name="Username")
+            Favorites.objects.create(user_id=cls.admin_user, app_template_id=app_template)
+
+    def setUp(self):
+        user_cache.reset()
+        app_template_response_cache.clear()
+
+    def get(self, mock_validate_token, params, url=None):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        return self.client.get(url or reverse('app-template-list'), params, HTTP_X_AUTH_TOKEN="valid_token")
+
+    def test_summary_defers_columns_and_skips_relations(self, mock_validate_token):
+        self.get(mock_validate_token, {})
+        app_template_response_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(mock_validate_token, {'view': 'summary'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(set(response.data[0]), self.SUMMARY_FIELDS)
+
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertNotIn('"eduvmstore_apptemplates"."script"', sql)
+        self.assertNotIn('"eduvmstore_apptemplates"."description"', sql)
+        self.assertNotIn('eduvmstore_apptemplatesecuritygroups', sql)
+        self.assertNotIn('eduvmstore_apptemplateaccountattributes', sql)
+
+    def test_fields_prefetch_only_requested_relations(self, mock_validate_token):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(mock_validate_token, {'fields': 'name,security_groups'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {'id', 'name', 'security_groups'})
+        self.assertEqual(response.data[0]['security_groups'][0]['name'], "default")
+
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertIn('eduvmstore_apptemplatesecuritygroups', sql)
+        self.assertNotIn('eduvmstore_apptemplateaccountattributes', sql)
+        self.assertNotIn('"eduvmstore_apptemplates"."script"', sql)
+
+    def test_summary_of_favorites(self, mock_validate_token):
+        response = self.get(mock_validate_token, {'view': 'summary'}, reverse('app-template-favorites'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(set(response.data[0]), self.SUMMARY_FIELDS)
+
+    def test_summary_is_paginated(self, mock_validate_token):
+        response = self.get(mock_validate_token, {'view': 'summary', 'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        self.client.get(response.data['next'], HTTP_X_AUTH_TOKEN="valid_token")
+        next_page = self.client.get(response.data['next'], HTTP_X_AUTH_TOKEN="valid_token")
+        self.assertEqual(len(next_page.data['results']), 1)
+        self.assertEqual(set(next_page.data['results'][0]), self.SUMMARY_FIELDS)
+
+    def test_detail_ignores_fields(self, mock_validate_token):
+        app_template = AppTemplates.objects.get(name="Template 0")
+        response = self.get(mock_validate_token, {'view': 'summary'},
+                            reverse('app-template-detail', args=[app_template.id]))
+        self.assertIn('script', response.data)
+
+    def test_unknown_field_or_view(self, mock_validate_token):
+        response = self.get(mock_validate_token, {'fields': 'name,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', response.data['fields'])
+        response = self.get(mock_validate_token, {'view': 'compact'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
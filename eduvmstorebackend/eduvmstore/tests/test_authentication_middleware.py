@@ -0,0 +1,410 @@
+import asyncio
+import threading
+import time
+import uuid
+from unittest.mock import patch
+
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from eduvmstore.config.access_levels import DEFAULT_ROLES
+from eduvmstore.db.models import Roles, Users
+from eduvmstore.db.operations.roles import role_cache
+from eduvmstore.db.operations.users import user_cache
+from eduvmstore.middleware.authentication_middleware import (KeystoneAuthenticationMiddleware,
+                                                             keystone_breaker, token_cache,
+                                                             token_validation_flight,
+                                                             user_provisioning_flight)
+from eduvmstore.utils.circuit_breaker import CLOSED, OPEN
+from eduvmstore.utils.keystone_client import get_keystone_client
+from eduvmstore.tests.stub_keystone import StubKeystone
+
+
+class KeystoneTokenCacheTests(APITestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.keystone = StubKeystone().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.keystone.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        role = Roles.objects.create(name=DEFAULT_ROLES.get("EduVMStoreUser").get("name"),
+                                    access_level=DEFAULT_ROLES.get("EduVMStoreUser").get("access_level"))
+        self.user = Users.objects.create(role_id=role)
+        self.keystone.reset()
+        token_cache.reset()
+
+        settings_override = override_settings(
+            OPENSTACK={**settings.OPENSTACK, 'auth_url': self.keystone.auth_url})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_cache_hit_skips_keystone_call(self):
+        self.keystone.add_token("cached_token", str(self.user.id))
+        url = reverse('app-template-list')
+
+        for _ in range(10):
+            response = self.client.get(url, format='json', HTTP_X_AUTH_TOKEN="cached_token")
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.keystone.request_count, 1)
+        stats = token_cache.stats()
+        self.assertEqual(stats['hits'], 9)
+        self.assertEqual(stats['misses'], 1)
+        self.assertAlmostEqual(stats['hit_rate'], 0.9)
+
+    def test_invalid_token_is_not_cached(self):
+        url = reverse('app-template-list')
+
+        for _ in range(3):
+            response = self.client.get(url, format='json', HTTP_X_AUTH_TOKEN="unknown_token")
+            self.assertEqual(response.status_code, 401)
+
+        self.assertEqual(self.keystone.request_count, 3)
+        self.assertEqual(token_cache.stats()['size'], 0)
+
+    def test_expired_keystone_token_is_not_cached(self):
+        self.keystone.add_token("expired_token", str(uuid.uuid4()), expires_in=-1)
+        url = reverse('app-template-list')
+
+        self.client.get(url, format='json', HTTP_X_AUTH_TOKEN="expired_token")
+        self.client.get(url, format='json', HTTP_X_AUTH_TOKEN="expired_token")
+
+        self.assertEqual(self.keystone.request_count, 2)
+
+    def test_cache_is_keyed_by_token_hash(self):
+        self.keystone.add_token("secret_token", str(self.user.id))
+        url = reverse('app-template-list')
+
+        self.client.get(url, format='json', HTTP_X_AUTH_TOKEN="secret_token")
+
+        self.assertIsNone(token_cache.get("secret_token"))
+        self.assertEqual(token_cache.stats()['size'], 1)
+
+
+class KeystoneValidationCoalescingTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.keystone = StubKeystone().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.keystone.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.keystone.reset()
+        # Keep the Keystone call in flight long enough for all requests to arrive
+        self.keystone.latency = 0.3
+        token_cache.reset()
+
+        settings_override = override_settings(
+            OPENSTACK={**settings.OPENSTACK, 'auth_url': self.keystone.auth_url})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_concurrent_validations_in_threads_share_one_keystone_call(self):
+        self.keystone.add_token("shared_token", str(uuid.uuid4()))
+        middleware = KeystoneAuthenticationMiddleware(lambda request: None)
+        fan_out = 8
+        barrier = threading.Barrier(fan_out)
+        results = []
+
+        def validate():
+            barrier.wait()
+            results.append(middleware.validate_token_with_keystone("shared_token"))
+
+        threads = [threading.Thread(target=validate) for _ in range(fan_out)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.keystone.request_count, 1)
+        self.assertEqual(len(results), fan_out)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertIsNotNone(results[0])
+
+    def test_concurrent_asgi_requests_share_one_keystone_call(self):
+        # Invalid tokens are not cached, so every request has to go through the coalescing
+        application = get_asgi_application()
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': '/api/app-templates/',
+            'query_string': b'',
+            'headers': [(b'host', b'localhost'), (b'x-auth-token', b'unknown_token')],
+            'server': ('localhost', 80),
+        }
+
+        async def request():
+            communicator = ApplicationCommunicator(application, scope)
+            await communicator.send_input({'type': 'http.request', 'body': b''})
+            response_start = await communicator.receive_output(timeout=5)
+            await communicator.receive_output(timeout=5)
+            return response_start['status']
+
+        async def fan_out():
+            return await asyncio.gather(*[request() for _ in range(5)])
+
+        executions_before = token_validation_flight.stats()['executions']
+        statuses = asyncio.run(fan_out())
+
+        self.assertEqual(statuses, [401] * 5)
+        self.assertEqual(self.keystone.request_count, 1)
+        self.assertEqual(token_validation_flight.stats()['executions'] - executions_before, 1)
+
+
+class KeystoneCircuitBreakerTests(APITestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.keystone = StubKeystone().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.keystone.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        role = Roles.objects.create(name=DEFAULT_ROLES.get("EduVMStoreAdmin").get("name"),
+                                    access_level=DEFAULT_ROLES.get("EduVMStoreAdmin").get("access_level"))
+        self.user = Users.objects.create(role_id=role)
+        self.keystone.reset()
+        # 500 is not retried by the client, so every request counts once
+        self.keystone.error_status = 500
+        token_cache.reset()
+        keystone_breaker.reset()
+        self.addCleanup(keystone_breaker.reset)
+
+        settings_override = override_settings(OPENSTACK={
+            **settings.OPENSTACK, 'auth_url': self.keystone.auth_url, 'stale_token_grace': 60})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def get(self, token):
+        return self.client.get(reverse('app-template-list'), format='json', HTTP_X_AUTH_TOKEN=token)
+
+    def trip_breaker(self):
+        self.keystone.fail_count = keystone_breaker.min_calls
+        for i in range(keystone_breaker.min_calls):
+            self.assertEqual(self.get(f"failing_token_{i}").status_code, 503)
+        self.assertEqual(keystone_breaker.state, OPEN)
+
+    def test_open_breaker_fails_fast_without_calling_keystone(self):
+        self.keystone.add_token("valid_token", str(self.user.id))
+        self.trip_breaker()
+        requests_before = self.keystone.request_count
+
+        response = self.get("valid_token")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.keystone.request_count, requests_before)
+        self.assertEqual(keystone_breaker.metrics()['rejected_calls'], 1)
+
+    def test_open_breaker_serves_recently_validated_token_within_grace(self):
+        self.keystone.add_token("valid_token", str(self.user.id))
+        with patch.object(token_cache, 'ttl', 0.05):
+            self.assertEqual(self.get("valid_token").status_code, 200)
+            time.sleep(0.1)
+        self.trip_breaker()
+
+        response = self.get("valid_token")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(token_cache.stats()['stale_hits'], 1)
+
+    def test_failed_keystone_call_serves_recently_validated_token_within_grace(self):
+        self.keystone.add_token("valid_token", str(self.user.id))
+        with patch.object(token_cache, 'ttl', 0.05):
+            self.assertEqual(self.get("valid_token").status_code, 200)
+            time.sleep(0.1)
+        self.keystone.fail_count = 1
+
+        response = self.get("valid_token")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.keystone.request_count, 2)
+
+    def test_half_open_probe_closes_breaker_after_recovery(self):
+        self.keystone.add_token("valid_token", str(self.user.id))
+        self.trip_breaker()
+
+        with patch.object(keystone_breaker, 'open_duration', 0):
+            response = self.get("valid_token")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(keystone_breaker.state, CLOSED)
+
+    def test_unexpected_error_during_probe_reopens_breaker(self):
+        self.keystone.add_token("valid_token", str(self.user.id))
+        self.trip_breaker()
+
+        with patch.object(keystone_breaker, 'open_duration', 0):
+            with patch('eduvmstore.middleware.authentication_middleware.get_keystone_client',
+                       side_effect=RuntimeError('Client not configured')):
+                with self.assertRaises(RuntimeError):
+                    self.get("valid_token")
+            response = self.get("valid_token")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(keystone_breaker.state, CLOSED)
+
+    def test_slow_keystone_counts_as_failure(self):
+        self.keystone.add_token("valid_token", str(self.user.id))
+        self.keystone.latency = 0.2
+
+        with patch.object(get_keystone_client(), 'timeout', (1, 0.02)):
+            response = self.get("valid_token")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(keystone_breaker.metrics()['failure_rate'], 1.0)
+
+    def test_exposes_breaker_state_as_metrics(self):
+        self.keystone.add_token("valid_token", str(self.user.id))
+
+        response = self.client.get(reverse('metrics-list'), format='json', HTTP_X_AUTH_TOKEN="valid_token")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['keystone']['circuit_breaker']['state'], CLOSED)
+        self.assertEqual(response.data['keystone']['circuit_breaker']['state_code'], 0)
+        self.assertIn('hit_rate', response.data['keystone']['token_cache'])
+
+
+class UserCacheMiddlewareTests(APITestCase):
+
+    def setUp(self):
+        self.admin_role = Roles.objects.create(
+            name=DEFAULT_ROLES.get("EduVMStoreAdmin").get("name"),
+            access_level=DEFAULT_ROLES.get("EduVMStoreAdmin").get("access_level"))
+        self.user_role = Roles.objects.create(
+            name=DEFAULT_ROLES.get("EduVMStoreUser").get("name"),
+            access_level=DEFAULT_ROLES.get("EduVMStoreUser").get("access_level"))
+        self.admin_user = Users.objects.create(role_id=self.admin_role)
+        self.normal_user = Users.objects.create(role_id=self.user_role)
+        user_cache.reset()
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_steady_state_request_runs_no_queries_before_view(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': str(self.normal_user.id), 'name': 'User'}
+        middleware = KeystoneAuthenticationMiddleware(lambda request: HttpResponse())
+        request_factory = RequestFactory()
+
+        middleware(request_factory.get(reverse('app-template-list'), HTTP_X_AUTH_TOKEN="valid_token"))
+        with self.assertNumQueries(0):
+            response = middleware(
+                request_factory.get(reverse('app-template-list'), HTTP_X_AUTH_TOKEN="valid_token"))
+        self.assertEqual(response.status_code, 200)
+
+    @patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+           '.validate_token_with_keystone')
+    def test_role_update_via_api_invalidates_cached_user(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': str(self.normal_user.id), 'name': 'User'}
+        response = self.client.get(reverse('user-list'), format='json', HTTP_X_AUTH_TOKEN="user_token")
+        self.assertEqual(len(response.data), 1)
+
+        mock_validate_token.return_value = {'id': str(self.admin_user.id), 'name': 'Admin'}
+        response = self.client.patch(reverse('user-detail', args=[self.normal_user.id]),
+                                     {'role_id': str(self.admin_role.id)},
+                                     format='json', HTTP_X_AUTH_TOKEN="admin_token")
+        self.assertEqual(response.status_code, 200)
+
+        # The normal user is now an admin and can list all users
+        mock_validate_token.return_value = {'id': str(self.normal_user.id), 'name': 'User'}
+        response = self.client.get(reverse('user-list'), format='json', HTTP_X_AUTH_TOKEN="user_token")
+        self.assertEqual(len(response.data), 2)
+
+
+class FirstLoginProvisioningTests(TransactionTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.keystone = StubKeystone().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.keystone.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.keystone.reset()
+        token_cache.reset()
+        role_cache.reset()
+        user_cache.reset()
+
+        settings_override = override_settings(
+            OPENSTACK={**settings.OPENSTACK, 'auth_url': self.keystone.auth_url})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_concurrent_first_logins_create_one_row_per_identity(self):
+        identities = [str(uuid.uuid4()) for _ in range(10)]
+        # Two sessions per identity with two parallel requests each
+        tokens = []
+        for user_id in identities:
+            for session in range(2):
+                token = f"{user_id}_{session}"
+                self.keystone.add_token(token, user_id)
+                tokens += [token, token]
+
+        middleware = KeystoneAuthenticationMiddleware(lambda request: HttpResponse())
+        request_factory = RequestFactory()
+        barrier = threading.Barrier(len(tokens))
+        statuses = []
+
+        def login(token):
+            barrier.wait()
+            try:
+                response = middleware(
+                    request_factory.get(reverse('app-template-list'), HTTP_X_AUTH_TOKEN=token))
+                statuses.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=login, args=(token,)) for token in tokens]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statuses, [200] * len(tokens))
+        self.assertEqual(Users.objects.count(), len(identities))
+        self.assertEqual(set(str(user_id) for user_id in Users.objects.values_list('id', flat=True)),
+                         set(identities))
+        self.assertEqual(Roles.objects.filter(name=DEFAULT_ROLES['EduVMStoreUser']['name']).count(), 1)
+        self.assertEqual(Roles.objects.count(), 1)
+
+    def test_first_login_reuses_existing_role(self):
+        role = Roles.objects.create(name=DEFAULT_ROLES['EduVMStoreUser']['name'],
+                                    access_level=DEFAULT_ROLES['EduVMStoreUser']['access_level'])
+        user_id = str(uuid.uuid4())
+        self.keystone.add_token("new_user_token", user_id)
+        middleware = KeystoneAuthenticationMiddleware(lambda request: HttpResponse())
+
+        executions_before = user_provisioning_flight.stats()['executions']
+        response = middleware(RequestFactory().get(reverse('app-template-list'),
+                                                   HTTP_X_AUTH_TOKEN="new_user_token"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Users.objects.get(id=user_id).role_id, role)
+        self.assertEqual(Roles.objects.count(), 1)
+        self.assertEqual(user_provisioning_flight.stats()['executions'] - executions_before, 1)
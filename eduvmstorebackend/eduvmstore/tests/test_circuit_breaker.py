@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from eduvmstore.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    def create_breaker(self):
+        return CircuitBreaker(name='test', failure_threshold=0.5, window_size=10, min_calls=4,
+                              open_duration=30)
+
+    def test_stays_closed_below_min_calls(self):
+        breaker = self.create_breaker()
+        for _ in range(3):
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow_request())
+
+    def test_opens_when_failure_rate_reaches_threshold(self):
+        breaker = self.create_breaker()
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow_request())
+        self.assertEqual(breaker.metrics()['rejected_calls'], 1)
+        self.assertEqual(breaker.metrics()['times_opened'], 1)
+
+    @patch('eduvmstore.utils.circuit_breaker.time.monotonic')
+    def test_half_open_allows_single_probe(self, mock_monotonic):
+        mock_monotonic.return_value = 0.0
+        breaker = self.create_breaker()
+        for _ in range(4):
+            breaker.record_failure()
+
+        mock_monotonic.return_value = 30.0
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+
+    @patch('eduvmstore.utils.circuit_breaker.time.monotonic')
+    def test_successful_probe_closes_breaker(self, mock_monotonic):
+        mock_monotonic.return_value = 0.0
+        breaker = self.create_breaker()
+        for _ in range(4):
+            breaker.record_failure()
+
+        mock_monotonic.return_value = 30.0
+        breaker.allow_request()
+        breaker.record_success()
+
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.metrics()['failure_rate'], 0.0)
+
+    @patch('eduvmstore.utils.circuit_breaker.time.monotonic')
+    def test_failed_probe_reopens_breaker(self, mock_monotonic):
+        mock_monotonic.return_value = 0.0
+        breaker = self.create_breaker()
+        for _ in range(4):
+            breaker.record_failure()
+
+        mock_monotonic.return_value = 30.0
+        breaker.allow_request()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.metrics()['state_code'], 2)
+        self.assertEqual(breaker.metrics()['times_opened'], 2)
@@ -1,11 +1,16 @@
+import importlib
 import uuid
+from django.apps import apps
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from eduvmstore.config.access_levels import DEFAULT_ROLES
 from eduvmstore.db.models import AppTemplates, Users, Roles, AppTemplateInstantiationAttributes, \
     AppTemplateAccountAttributes
 from eduvmstore.db.operations.app_templates import (
     check_name_collision, approve_app_template, soft_delete_app_template, reject_app_template,
-    CollisionReason)
+    CollisionReason, check_name_collisions, check_name_collision_cached, free_name_cache)
 
 
 class AppTemplateOperationsTests(TestCase):
@@ -44,6 +49,7 @@ class AppTemplateOperationsTests(TestCase):
         return app_template
 
     def setUp(self):
+        free_name_cache.reset()
         self.user = self.create_user_and_role()
         self.app_template = self.create_app_template(self.user)
 
@@ -60,6 +66,63 @@ class AppTemplateOperationsTests(TestCase):
         self.assertTrue(collision)
         self.assertEqual(reason, CollisionReason.VERSIONED_TEMPLATE_EXISTS)
 
+    def test_versioned_name_collision_uses_base_name_index(self):
+        self.create_app_template(self.user, name="Template-V3")
+        deleted = self.create_app_template(self.user, name="Deleted-V1")
+        deleted.deleted = True
+        deleted.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(check_name_collision("Template")[1], CollisionReason.VERSIONED_TEMPLATE_EXISTS)
+            self.assertEqual(check_name_collision("Templat")[1], CollisionReason.NO_COLLISION)
+            self.assertEqual(check_name_collision("Deleted")[1], CollisionReason.NO_COLLISION)
+        self.assertFalse(any('REGEXP' in query['sql'] for query in queries.captured_queries))
+
+    def test_checks_name_collisions_in_batch_with_two_queries(self):
+        self.create_app_template(self.user, name="Template-V3")
+        names = [self.app_template.name, "Template", "Template-V3", "Template-V4", "Templat", "Templat"]
+
+        with self.assertNumQueries(2):
+            results = check_name_collisions(names)
+        self.assertEqual({name: reason for name, (_, reason, _) in results.items()}, {
+            self.app_template.name: CollisionReason.DIRECT_MATCH,
+            "Template": CollisionReason.VERSIONED_TEMPLATE_EXISTS,
+            "Template-V3": CollisionReason.DIRECT_MATCH,
+            "Template-V4": CollisionReason.VERSION_SUFFIX_RESERVED,
+            "Templat": CollisionReason.NO_COLLISION,
+        })
+        for name in results:
+            self.assertEqual(results[name], check_name_collision(name))
+
+    def test_cached_name_collision_check_answers_free_names_from_cache(self):
+        self.assertFalse(check_name_collision_cached("Template")[0])
+        with self.assertNumQueries(0):
+            self.assertFalse(check_name_collision_cached("Template")[0])
+
+        # Approving a copy of "Template" reserves the base name
+        self.create_app_template(self.user, name="Template-V1")
+        self.assertEqual(check_name_collision_cached("Template")[1],
+                         CollisionReason.VERSIONED_TEMPLATE_EXISTS)
+        self.assertTrue(check_name_collision_cached(self.app_template.name)[0])
+        self.assertIsNone(free_name_cache.get(self.app_template.name))
+
+    def test_save_keeps_base_name_in_sync(self):
+        self.assertEqual(self.app_template.base_name, "Test Template")
+        self.assertIsNone(self.app_template.name_version)
+        self.app_template.name = "Test Template-V2"
+        self.app_template.save(update_fields=['name'])
+        self.app_template.refresh_from_db()
+        self.assertEqual((self.app_template.base_name, self.app_template.name_version), ("Test Template", 2))
+
+    def test_migration_backfills_base_names(self):
+        migration = importlib.import_module('eduvmstore.migrations.0021_apptemplates_base_name')
+        self.create_app_template(self.user, name="Template-V7")
+        AppTemplates.objects.update(base_name='', name_version=None)
+
+        migration.backfill_base_names(apps, None)
+        self.assertEqual(sorted(AppTemplates.objects.values_list('base_name', 'name_version')),
+                         [("Template", 7), ("Test Template", None)])
+
     def test_name_collision_with_version_suffix(self):
         suffix = "-V23"
         app_template_name = "innocent_name" + suffix
@@ -92,6 +155,34 @@ class AppTemplateOperationsTests(TestCase):
                 app_template_id=approved_app_template.id).count(),
             1)
 
+    def test_approval_statements_independent_of_attribute_count(self):
+        other_app_template = self.create_app_template(self.user, name="Other Template")
+        AppTemplateAccountAttributes.objects.bulk_create([
+            AppTemplateAccountAttributes(app_template_id=other_app_template, name=f"Attribute{i}")
+            for i in range(50)])
+
+        with CaptureQueriesContext(connection) as queries:
+            approve_app_template(self.app_template.id)
+        with CaptureQueriesContext(connection) as other_queries:
+            approved_app_template = approve_app_template(other_app_template.id)
+
+        self.assertEqual(len(queries.captured_queries), len(other_queries.captured_queries))
+        self.assertEqual(
+            AppTemplateAccountAttributes.objects.filter(app_template_id=approved_app_template.id).count(),
+            51)
+
+    def test_repeated_approvals_get_consecutive_versions(self):
+        first = approve_app_template(self.app_template.id)
+        second = approve_app_template(self.app_template.id)
+        self.assertEqual(first.name, self.app_template.name + "-V1")
+        self.assertEqual(second.name, self.app_template.name + "-V2")
+        self.app_template.refresh_from_db()
+        self.assertEqual(self.app_template.version, 3)
+
+    def test_approve_missing_app_template_raises(self):
+        with self.assertRaises(ObjectDoesNotExist):
+            approve_app_template(uuid.uuid4())
+
     def test_rejects_app_template_successfully(self):
         rejected_app_template = reject_app_template(self.app_template.id)
         self.assertFalse(rejected_app_template.approved)
@@ -1,8 +1,9 @@
 import uuid
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
+from django.db import DatabaseError, transaction
 from django.test import TestCase
 from eduvmstore.db.models import Roles
-from eduvmstore.db.operations.roles import create_role, update_role, get_role_by_id, get_role_by_name
+from eduvmstore.db.operations.roles import update_role, get_role_by_id, get_or_create_role, role_cache
 
 
 class RoleOperationsTests(TestCase):
@@ -15,17 +16,7 @@ class RoleOperationsTests(TestCase):
             name=self.role_name,
             access_level=self.access_level
         )
-
-    def test_creates_role_successfully(self):
-        name = "Test Role"
-        access_level = 6000
-        role_data = {
-            "name": name,
-            "access_level": access_level
-        }
-        role = create_role(role_data)
-        self.assertEqual(role.name, name)
-        self.assertEqual(role.access_level, access_level)
+        role_cache.reset()
 
     def test_does_not_create_role_with_invalid_data(self):
         role_data = {
@@ -33,7 +24,7 @@ class RoleOperationsTests(TestCase):
             "access_level": 6000
         }
         with self.assertRaises(ValidationError):
-            create_role(role_data)
+            get_or_create_role(role_data)
 
     def test_updates_role_successfully(self):
         update_name = "SuperUser"
@@ -63,11 +54,28 @@ class RoleOperationsTests(TestCase):
         with self.assertRaises(ObjectDoesNotExist):
             get_role_by_id(str(uuid.uuid4()))
 
-    def test_retrieves_role_by_name_successfully(self):
-        retrieved_role = get_role_by_name(self.role_name)
-        self.assertEqual(retrieved_role.name, self.role_name)
-        self.assertEqual(retrieved_role.access_level, self.access_level)
+    def test_get_or_create_role_returns_existing_role(self):
+        role = get_or_create_role({"name": self.role_name, "access_level": 1000})
+        self.assertEqual(str(role.id), str(self.role.id))
+        self.assertEqual(role.access_level, self.access_level)
+        self.assertEqual(Roles.objects.filter(name=self.role_name).count(), 1)
 
-    def test_does_not_retrieve_nonexistent_role_by_name(self):
-        with self.assertRaises(ObjectDoesNotExist):
-            get_role_by_name("NonExistentRole")
+    def test_get_or_create_role_creates_missing_role_once(self):
+        role_data = {"name": "Student", "access_level": 2000}
+        with self.captureOnCommitCallbacks(execute=True):
+            role = get_or_create_role(role_data)
+        with self.assertNumQueries(0):
+            cached_role = get_or_create_role(role_data)
+        self.assertEqual(cached_role.id, role.id)
+        self.assertEqual(Roles.objects.filter(name="Student").count(), 1)
+
+    def test_get_or_create_role_does_not_cache_rolled_back_role(self):
+        role_data = {"name": "Student", "access_level": 2000}
+        with self.captureOnCommitCallbacks(execute=True), self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                get_or_create_role(role_data)
+                raise DatabaseError("Import failed")
+
+        self.assertIsNone(role_cache.get("Student"))
+        role = get_or_create_role(role_data)
+        self.assertTrue(Roles.objects.filter(id=role.id).exists())
@@ -4,8 +4,12 @@ from django.utils import timezone
 
 from eduvmstore.config.access_levels import DEFAULT_ROLES
 from eduvmstore.db.models import Roles, Users, AppTemplates
-from eduvmstore.db.operations.users import (create_user, get_user_by_id, soft_delete_user, delete_user)
+from eduvmstore.db.operations.roles import role_cache
+from eduvmstore.db.operations.users import (create_user, get_user_by_id, soft_delete_user, delete_user,
+                                            get_cached_user_by_id, import_users, provisioning_lock,
+                                            user_cache)
 import uuid
+from unittest.mock import patch
 
 
 class UserOperationsTests(TestCase):
@@ -28,6 +32,8 @@ class UserOperationsTests(TestCase):
 
     def setUp(self):
         self.create_user_and_role()
+        role_cache.reset()
+        user_cache.reset()
 
     def test_creates_user_successfully(self):
         user_data = {
@@ -161,4 +167,99 @@ class UserOperationsTests(TestCase):
         self.assertFalse(Users.objects.filter(id=self.admin_user.id).exists())
 
         # Check that private templates are deleted
-        self.assertFalse(AppTemplates.objects.filter(id=private_template.id).exists())
\ No newline at end of file
+        self.assertFalse(AppTemplates.objects.filter(id=private_template.id).exists())
+
+    def test_cached_user_is_served_without_query(self):
+        get_cached_user_by_id(str(self.admin_user.id))
+        with self.assertNumQueries(0):
+            user = get_cached_user_by_id(str(self.admin_user.id))
+            self.assertEqual(user.role_id.access_level, self.admin_role.access_level)
+
+    def test_cached_user_is_invalidated_on_user_change(self):
+        get_cached_user_by_id(str(self.normal_user.id))
+        self.normal_user.role_id = self.admin_role
+        self.normal_user.save()
+
+        user = get_cached_user_by_id(str(self.normal_user.id))
+        self.assertEqual(user.role_id, self.admin_role)
+
+    def test_cached_users_are_invalidated_on_role_change(self):
+        get_cached_user_by_id(str(self.admin_user.id))
+        self.admin_role.access_level = 1
+        self.admin_role.save()
+
+        user = get_cached_user_by_id(str(self.admin_user.id))
+        self.assertEqual(user.role_id.access_level, 1)
+
+    def test_cached_user_is_invalidated_on_delete(self):
+        user_id = str(self.normal_user.id)
+        get_cached_user_by_id(user_id)
+        delete_user(self.normal_user, self.admin_user)
+
+        with self.assertRaises(ObjectDoesNotExist):
+            get_cached_user_by_id(user_id)
+
+    def test_imports_users_with_default_roles(self):
+        admin_id, user_id = str(uuid.uuid4()), str(uuid.uuid4())
+        rows = [
+            {"id": admin_id, "keystone_role_name": "Admin"},
+            {"id": user_id, "keystone_role_name": "member"},
+        ]
+        result = import_users(iter(rows))
+
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(Users.objects.get(id=admin_id).role_id, self.admin_role)
+        self.assertEqual(Users.objects.get(id=user_id).role_id, self.user_role)
+
+    def test_import_skips_existing_duplicate_and_invalid_users(self):
+        new_id = str(uuid.uuid4())
+        rows = [
+            {"id": str(self.admin_user.id), "keystone_role_name": "member"},
+            {"id": new_id, "keystone_role_name": "member"},
+            {"id": new_id, "keystone_role_name": "member"},
+            {"id": "no-uuid", "keystone_role_name": "member"},
+            {"id": "", "keystone_role_name": "member"},
+        ]
+        result = import_users(rows, batch_size=2)
+
+        self.assertEqual((result['created'], result['skipped'], result['invalid']), (1, 2, 2))
+        self.assertEqual(Users.objects.get(id=self.admin_user.id).role_id, self.admin_role)
+        self.assertEqual(Users.objects.count(), 3)
+
+    def test_import_inserts_each_batch_with_one_query(self):
+        rows = [{"id": str(uuid.uuid4()), "keystone_role_name": "member"} for _ in range(100)]
+        import_users(rows)
+        # The role is cached, so only the existing users are checked, the batch is inserted
+        # and the created users are counted (plus savepoint and release of the transaction)
+        rows = [{"id": str(uuid.uuid4()), "keystone_role_name": "member"} for _ in range(100)]
+        with self.assertNumQueries(5):
+            result = import_users(rows, batch_size=100)
+        self.assertEqual(result['created'], 100)
+
+    def test_import_releases_lock_between_batches(self):
+        lock_held = []
+
+        def rows():
+            for _ in range(4):
+                lock_held.append(provisioning_lock.locked())
+                yield {"id": str(uuid.uuid4()), "keystone_role_name": "member"}
+
+        result = import_users(rows(), batch_size=2)
+
+        self.assertEqual(result['created'], 4)
+        self.assertEqual(lock_held, [False] * 4)
+
+    def test_import_does_not_count_users_created_concurrently(self):
+        concurrent_id, new_id = uuid.uuid4(), uuid.uuid4()
+        bulk_create = Users.objects.bulk_create
+
+        def bulk_create_after_concurrent_login(objs, **kwargs):
+            Users.objects.create(id=concurrent_id, role_id=self.user_role)
+            return bulk_create(objs, **kwargs)
+
+        rows = [{"id": str(user_id), "keystone_role_name": "member"} for user_id in (concurrent_id, new_id)]
+        with patch.object(Users.objects, 'bulk_create', side_effect=bulk_create_after_concurrent_login):
+            result = import_users(rows)
+
+        self.assertEqual((result['created'], result['skipped']), (1, 1))
+        self.assertEqual(Users.objects.filter(id__in=(concurrent_id, new_id)).count(), 2)
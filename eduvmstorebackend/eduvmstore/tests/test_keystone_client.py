@@ -0,0 +1,75 @@
+import requests
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from eduvmstore.tests.stub_keystone import StubKeystone
+from eduvmstore.utils.keystone_client import KeystoneClient
+
+
+class KeystoneClientTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.keystone = StubKeystone().start()
+        cls.keystone.add_token("valid_token", "user_id")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.keystone.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.keystone.reset()
+        settings_override = override_settings(
+            OPENSTACK={**settings.OPENSTACK, 'auth_url': self.keystone.auth_url})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def create_client(self, **kwargs):
+        options = {'pool_size': 2, 'connect_timeout': 1, 'read_timeout': 1, 'max_retries': 2}
+        options.update(kwargs)
+        client = KeystoneClient(**options)
+        self.addCleanup(client.close)
+        return client
+
+    def test_validates_token_successfully(self):
+        response = self.create_client().validate_token("valid_token")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['token']['user']['id'], "user_id")
+
+    def test_reuses_connection_for_consecutive_requests(self):
+        client = self.create_client()
+        for _ in range(5):
+            client.validate_token("valid_token")
+
+        self.assertEqual(self.keystone.request_count, 5)
+        self.assertEqual(len(self.keystone.connections), 1)
+
+    def test_retries_idempotent_request_on_server_error(self):
+        self.keystone.fail_count = 2
+        response = self.create_client(max_retries=2).validate_token("valid_token")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.keystone.request_count, 3)
+
+    def test_retries_are_bounded(self):
+        self.keystone.fail_count = 5
+        response = self.create_client(max_retries=1).validate_token("valid_token")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.keystone.request_count, 2)
+
+    def test_read_timeout_raises_timeout(self):
+        self.keystone.latency = 0.3
+        client = self.create_client(read_timeout=0.05, max_retries=0)
+        with self.assertRaises(requests.Timeout):
+            client.validate_token("valid_token")
+
+    def test_read_timeout_is_not_retried(self):
+        self.keystone.latency = 0.3
+        client = self.create_client(read_timeout=0.05, max_retries=2)
+        with self.assertRaises(requests.Timeout):
+            client.validate_token("valid_token")
+
+        self.assertEqual(self.keystone.request_count, 1)
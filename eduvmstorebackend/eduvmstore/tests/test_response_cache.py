@@ -0,0 +1,44 @@
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+
+from eduvmstore.utils.response_cache import ResponseCache
+
+
+@override_settings(CACHES={'responses': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                         'LOCATION': 'test-responses'}})
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache('responses')
+        self.cache.clear()
+
+    def test_computes_once_per_key_and_scopes(self):
+        computed = []
+        for _ in range(2):
+            value = self.cache.get_or_set(['public'], 'key', lambda: computed.append(1) or 'value')
+        self.assertEqual(value, 'value')
+        self.assertEqual(len(computed), 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.get_or_set(['public', 'user:1'], 'key', lambda: 'other'), 'other')
+
+    def test_invalidation_applies_on_commit(self):
+        self.cache.get_or_set(['public'], 'key', lambda: 'old')
+        self.cache.get_or_set(['user:1'], 'key', lambda: 'own')
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.cache.invalidate(['public'])
+        self.assertEqual(self.cache.get_or_set(['public'], 'key', lambda: 'new'), 'old')
+
+        callbacks[0]()
+        self.assertEqual(self.cache.get_or_set(['public'], 'key', lambda: 'new'), 'new')
+        self.assertEqual(self.cache.get_or_set(['user:1'], 'key', lambda: 'new'), 'own')
+
+    def test_evicted_generation_misses(self):
+        self.cache.get_or_set(['public'], 'key', lambda: 'old')
+        self.cache.cache.delete(self.cache.generation_key('public'))
+        self.assertEqual(self.cache.get_or_set(['public'], 'key', lambda: 'new'), 'new')
+
+    def test_backend_errors_compute_the_value(self):
+        with patch.object(self.cache.cache, 'get_many', side_effect=DatabaseError):
+            self.assertEqual(self.cache.get_or_set(['public'], 'key', lambda: 'value'), 'value')
+        self.assertEqual(self.cache.stats()['errors'], 1)
@@ -0,0 +1,63 @@
+import io
+import uuid
+from tempfile import NamedTemporaryFile
+
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from eduvmstore.config.access_levels import DEFAULT_ROLES
+from eduvmstore.db.models import Roles, Users
+from eduvmstore.db.operations.roles import role_cache
+from eduvmstore.utils.roster import read_roster
+
+
+class ReadRosterTests(SimpleTestCase):
+
+    def test_reads_plain_roster(self):
+        rows = list(read_roster(io.StringIO("id,name\n1234,admin\n5678,\n")))
+        self.assertEqual(rows, [{'id': '1234', 'keystone_role_name': 'admin'},
+                                {'id': '5678', 'keystone_role_name': ''}])
+
+    def test_reads_keystone_project_user_list(self):
+        export = '"ID","Name"\n"abcd","student1"\n'
+        rows = list(read_roster(io.StringIO(export)))
+        self.assertEqual(rows, [{'id': 'abcd', 'keystone_role_name': 'student1'}])
+
+    def test_rejects_roster_without_user_id_column(self):
+        with self.assertRaises(ValidationError):
+            list(read_roster(io.StringIO("name,role\nStudent,member\n")))
+
+
+class ImportRosterCommandTests(TestCase):
+
+    def setUp(self):
+        role_cache.reset()
+
+    def test_imports_roster_file(self):
+        user_ids = [uuid.uuid4() for _ in range(3)]
+        with NamedTemporaryFile('w', suffix='.csv') as roster:
+            roster.write("id,name\n" + "".join(f"{user_id},student\n" for user_id in user_ids))
+            roster.flush()
+            output = io.StringIO()
+            call_command('import_roster', roster.name, stdout=output)
+
+        self.assertIn('Created 3 users', output.getvalue())
+        self.assertEqual(Users.objects.count(), 3)
+        self.assertEqual(Roles.objects.get().name, DEFAULT_ROLES['EduVMStoreUser']['name'])
+
+    def test_maps_user_names_to_roles_like_login(self):
+        admin_id, student_id = uuid.uuid4(), uuid.uuid4()
+        with NamedTemporaryFile('w', suffix='.csv') as roster:
+            roster.write(f'"ID","Name"\n"{admin_id.hex}","admin"\n"{student_id.hex}","student"\n')
+            roster.flush()
+            call_command('import_roster', roster.name, stdout=io.StringIO())
+
+        self.assertEqual(Users.objects.get(id=admin_id).role_id.name,
+                         DEFAULT_ROLES['EduVMStoreAdmin']['name'])
+        self.assertEqual(Users.objects.get(id=student_id).role_id.name,
+                         DEFAULT_ROLES['EduVMStoreUser']['name'])
+
+    def test_fails_for_missing_roster_file(self):
+        with self.assertRaises(CommandError):
+            call_command('import_roster', '/nonexistent/roster.csv', stdout=io.StringIO())
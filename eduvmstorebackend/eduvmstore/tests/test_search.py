@@ -0,0 +1,126 @@
+import uuid
+
+from django.test import TestCase
+
+from eduvmstore.config.access_levels import DEFAULT_ROLES
+from eduvmstore.db.models import AppTemplates, Roles, Users
+from eduvmstore.db.operations.app_templates import approve_app_template
+from eduvmstore.db.search import (build_match_query, fuzzy_search_app_templates, get_fuzzy_index,
+                                  rebuild_search_index, reset_fuzzy_index, search_app_templates)
+
+
+class AppTemplateSearchTests(TestCase):
+
+    def setUp(self):
+        role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreAdmin"]["name"],
+                                    access_level=DEFAULT_ROLES["EduVMStoreAdmin"]["access_level"])
+        self.user = Users.objects.create(role_id=role)
+        self.jupyter = self.create_app_template("Jupyter Notebook", "Python notebooks for data science")
+        self.python = self.create_app_template("Python Basics", "Introduction with a Jupyter example")
+
+    def create_app_template(self, name, description):
+        return AppTemplates.objects.create(image_id=uuid.uuid4(), name=name, description=description,
+                                           short_description="Course VM", creator_id=self.user,
+                                           fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+
+    def search(self, search):
+        return list(search_app_templates(AppTemplates.objects.all(), search).values_list('name', flat=True))
+
+    def test_results_are_ranked_by_relevance(self):
+        self.assertEqual(self.search("jupyter"), ["Jupyter Notebook", "Python Basics"])
+        self.assertEqual(self.search("python"), ["Python Basics", "Jupyter Notebook"])
+
+    def test_matches_word_prefixes_of_all_terms(self):
+        self.assertEqual(self.search("note pyth"), ["Jupyter Notebook"])
+        self.assertEqual(self.search("unknown"), [])
+        self.assertEqual(self.search("--"), [])
+
+    def test_finds_app_template_by_id(self):
+        self.assertEqual(self.search(str(self.python.id)), ["Python Basics"])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.jupyter.name = "Rust Lab"
+        self.jupyter.save()
+        self.assertEqual(self.search("jupyter"), ["Python Basics"])
+        self.assertEqual(self.search("rust"), ["Rust Lab"])
+
+        self.python.delete()
+        self.assertEqual(self.search("python"), ["Rust Lab"])
+
+    def test_index_contains_approved_copy(self):
+        approve_app_template(self.jupyter.id)
+        self.assertEqual(sorted(self.search("notebook")), ["Jupyter Notebook", "Jupyter Notebook-V1"])
+
+    def test_rebuild_includes_bulk_created_app_templates(self):
+        AppTemplates.objects.bulk_create([AppTemplates(
+            image_id=uuid.uuid4(), name="Bulk Rust", description="Rust", short_description="VM",
+            creator_id=self.user, fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)])
+        self.assertEqual(self.search("rust"), [])
+        rebuild_search_index()
+        self.assertEqual(self.search("rust"), ["Bulk Rust"])
+
+    def test_search_does_not_scan_with_like(self):
+        sql = str(search_app_templates(AppTemplates.objects.all(), "jupyter").query)
+        self.assertIn('MATCH', sql)
+        self.assertNotIn('LIKE', sql)
+
+    def test_search_matches_once_for_all_app_templates(self):
+        # A correlated subquery would run the MATCH again for every AppTemplate
+        sql = str(search_app_templates(AppTemplates.objects.all(), "jupyter").query)
+        self.assertEqual(sql.count('MATCH'), 1)
+        self.assertIn('JOIN', sql)
+
+    def test_build_match_query_quotes_terms(self):
+        self.assertEqual(build_match_query('c++ "java"'), '"c"* "java"*')
+
+
+class AppTemplateFuzzySearchTests(TestCase):
+
+    def setUp(self):
+        reset_fuzzy_index()
+        role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreAdmin"]["name"],
+                                    access_level=DEFAULT_ROLES["EduVMStoreAdmin"]["access_level"])
+        self.user = Users.objects.create(role_id=role)
+        self.jupyter = self.create_app_template("Jupyter Notebook")
+        self.python = self.create_app_template("Python Basics")
+
+    def tearDown(self):
+        reset_fuzzy_index()
+
+    def create_app_template(self, name):
+        return AppTemplates.objects.create(image_id=uuid.uuid4(), name=name, description="",
+                                           short_description="Course VM", creator_id=self.user,
+                                           fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+
+    def search(self, search, queryset=None):
+        queryset = AppTemplates.objects.all() if queryset is None else queryset
+        return list(fuzzy_search_app_templates(queryset, search).values_list('name', flat=True))
+
+    def test_finds_names_with_typos(self):
+        self.assertEqual(self.search("Jupiter"), ["Jupyter Notebook"])
+        self.assertEqual(self.search("pyton basic"), ["Python Basics"])
+        self.assertEqual(self.search("Rust"), [])
+
+    def test_orders_by_similarity_within_queryset(self):
+        self.create_app_template("Jupyter")
+        self.assertEqual(self.search("jupyter"), ["Jupyter", "Jupyter Notebook"])
+        self.assertEqual(self.search("jupyter", AppTemplates.objects.exclude(name="Jupyter")),
+                         ["Jupyter Notebook"])
+
+    def test_index_follows_committed_writes(self):
+        self.assertEqual(len(get_fuzzy_index()), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rust = self.create_app_template("Rust Lab")
+            self.jupyter.name = "Julia Lab"
+            self.jupyter.save()
+            self.python.deleted = True
+            self.python.save()
+        self.assertEqual(self.search("rsut lab"), ["Rust Lab"])
+        self.assertEqual(self.search("jupyter"), [])
+        self.assertEqual(self.search("julia"), ["Julia Lab"])
+        self.assertEqual(len(get_fuzzy_index()), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rust.delete()
+        self.assertEqual(len(get_fuzzy_index()), 1)
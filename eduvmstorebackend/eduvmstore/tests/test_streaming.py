@@ -0,0 +1,177 @@
+import json
+import tracemalloc
+import uuid
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from eduvmstore.api.streaming import NDJSONRenderer
+from eduvmstore.config.access_levels import DEFAULT_ROLES
+from eduvmstore.db.models import (AppTemplateAccountAttributes, AppTemplates, AppTemplateSecurityGroups,
+                                  Roles, Users)
+from eduvmstore.db.operations.app_templates import app_template_response_cache
+from eduvmstore.db.operations.users import user_cache
+from eduvmstore.tests.test_api import LOCMEM_CACHES
+
+NDJSON = 'application/x-ndjson'
+
+
+class NDJSONRendererTests(APITestCase):
+
+    def test_renders_list_as_lines(self):
+        rendered = NDJSONRenderer().render([{'id': uuid.UUID(int=1), 'name': 'Jupyter'},
+                                            {'name': 'Ümlaut'}])
+        self.assertEqual(rendered.decode().splitlines(),
+                         ['{"id":"00000000-0000-0000-0000-000000000001","name":"Jupyter"}',
+                          '{"name":"Ümlaut"}'])
+
+    def test_renders_other_data_as_single_line(self):
+        self.assertEqual(NDJSONRenderer().render({'error': 'Invalid'}), b'{"error":"Invalid"}\n')
+        self.assertEqual(NDJSONRenderer().render(None), b'')
+
+
+@patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+       '.validate_token_with_keystone')
+@override_settings(CACHES=LOCMEM_CACHES, STREAMING={'chunk_size': 2})
+class StreamingListTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreAdmin"]["name"],
+                                    access_level=DEFAULT_ROLES["EduVMStoreAdmin"]["access_level"])
+        cls.admin_user = Users.objects.create(role_id=role)
+        for i in range(5):
+            app_template = AppTemplates.objects.create(
+                image_id=uuid.uuid4(), name=f"Template {i}", description="", short_description="Short",
+                creator_id=cls.admin_user, public=True, approved=True,
+                fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+            AppTemplateSecurityGroups.objects.create(app_template_id=app_template, name=f"group {i}")
+            AppTemplateAccountAttributes.objects.create(app_template_id=app_template, name="Username")
+        Users.objects.bulk_create([Users(role_id=role) for _ in range(4)])
+
+    def setUp(self):
+        user_cache.reset()
+        app_template_response_cache.clear()
+
+    def get(self, mock_validate_token, url, params=None, **headers):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        return self.client.get(url, params, HTTP_X_AUTH_TOKEN="valid_token", HTTP_ACCEPT=NDJSON, **headers)
+
+    def read_lines(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_streams_app_templates_with_chunked_prefetch(self, mock_validate_token):
+        self.get(mock_validate_token, reverse('app-template-list'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(mock_validate_token, reverse('app-template-list'))
+            lines = self.read_lines(response)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], NDJSON)
+        self.assertIn('ETag', response)
+        self.assertEqual(sorted(line['security_groups'][0]['name'] for line in lines),
+                         [f"group {i}" for i in range(5)])
+        # Three chunks, each with its own query per relation
+        prefetches = [query for query in queries.captured_queries
+                      if 'FROM "eduvmstore_apptemplatesecuritygroups"' in query['sql']]
+        self.assertEqual(len(prefetches), 3)
+
+    def test_streams_sparse_fields(self, mock_validate_token):
+        response = self.get(mock_validate_token, reverse('app-template-list'), {'fields': 'name'})
+        lines = self.read_lines(response)
+        self.assertEqual(sorted(line['name'] for line in lines), [f"Template {i}" for i in range(5)])
+        self.assertEqual(set(lines[0]), {'id', 'name'})
+
+    def test_streams_users(self, mock_validate_token):
+        lines = self.read_lines(self.get(mock_validate_token, reverse('user-list')))
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[0]['role']['name'], DEFAULT_ROLES["EduVMStoreAdmin"]["name"])
+
+    def test_not_modified(self, mock_validate_token):
+        etag = self.get(mock_validate_token, reverse('user-list'))['ETag']
+        response = self.get(mock_validate_token, reverse('user-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_page_is_a_single_line(self, mock_validate_token):
+        response = self.get(mock_validate_token, reverse('app-template-list'), {'page_size': 2})
+        self.assertFalse(response.streaming)
+        page = json.loads(response.content)
+        self.assertEqual(len(page['results']), 2)
+        self.assertIsNotNone(page['next'])
+
+    def test_json_is_not_streamed(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        response = self.client.get(reverse('app-template-list'), HTTP_X_AUTH_TOKEN="valid_token")
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.data), 5)
+
+
+@patch('eduvmstore.middleware.authentication_middleware.KeystoneAuthenticationMiddleware'
+       '.validate_token_with_keystone')
+class StreamingMemoryTests(APITestCase):
+    USER_COUNT = 50000
+    APP_TEMPLATE_COUNT = 10000
+    # Rendering the list of 50k users as JSON peaks above 100 MB, streaming it below 1 MB
+    MAX_PEAK_BYTES = 4 * 1024 * 1024
+
+    @classmethod
+    def setUpTestData(cls):
+        role = Roles.objects.create(name=DEFAULT_ROLES["EduVMStoreAdmin"]["name"],
+                                    access_level=DEFAULT_ROLES["EduVMStoreAdmin"]["access_level"])
+        cls.admin_user = Users.objects.create(role_id=role)
+        Users.objects.bulk_create([Users(role_id=role) for _ in range(cls.USER_COUNT)], batch_size=5000)
+        app_templates = AppTemplates.objects.bulk_create([AppTemplates(
+            image_id=uuid.uuid4(), name=f"Template {i}", description="Course VM " * 20,
+            short_description="Short", creator_id=cls.admin_user, public=True, approved=True,
+            fixed_ram_gb=1.0, fixed_disk_gb=10.0, fixed_cores=1.0)
+            for i in range(cls.APP_TEMPLATE_COUNT)], batch_size=5000)
+        AppTemplateAccountAttributes.objects.bulk_create([
+            AppTemplateAccountAttributes(app_template_id=app_template, name=name, position=position)
+            for app_template in app_templates
+            for position, name in enumerate(("Username", "Password"))], batch_size=5000)
+        AppTemplateSecurityGroups.objects.bulk_create([
+            AppTemplateSecurityGroups(app_template_id=app_template, name="ssh")
+            for app_template in app_templates], batch_size=5000)
+
+    def test_peak_memory_of_streamed_users_stays_flat(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        user_cache.reset()
+        self.client.get(reverse('user-detail', args=[self.admin_user.id]), HTTP_X_AUTH_TOKEN="valid_token")
+
+        tracemalloc.start()
+        try:
+            response = self.client.get(reverse('user-list'), HTTP_X_AUTH_TOKEN="valid_token",
+                                       HTTP_ACCEPT=NDJSON)
+            lines = sum(chunk.count(b'\n') for chunk in response.streaming_content)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(lines, self.USER_COUNT + 1)
+        self.assertLess(peak, self.MAX_PEAK_BYTES)
+
+
+    # The peak depends on the chunk size, not the number of AppTemplates: a chunk of 500 AppTemplates
+    # with their attributes takes about 7 MB, the JSON list of 10k AppTemplates above 100 MB
+    @override_settings(CACHES=LOCMEM_CACHES, STREAMING={'chunk_size': 100})
+    def test_peak_memory_of_streamed_app_templates_stays_flat(self, mock_validate_token):
+        mock_validate_token.return_value = {'id': self.admin_user.id, 'name': 'Admin'}
+        user_cache.reset()
+        app_template_response_cache.clear()
+        self.client.get(reverse('user-detail', args=[self.admin_user.id]), HTTP_X_AUTH_TOKEN="valid_token")
+
+        tracemalloc.start()
+        try:
+            response = self.client.get(reverse('app-template-list'), HTTP_X_AUTH_TOKEN="valid_token",
+                                       HTTP_ACCEPT=NDJSON)
+            lines = sum(chunk.count(b'\n') for chunk in response.streaming_content)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(lines, self.APP_TEMPLATE_COUNT)
+        self.assertLess(peak, self.MAX_PEAK_BYTES)
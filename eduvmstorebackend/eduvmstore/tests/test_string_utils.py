@@ -1,5 +1,6 @@
 from django.test import TestCase
-from eduvmstore.utils.string_utils import has_version_suffix, extract_version_suffix, create_version_pattern
+from eduvmstore.utils.string_utils import (has_version_suffix, extract_version_suffix, create_version_pattern,
+                                          split_version_suffix)
 
 
 class AppTemplateOperationsTests(TestCase):
@@ -44,3 +45,10 @@ class AppTemplateOperationsTests(TestCase):
         self.assertEqual(create_version_pattern("test.template"), r"^test\.template-V\d+$")
         self.assertEqual(create_version_pattern("test+name"), r"^test\+name-V\d+$")
         self.assertEqual(create_version_pattern("name[1]"), r"^name\[1\]-V\d+$")
+
+    def test_split_version_suffix(self):
+        self.assertEqual(split_version_suffix("example-V21"), ("example", 21))
+        self.assertEqual(split_version_suffix("long name with spaces-V0"), ("long name with spaces", 0))
+        self.assertEqual(split_version_suffix("name-V1-V2"), ("name-V1", 2))
+        self.assertEqual(split_version_suffix("template-v1"), ("template-v1", None))
+        self.assertEqual(split_version_suffix("template-V1a"), ("template-V1a", None))
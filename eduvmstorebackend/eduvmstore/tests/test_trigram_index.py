@@ -0,0 +1,52 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from eduvmstore.utils.trigram_index import TrigramIndex, trigrams
+
+
+class TrigramIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        self.index = TrigramIndex()
+        self.index.add(1, "Jupyter Notebook")
+        self.index.add(2, "Python Basics")
+        self.index.add(3, "Jupyter Notebook with Python and R")
+
+    def keys(self, query, min_similarity=0.5):
+        return [key for key, _ in self.index.search(query, limit=10, min_similarity=min_similarity)]
+
+    def test_trigrams_of_words(self):
+        self.assertEqual(trigrams("Ab"), {"  a", " ab", "ab "})
+        self.assertEqual(trigrams("Café"), trigrams("cafe"))
+        self.assertEqual(trigrams("--"), set())
+
+    def test_tolerates_typos(self):
+        self.assertEqual(self.keys("Jupiter"), [1, 3])
+        self.assertEqual(self.keys("pyton"), [2, 3])
+        self.assertEqual(self.keys("Rust"), [])
+
+    def test_similarity_of_exact_match_is_one(self):
+        key, similarity = self.index.search("python basics", limit=1, min_similarity=0.5)[0]
+        self.assertEqual(key, 2)
+        self.assertEqual(similarity, 1.0)
+
+    def test_replace_and_remove(self):
+        self.index.add(1, "Rust Lab")
+        self.assertEqual(self.keys("Jupiter"), [3])
+        self.assertEqual(self.keys("rust"), [1])
+
+        self.index.remove(3)
+        self.index.remove(42)
+        self.assertEqual(self.keys("Jupiter"), [])
+        self.assertEqual(len(self.index), 2)
+
+    @patch('eduvmstore.utils.trigram_index.MIN_REMOVED_FOR_COMPACTION', 2)
+    def test_compaction_keeps_remaining_documents(self):
+        self.index.remove(1)
+        self.index.remove(3)
+
+        self.assertEqual(len(self.index._keys), 1)
+        self.assertEqual(self.keys("pyton"), [2])
+        self.index.add(4, "Jupyter")
+        self.assertEqual(self.keys("Jupiter"), [4])
@@ -0,0 +1,49 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from eduvmstore.utils.ttl_cache import TTLCache
+
+
+class TTLCacheTests(SimpleTestCase):
+
+    @patch('eduvmstore.utils.ttl_cache.time.monotonic')
+    def test_entry_expires_after_ttl(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        cache = TTLCache(max_size=10, ttl=60)
+        cache.set('key', 'value')
+
+        mock_monotonic.return_value = 159.0
+        self.assertEqual(cache.get('key'), 'value')
+        mock_monotonic.return_value = 160.0
+        self.assertIsNone(cache.get('key'))
+
+    @patch('eduvmstore.utils.ttl_cache.time.monotonic')
+    def test_entry_ttl_is_bounded_by_cache_ttl(self, mock_monotonic):
+        mock_monotonic.return_value = 0.0
+        cache = TTLCache(max_size=10, ttl=60)
+        cache.set('short', 'value', ttl=10)
+        cache.set('long', 'value', ttl=3600)
+
+        mock_monotonic.return_value = 30.0
+        self.assertIsNone(cache.get('short'))
+        self.assertEqual(cache.get('long'), 'value')
+        mock_monotonic.return_value = 61.0
+        self.assertIsNone(cache.get('long'))
+
+    def test_non_positive_ttl_is_not_stored(self):
+        cache = TTLCache(max_size=10, ttl=60)
+        cache.set('key', 'value', ttl=0)
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        # Touch 'a' so that 'b' becomes the least recently used entry
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
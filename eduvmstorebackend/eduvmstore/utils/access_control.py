@@ -1,4 +1,7 @@
 import logging
+from functools import lru_cache
+from typing import FrozenSet, Tuple
+
 from django.urls import resolve
 from eduvmstore.config.access_levels import DEFAULT_ACCESS_LEVEL, REQUIRED_ACCESS_LEVELS
 from rest_framework.request import Request
@@ -6,43 +9,77 @@ from rest_framework.request import Request
 logger = logging.getLogger('eduvmstore_logger')
 
 
-def has_access_level(user, url: str, method: str) -> bool:
+@lru_cache(maxsize=None)
+def get_allowed_operations(access_level: int) -> FrozenSet[Tuple[str, str]]:
     """
-    Check if user has sufficient access level for a given operation.
+    Get all operations of REQUIRED_ACCESS_LEVELS allowed for an access level.
+    The result is computed once per access level.
 
-    :param Users user: User to check access for
-    :param str url: URL name
-    :param str method: HTTP method (GET, POST, etc.)
-    :return: True if access is allowed, False otherwise
-    :rtype: bool
+    :param int access_level: Access level of a role
+    :return: Set of allowed (URL name, HTTP method) keys
+    :rtype: FrozenSet[Tuple[str, str]]
     """
-    required_level = get_required_access_level(url, method)
-    access = user.role_id.access_level >= required_level
-    if not access:
-        logger.error(f'Access denied for user: {user.id}')
-    return access
+    return frozenset(key for key, required_level in REQUIRED_ACCESS_LEVELS.items()
+                     if access_level >= required_level)
 
 
-def get_required_access_level(url: str, method: str) -> int:
+class PermissionContext:
     """
-    Get the required access level for an operation.
+    Permissions of the user of a request, computed once per request from the
+    resolved route and the access level of the user.
 
-    :param str url: URL name
-    :param str method: HTTP method (GET, POST, etc.)
-    :return: Required access level
-    :rtype: int
+    Besides the access to the requested operation, the context exposes capabilities
+    used by the views to decide about the scope of a request. Checking a capability
+    is no access denial and therefore not logged.
+
+    :param Users user: The authenticated user
+    :param str url_name: URL name of the resolved route
+    :param str method: HTTP method of the request
     """
-    key = (url, method)
-    return REQUIRED_ACCESS_LEVELS.get(key, DEFAULT_ACCESS_LEVEL)
+
+    def __init__(self, user, url_name: str, method: str) -> None:
+        """
+        Compute the permissions of the user for the request.
+
+        :param Users user: The authenticated user
+        :param str url_name: URL name of the resolved route
+        :param str method: HTTP method of the request
+        """
+        self.user = user
+        self.access_level = user.role_id.access_level
+        self.allowed_operations = get_allowed_operations(self.access_level)
+
+        self.allowed = self.allows(url_name, method)
+        self.can_list_all_app_templates = self.allows('app-template-list-all', 'GET')
+        self.can_delete_approved_app_templates = self.allows('app-template-delete-approved', 'DELETE')
+        self.can_list_all_users = self.allows('user-list-all', 'GET')
+
+    def allows(self, url: str, method: str) -> bool:
+        """
+        Check if the user has sufficient access level for an operation without logging.
+
+        :param str url: URL name
+        :param str method: HTTP method (GET, POST, etc.)
+        :return: True if access is allowed, False otherwise
+        :rtype: bool
+        """
+        if (url, method) in REQUIRED_ACCESS_LEVELS:
+            return (url, method) in self.allowed_operations
+        return self.access_level >= DEFAULT_ACCESS_LEVEL
 
 
 def check_request_access(request: Request) -> bool:
     """
     Check if the user in the request has access to the current URL.
+    The permission context is stored as request.permissions for the views.
+    The route resolved by Django is used if available.
 
     :param Request request: The request to check
     :return: True if access is allowed, False otherwise
     :rtype: bool
     """
-    url_name = resolve(request.path).url_name
-    return has_access_level(request.myuser, url_name, request.method)
+    resolver_match = getattr(request, 'resolver_match', None) or resolve(request.path_info)
+    request.permissions = PermissionContext(request.myuser, resolver_match.url_name, request.method)
+    if not request.permissions.allowed:
+        logger.error(f'Access denied for user: {request.myuser.id}')
+    return request.permissions.allowed
@@ -0,0 +1,166 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+logger = logging.getLogger('eduvmstore_logger')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Numeric representation of the states for metrics
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker guarding calls to an unreliable dependency.
+
+    The breaker tracks the outcome of the most recent calls. Once enough calls were
+    made and their failure rate reaches the threshold, the breaker opens and rejects
+    calls, so callers fail fast instead of waiting for timeouts. After the open duration,
+    a single probe call is allowed (half open). A successful probe closes the breaker
+    again, a failed probe reopens it.
+
+    :param str name: Name of the guarded dependency, used for logging
+    :param float failure_threshold: Failure rate (0-1) at which the breaker opens
+    :param int window_size: Number of most recent calls considered for the failure rate
+    :param int min_calls: Minimum number of calls before the breaker can open
+    :param float open_duration: Seconds the breaker stays open before allowing a probe
+    """
+
+    def __init__(self, name: str, failure_threshold: float, window_size: int, min_calls: int,
+                 open_duration: float) -> None:
+        """
+        Initialize a closed circuit breaker.
+
+        :param str name: Name of the guarded dependency, used for logging
+        :param float failure_threshold: Failure rate (0-1) at which the breaker opens
+        :param int window_size: Number of most recent calls considered for the failure rate
+        :param int min_calls: Minimum number of calls before the breaker can open
+        :param float open_duration: Seconds the breaker stays open before allowing a probe
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self._outcomes = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.rejected_calls = 0
+
+    @property
+    def state(self) -> str:
+        """
+        Current state of the breaker. An open breaker whose open duration
+        has elapsed is reported as half open.
+
+        :return: One of 'closed', 'open' and 'half_open'
+        :rtype: str
+        """
+        with self._lock:
+            if self._state == OPEN and self._open_duration_elapsed():
+                return HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call to the dependency may be made.
+
+        :return: True if the call may be made, False if it has to fail fast
+        :rtype: bool
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self._open_duration_elapsed():
+                self._state = HALF_OPEN
+                logger.info(f'Circuit breaker {self.name} half open, probing')
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected_calls += 1
+            return False
+
+    def record_success(self) -> None:
+        """
+        Record a successful call. A successful probe closes the breaker.
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._probe_in_flight = False
+                self._outcomes.clear()
+                logger.info(f'Circuit breaker {self.name} closed')
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        """
+        Record a failed call. The breaker opens if the failure rate reaches
+        the threshold or if a probe fails.
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._outcomes.append(False)
+            if self._state == HALF_OPEN:
+                self._open()
+            elif self._state == CLOSED and len(self._outcomes) >= self.min_calls \
+                    and self._failure_rate() >= self.failure_threshold:
+                self._open()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return the state of the breaker as metrics.
+
+        :return: Dictionary with state, failure rate and counters
+        :rtype: Dict[str, Any]
+        """
+        state = self.state
+        with self._lock:
+            return {
+                'state': state,
+                'state_code': STATE_CODES[state],
+                'failure_rate': self._failure_rate(),
+                'window_calls': len(self._outcomes),
+                'times_opened': self.times_opened,
+                'rejected_calls': self.rejected_calls,
+            }
+
+    def reset(self) -> None:
+        """
+        Close the breaker and forget all recorded calls.
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._state = CLOSED
+            self._probe_in_flight = False
+            self._outcomes.clear()
+            self.times_opened = 0
+            self.rejected_calls = 0
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self.times_opened += 1
+        logger.error(f'Circuit breaker {self.name} opened, failure rate {self._failure_rate():.2f}')
+
+    def _open_duration_elapsed(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.open_duration
+
+    def _failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
@@ -0,0 +1,136 @@
+import threading
+from typing import Optional
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+
+# Only idempotent requests are retried automatically, on connection errors and these statuses
+RETRY_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+RETRY_STATUS_CODES = frozenset([502, 503, 504])
+
+
+class KeystoneUnavailableError(Exception):
+    """
+    Raised if Keystone can't be reached, e.g. while the circuit breaker is open.
+    """
+
+
+class KeystoneClient:
+    """
+    HTTP client for all requests of the backend to Keystone.
+
+    The client owns a pooled requests.Session, so connections to Keystone are kept
+    alive and reused across requests instead of opening a new TCP (and TLS)
+    connection for every call. Idempotent requests are retried a bounded number of times
+    if the connection fails or Keystone answers with a server error. Read timeouts are
+    not retried, so a slow Keystone blocks a worker at most for a single read timeout.
+
+    :param int pool_size: Maximum number of kept-alive connections to Keystone
+    :param float connect_timeout: Timeout in seconds for establishing a connection
+    :param float read_timeout: Timeout in seconds for waiting on a response
+    :param int max_retries: Maximum number of retries for idempotent requests
+    """
+
+    def __init__(self, pool_size: int, connect_timeout: float, read_timeout: float,
+                 max_retries: int) -> None:
+        """
+        Initialize the client with its own connection pool.
+
+        :param int pool_size: Maximum number of kept-alive connections to Keystone
+        :param float connect_timeout: Timeout in seconds for establishing a connection
+        :param float read_timeout: Timeout in seconds for waiting on a response
+        :param int max_retries: Maximum number of retries for idempotent requests
+        """
+        self.timeout = (connect_timeout, read_timeout)
+
+        retry = Retry(
+            total=max_retries,
+            read=0,
+            backoff_factor=0.1,
+            allowed_methods=RETRY_METHODS,
+            status_forcelist=RETRY_STATUS_CODES,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def url(self, path: str) -> str:
+        """
+        Build the full Keystone url for the given path.
+
+        :param str path: Path relative to the Keystone auth url, e.g. 'v3/auth/tokens'
+        :return: Full url
+        :rtype: str
+        """
+        return f"http://{settings.OPENSTACK['auth_url']}{path}"
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        """
+        Send a GET request to Keystone through the connection pool.
+
+        :param str path: Path relative to the Keystone auth url
+        :param kwargs: Additional arguments passed to requests
+        :return: The Keystone response
+        :rtype: requests.Response
+        :raises requests.RequestException: If the request fails after all retries
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        try:
+            return self.session.get(self.url(path), **kwargs)
+        except requests.ConnectionError as e:
+            # Read timeouts surface as connection errors once retries are exhausted
+            reason = getattr(e.args[0], 'reason', None) if e.args else None
+            if isinstance(reason, ReadTimeoutError):
+                raise requests.ReadTimeout(e, request=e.request) from e
+            raise
+
+    def validate_token(self, token: str) -> requests.Response:
+        """
+        Validate an OpenStack token with Keystone.
+
+        :param str token: The OpenStack token to validate
+        :return: The Keystone response
+        :rtype: requests.Response
+        :raises requests.RequestException: If the request fails after all retries
+        """
+        headers = {'X-Auth-Token': token, 'X-Subject-Token': token}
+        return self.get('v3/auth/tokens', headers=headers)
+
+    def close(self) -> None:
+        """
+        Close all pooled connections.
+
+        :return: None
+        :rtype: None
+        """
+        self.session.close()
+
+
+_keystone_client: Optional[KeystoneClient] = None
+_keystone_client_lock = threading.Lock()
+
+
+def get_keystone_client() -> KeystoneClient:
+    """
+    Return the Keystone client of this worker, creating it on first use.
+
+    :return: The shared Keystone client
+    :rtype: KeystoneClient
+    """
+    global _keystone_client
+    if _keystone_client is None:
+        with _keystone_client_lock:
+            if _keystone_client is None:
+                _keystone_client = KeystoneClient(
+                    pool_size=settings.OPENSTACK['pool_size'],
+                    connect_timeout=settings.OPENSTACK['connect_timeout'],
+                    read_timeout=settings.OPENSTACK['read_timeout'],
+                    max_retries=settings.OPENSTACK['max_retries'],
+                )
+    return _keystone_client
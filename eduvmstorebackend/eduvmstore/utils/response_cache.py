@@ -0,0 +1,156 @@
+import hashlib
+import json
+import logging
+import threading
+import uuid
+from typing import Any, Callable, Dict, Iterable, List
+
+from django.core.cache import caches
+from django.db import DatabaseError, transaction
+
+logger = logging.getLogger('eduvmstore_logger')
+
+
+class ResponseCache:
+    """
+    Cache of serialized API responses on top of a Django cache backend.
+
+    Every response is cached for a list of scopes, e.g. the public catalog and the
+    AppTemplates of a single user. Each scope has a generation token stored in the
+    backend itself, and the cache key of a response contains the tokens of its scopes.
+    Invalidating a scope replaces its token, so all responses of the scope are missed
+    from then on and expire later. As the tokens live in the backend, invalidations reach
+    all workers sharing a file or database backend.
+
+    :param str alias: Name of the Django cache in settings.CACHES
+    """
+
+    def __init__(self, alias: str) -> None:
+        """
+        Initialize the cache for the given Django cache.
+
+        :param str alias: Name of the Django cache in settings.CACHES
+        """
+        self.alias = alias
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def cache(self):
+        """
+        The Django cache backend of this worker.
+
+        :return: The cache backend
+        :rtype: django.core.cache.backends.base.BaseCache
+        """
+        return caches[self.alias]
+
+    def generation_key(self, scope: str) -> str:
+        """
+        Build the backend key of the generation token of a scope.
+
+        :param str scope: The scope, e.g. 'public'
+        :return: The backend key
+        :rtype: str
+        """
+        return f'generation:{scope}'
+
+    def get_or_set(self, scopes: List[str], key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value of the key in the given scopes, or compute and cache it.
+        If the backend fails, e.g. because the cache table is missing, the value is computed.
+
+        :param List[str] scopes: The scopes the value depends on
+        :param str key: Key of the value within the scopes, e.g. the request url
+        :param Callable compute: Function computing the value on a miss
+        :return: The cached or computed value
+        :rtype: Any
+        """
+        try:
+            cache_key = self._cache_key(scopes, key)
+            value = self.cache.get(cache_key)
+        except DatabaseError:
+            logger.warning(f'Response cache {self.alias} not available')
+            self._count('errors')
+            return compute()
+
+        if value is not None:
+            self._count('hits')
+            return value
+        self._count('misses')
+        value = compute()
+        try:
+            self.cache.set(cache_key, value)
+        except DatabaseError:
+            logger.warning(f'Response cache {self.alias} not available')
+            self._count('errors')
+        return value
+
+    def invalidate(self, scopes: Iterable[str]) -> None:
+        """
+        Invalidate all cached values of the given scopes once the current transaction is
+        committed, so no other request caches the state before the commit under the new tokens.
+
+        :param Iterable[str] scopes: The scopes to invalidate
+        :return: None
+        :rtype: None
+        """
+        generations = {self.generation_key(scope): uuid.uuid4().hex for scope in scopes}
+
+        def replace_generations():
+            try:
+                self.cache.set_many(generations, timeout=None)
+            except DatabaseError:
+                logger.error(f'Response cache {self.alias} not invalidated')
+                self._count('errors')
+
+        transaction.on_commit(replace_generations)
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the backend and reset the statistics.
+
+        :return: None
+        :rtype: None
+        """
+        self.cache.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.errors = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return usage statistics of the cache in this worker.
+
+        :return: Dictionary with backend, hits, misses, errors and hit rate
+        :rtype: Dict[str, Any]
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': type(self.cache).__name__,
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def _cache_key(self, scopes: List[str], key: str) -> str:
+        generation_keys = [self.generation_key(scope) for scope in scopes]
+        generations = self.cache.get_many(generation_keys)
+        for generation_key in generation_keys:
+            if generation_key not in generations:
+                # Missing or evicted token: start a new generation, add keeps a concurrently set token
+                self.cache.add(generation_key, uuid.uuid4().hex, timeout=None)
+                generations[generation_key] = self.cache.get(generation_key)
+        # Hashed, as keys of file and database backends are limited in length
+        digest = hashlib.sha256(json.dumps(
+            [key, [generations[generation_key] for generation_key in generation_keys]]).encode())
+        return f'response:{digest.hexdigest()}'
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
@@ -0,0 +1,38 @@
+import csv
+from typing import Dict, Iterable, Iterator
+
+from django.core.exceptions import ValidationError
+
+# Accepted column names (case insensitive) of a roster. Besides a plain CSV with the columns id and name,
+# this covers the user list of a Keystone project:
+# openstack user list --project <project> -f csv
+USER_ID_COLUMNS = ('id', 'user_id', 'user')
+USER_NAME_COLUMNS = ('name', 'user_name', 'username')
+
+
+def read_roster(lines: Iterable[str]) -> Iterator[Dict]:
+    """
+    Read the Users of a roster in CSV format line by line.
+    The roster needs a column with the Keystone user id and may have a column
+    with the Keystone user name. Like on the first login, the user name selects the
+    default role (see create_user), so it is passed on as keystone_role_name.
+    Rows are yielded as they are read.
+
+    :param Iterable[str] lines: Lines of the CSV roster including the header
+    :return: Iterator of dictionaries with the User id and keystone_role_name
+    :rtype: Iterator[Dict]
+    :raises ValidationError: If the roster has no user id column
+    """
+    reader = csv.DictReader(lines)
+    columns = {column.strip().lower(): column for column in reader.fieldnames or []}
+
+    id_column = next((columns[name] for name in USER_ID_COLUMNS if name in columns), None)
+    if id_column is None:
+        raise ValidationError(f"Roster needs one of the columns {', '.join(USER_ID_COLUMNS)}")
+    name_column = next((columns[name] for name in USER_NAME_COLUMNS if name in columns), None)
+
+    for row in reader:
+        yield {
+            'id': (row.get(id_column) or '').strip(),
+            'keystone_role_name': (row.get(name_column) or '').strip() if name_column else ''
+        }
@@ -0,0 +1,85 @@
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    """
+    A single in-flight call whose result is shared by all callers with the same key.
+    """
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into a single execution.
+
+    The first caller of a key executes the function, all callers arriving while
+    the call is in flight wait for it and receive the same result (or exception).
+    Waiting is thread based, which covers the threaded WSGI server as well as
+    ASGI, where Django runs synchronous middleware in a dedicated thread per request.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize without any in-flight calls.
+        """
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """
+        Execute the function once per key for all concurrent callers.
+
+        :param Hashable key: Key identifying equivalent calls
+        :param function function: Function to execute if no call for the key is in flight
+        :return: Result of the (shared) function call
+        :rtype: Any
+        :raises Exception: Exception raised by the (shared) function call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the number of executed and shared calls.
+
+        :return: Dictionary with executions, shared calls and in-flight calls
+        :rtype: Dict[str, int]
+        """
+        with self._lock:
+            return {
+                'executions': self.executions,
+                'shared': self.shared,
+                'in_flight': len(self._calls),
+            }
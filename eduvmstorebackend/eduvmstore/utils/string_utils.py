@@ -1,4 +1,5 @@
 import re
+from typing import Optional, Tuple
 
 # Pattern to match version suffixes in AppTemplate names.
 # This pattern is forbidden as it is automatically used for approved AppTemplates
@@ -38,3 +39,18 @@ def create_version_pattern(name: str) -> str:
     :rtype: str
     """
     return f"^{re.escape(name)}{VERSION_SUFFIX_PATTERN}"
+
+
+def split_version_suffix(name: str) -> Tuple[str, Optional[int]]:
+    """
+    Split an AppTemplate name into its base name and the number of its version suffix.
+    Examples are 'example-V2' -> ('example', 2) and 'example' -> ('example', None).
+
+    :param str name: The name of the AppTemplate to split
+    :return: The base name and the version number or None if there is no version suffix
+    :rtype: Tuple[str, Optional[int]]
+    """
+    match = re.search(VERSION_SUFFIX_PATTERN, name)
+    if match is None:
+        return name, None
+    return name[:match.start()], int(match.group(0)[2:])
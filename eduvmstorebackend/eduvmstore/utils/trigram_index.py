@@ -0,0 +1,198 @@
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Compact the postings once more documents were removed than are indexed
+MIN_REMOVED_FOR_COMPACTION = 1000
+
+EMPTY_POSTINGS = array('I')
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Split a text into the trigrams of its words. Like PostgreSQL pg_trgm, the text is
+    lowercased and every word is padded with two spaces in front and one at the end,
+    so word beginnings weigh more than word ends. Diacritics are removed.
+
+    :param str text: The text to split
+    :return: Set of trigrams
+    :rtype: Set[str]
+    """
+    normalized = unicodedata.normalize('NFKD', text.lower())
+    normalized = ''.join(character for character in normalized if not unicodedata.combining(character))
+    result = set()
+    for word in WORD_PATTERN.findall(normalized):
+        padded = f'  {word} '
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class TrigramIndex:
+    """
+    Thread-safe in-process inverted index from trigrams to documents for fuzzy search.
+
+    A search only visits the documents sharing enough trigrams with the query, so typos
+    like 'Jupiter' still find 'Jupyter' without comparing the query to every document.
+    The similarity of a document is the share of the query trigrams it contains.
+    Documents are numbered in insertion order, so every postings list is sorted. Removed
+    documents are skipped until the postings are compacted. The index lives in the memory
+    of a single worker process.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty index.
+        """
+        self._lock = threading.Lock()
+        self._postings: Dict[str, array] = {}
+        # Key and number of trigrams per document number, the key is None once removed
+        self._keys: List[Optional[Hashable]] = []
+        self._sizes = array('I')
+        self._numbers: Dict[Hashable, int] = {}
+        self._removed = 0
+
+    def __len__(self) -> int:
+        """
+        Return the number of indexed documents.
+
+        :return: Number of documents
+        :rtype: int
+        """
+        return len(self._numbers)
+
+    def add(self, key: Hashable, text: str) -> None:
+        """
+        Add a document to the index or replace it.
+
+        :param Hashable key: Key of the document
+        :param str text: Text of the document
+        :return: None
+        :rtype: None
+        """
+        document_trigrams = trigrams(text)
+        with self._lock:
+            self._remove(key)
+            number = len(self._keys)
+            self._keys.append(key)
+            self._sizes.append(len(document_trigrams))
+            self._numbers[key] = number
+            for trigram in document_trigrams:
+                postings = self._postings.get(trigram)
+                if postings is None:
+                    postings = self._postings[trigram] = array('I')
+                postings.append(number)
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Remove a document from the index if it exists.
+
+        :param Hashable key: Key of the document
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """
+        Remove all documents from the index.
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._postings.clear()
+            self._keys.clear()
+            self._sizes = array('I')
+            self._numbers.clear()
+            self._removed = 0
+
+    def search(self, query: str, limit: int, min_similarity: float) -> List[Tuple[Hashable, float]]:
+        """
+        Find the documents most similar to the query.
+
+        :param str query: The search string
+        :param int limit: Maximum number of results
+        :param float min_similarity: Minimum share (0-1) of the query trigrams a document has to contain
+        :return: Keys and similarities of the matching documents, most similar first
+        :rtype: List[Tuple[Hashable, float]]
+        """
+        query_trigrams = trigrams(query)
+        if not query_trigrams:
+            return []
+        query_size = len(query_trigrams)
+        # Smallest number of shared trigrams reaching the minimum similarity
+        min_overlap = max(1, math.ceil(min_similarity * query_size - 1e-9))
+
+        with self._lock:
+            postings_lists = sorted(
+                (self._postings.get(trigram, EMPTY_POSTINGS) for trigram in query_trigrams), key=len)
+            # A document missing from all of the rarest query_size - min_overlap + 1 postings lists
+            # shares at most min_overlap - 1 trigrams with the query, so these lists yield all candidates
+            split = query_size - min_overlap + 1
+            overlaps = Counter()
+            for postings in postings_lists[:split]:
+                overlaps.update(postings)
+            candidates = list(overlaps)
+            for postings in postings_lists[split:]:
+                if len(candidates) * math.log2(len(postings) + 1) < len(postings):
+                    # Look up the few candidates in the long postings list instead of reading all of it
+                    for number in candidates:
+                        position = bisect_left(postings, number)
+                        if position < len(postings) and postings[position] == number:
+                            overlaps[number] += 1
+                else:
+                    overlaps.update(postings)
+
+            matches = []
+            for number, overlap in overlaps.items():
+                key = self._keys[number]
+                if key is None or overlap < min_overlap:
+                    continue
+                # Among equally similar documents prefer those that contain little else,
+                # e.g. the name 'Jupyter' over 'Jupyter Notebook with Python'
+                coverage = overlap / (query_size + self._sizes[number] - overlap)
+                matches.append((overlap / query_size, coverage, key))
+
+        best = heapq.nlargest(limit, matches, key=lambda match: match[:2])
+        return [(key, similarity) for similarity, _, key in best]
+
+    def _remove(self, key: Hashable) -> None:
+        number = self._numbers.pop(key, None)
+        if number is None:
+            return
+        self._keys[number] = None
+        self._removed += 1
+        if self._removed >= MIN_REMOVED_FOR_COMPACTION and self._removed > len(self._numbers):
+            self._compact()
+
+    def _compact(self) -> None:
+        # Renumber the remaining documents and drop the removed ones from the postings
+        new_numbers = {}
+        keys = []
+        sizes = array('I')
+        for number, key in enumerate(self._keys):
+            if key is not None:
+                new_numbers[number] = len(keys)
+                keys.append(key)
+                sizes.append(self._sizes[number])
+
+        postings = {}
+        for trigram, numbers in self._postings.items():
+            remaining = array('I', (new_numbers[number] for number in numbers if number in new_numbers))
+            if remaining:
+                postings[trigram] = remaining
+
+        self._postings = postings
+        self._keys = keys
+        self._sizes = sizes
+        self._numbers = {key: number for number, key in enumerate(keys)}
+        self._removed = 0
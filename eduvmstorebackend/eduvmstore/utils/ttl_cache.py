@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with per-entry expiry and LRU eviction.
+
+    Every entry expires after the cache wide TTL or after an optional shorter
+    per-entry TTL. Entries can optionally be kept beyond their expiry for stale
+    reads through get_stale. If the cache is full, the least recently used entry
+    is evicted. The cache lives in the memory of a single worker process.
+
+    :param int max_size: Maximum number of entries kept in the cache
+    :param float ttl: Maximum lifetime of an entry in seconds
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """
+        Initialize an empty cache.
+
+        :param int max_size: Maximum number of entries kept in the cache
+        :param float ttl: Maximum lifetime of an entry in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retrieve a value from the cache if it exists and is not expired.
+
+        :param Hashable key: Key of the entry
+        :param Any default: Value returned if no valid entry exists
+        :return: The cached value or the default
+        :rtype: Any
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at, stale_until = entry
+            now = time.monotonic()
+            if expires_at <= now:
+                if stale_until <= now:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_stale(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retrieve a value from the cache even if it is expired, as long as
+        it is still within the stale lifetime given on set.
+
+        :param Hashable key: Key of the entry
+        :param Any default: Value returned if no usable entry exists
+        :return: The cached value or the default
+        :rtype: Any
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= time.monotonic():
+                return default
+            self.stale_hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None,
+            stale_ttl: Optional[float] = None) -> None:
+        """
+        Store a value in the cache. The lifetime of the entry is the smaller
+        of the cache wide TTL and the given TTL. Entries with a lifetime of
+        zero or less are not stored.
+
+        :param Hashable key: Key of the entry
+        :param Any value: Value to store
+        :param float ttl: Optional lifetime of the entry in seconds
+        :param float stale_ttl: Optional lifetime in seconds for stale reads, if longer than the lifetime
+        :return: None
+        :rtype: None
+        """
+        lifetime = self.ttl if ttl is None else min(self.ttl, ttl)
+        stale_lifetime = lifetime if stale_ttl is None else max(lifetime, stale_ttl)
+        if stale_lifetime <= 0 or self.max_size <= 0:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (value, now + lifetime, now + stale_lifetime)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        Remove an entry from the cache if it exists.
+
+        :param Hashable key: Key of the entry
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache.
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def reset(self) -> None:
+        """
+        Remove all entries from the cache and reset the statistics.
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.stale_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return usage statistics of the cache.
+
+        :return: Dictionary with size, hits, misses, stale hits and hit rate
+        :rtype: Dict[str, Any]
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale_hits': self.stale_hits,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }